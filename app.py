@@ -2,62 +2,129 @@
 Movie Recommendation System - Flask Application
 Sistem de Recomandare Filme cu abordare hibridă
 """
-from flask import Flask, render_template, request, jsonify, session
+from flask import Flask, render_template, request, jsonify, session, g
 from flask_cors import CORS
+import atexit
+import threading
 import uuid
 import os
 
 import config
-from recombee_client import MovieRecommender
-from data_loader import (
-    load_movies_metadata, load_keywords, load_credits,
-    merge_movie_data, get_popular_movies, get_movies_by_genre
-)
+from recombee_client import Deadline, MovieRecommender
+from data_loader import load_merged_movies
+from movie_store import LocalRecommender, MovieStore, load_shared_movie_store
+from cache import LazyLoader
+from rating_buffer import RatingBuffer, RatingBufferFull
+from interaction_log import InteractionLog
 
 app = Flask(__name__)
 app.secret_key = os.urandom(24)
 CORS(app)
 
-# Inițializare recommender (lazy loading)
-recommender = None
-movies_cache = None
+def load_movies_cache():
+    """Construiește cache-ul de filme local (MovieStore, indexat după id)."""
+    if config.MOVIE_STORE_SHARED:
+        # Snapshot mapat read-only, aceleași pagini pentru toate procesele worker
+        return load_shared_movie_store()
+    # Încarcă toate datele: movies + keywords + credits (inclusiv director!)
+    # Rezultatul parsat e păstrat în cache-ul Parquet din config.CACHE_DIR
+    return MovieStore(load_merged_movies())
+
+
+def create_recommender():
+    """Clientul Recombee, cu fallback pe corpusul local când Recombee e indisponibil."""
+    return MovieRecommender(local=LocalRecommender(get_movies_cache))
+
+
+def create_rating_buffer():
+    """Buffer-ul write-behind pentru /api/rate, golit la oprirea procesului."""
+    buffer = RatingBuffer(get_recommender())
+    atexit.register(buffer.close)
+    return buffer
+
+
+def create_interaction_log():
+    """Jurnalul local al interacțiunilor, închis la oprirea procesului."""
+    log = InteractionLog()
+    atexit.register(log.close)
+    return log
+
+
+# Inițializare lazy, single-flight: la un val de cereri imediat după pornire
+# un singur thread încarcă resursa, iar celelalte așteaptă rezultatul lui
+recommender = LazyLoader(create_recommender, name='recommender')
+movies_cache = LazyLoader(load_movies_cache, name='movies_cache')
+rating_buffer = LazyLoader(create_rating_buffer, name='rating_buffer')
+interaction_log = LazyLoader(create_interaction_log, name='interaction_log')
+
+warmup_lock = threading.Lock()
+warmup_thread = None
 
 
 def get_recommender():
     """Lazy loading pentru Recombee client."""
-    global recommender
-    if recommender is None:
-        recommender = MovieRecommender()
-    return recommender
+    return recommender.get()
 
 
 def get_movies_cache():
-    """Lazy loading pentru cache-ul de filme local."""
-    global movies_cache
-    if movies_cache is None:
-        try:
-            # Încarcă toate datele: movies + keywords + credits
-            from data_loader import load_keywords, load_credits, merge_movie_data
-            import os
-            
-            movies = load_movies_metadata()
-            
-            # Încarcă keywords și credits dacă există
-            keywords = None
-            credits = None
-            
-            if os.path.exists(config.KEYWORDS_PATH):
-                keywords = load_keywords()
-            
-            if os.path.exists(config.CREDITS_PATH):
-                credits = load_credits()
-            
-            # Combină toate datele (inclusiv director!)
-            movies_cache = merge_movie_data(movies, keywords, credits)
-            
-        except FileNotFoundError:
-            movies_cache = None
-    return movies_cache
+    """Lazy loading pentru cache-ul de filme local (None dacă dataset-ul lipsește)."""
+    try:
+        return movies_cache.get()
+    except FileNotFoundError:
+        return None
+
+
+def log_interaction(method, *args, **kwargs):
+    """Scrie o interacțiune în jurnalul local (o eroare aici nu oprește cererea)."""
+    if not config.INTERACTION_LOG_ENABLED:
+        return
+    try:
+        getattr(interaction_log.get(), method)(*args, **kwargs)
+    except Exception as e:
+        print(f"⚠️  Jurnalul de interacțiuni nu a putut fi scris: {e}")
+
+
+def movies_cache_ready():
+    """Corpusul e încărcat (sau lipsește, caz în care servim datele demo)."""
+    return movies_cache.ready or isinstance(movies_cache.exception, FileNotFoundError)
+
+
+def warmup():
+    """Încarcă cache-ul de filme și, cu Recombee configurat, cache-ul cold start."""
+    try:
+        get_movies_cache()
+    except Exception as e:
+        print(f"⚠️  Încărcarea cache-ului de filme a eșuat: {e}")
+
+    if config.RECOMBEE_DATABASE_ID != 'your-database-id':
+        get_recommender().warm_cold_start_cache()
+
+
+def start_warmup():
+    """
+    Pornește warmup() într-un thread de fundal, dacă nu rulează deja.
+    Cererile sosite între timp așteaptă aceeași încărcare (single-flight).
+    """
+    global warmup_thread
+    with warmup_lock:
+        if warmup_thread is None or not warmup_thread.is_alive():
+            warmup_thread = threading.Thread(target=warmup, name='warmup', daemon=True)
+            warmup_thread.start()
+        return warmup_thread
+
+
+# Sub un server WSGI (fără __main__), încălzirea la import se activează cu APP_WARMUP
+if config.APP_WARMUP:
+    start_warmup()
+
+
+@app.before_request
+def start_request_deadline():
+    """
+    Bugetul de timp al cererii pentru apelurile la Recombee, măsurat de la
+    sosirea ei: toate send-urile din handler împart RECOMBEE_REQUEST_TIMEOUT.
+    """
+    g.deadline = Deadline(config.RECOMBEE_REQUEST_TIMEOUT)
 
 
 # ==================== ROUTES - Pages ====================
@@ -128,14 +195,16 @@ def get_recommendations():
                 user_id, 
                 count=count, 
                 filter_genres=genres,
-                diversity=0.4  # Mai multă diversitate
+                diversity=0.4,  # Mai multă diversitate
+                deadline=g.deadline
             )
         else:
             # Utilizator nou (Cold Start) - recomandări bazate pe conținut
             preferred_genres = genres or session.get('preferred_genres', [])
             recommendations = rec.get_recommendations_for_new_user(
                 preferred_genres, 
-                count=count
+                count=count,
+                deadline=g.deadline
             )
         
         return jsonify({
@@ -172,7 +241,7 @@ def get_similar_movies(movie_id):
     
     try:
         rec = get_recommender()
-        similar = rec.get_similar_movies(movie_id, count=count)
+        similar = rec.get_similar_movies(movie_id, count=count, deadline=g.deadline)
         
         return jsonify({
             'success': True,
@@ -221,6 +290,8 @@ def rate_movie():
             'error': f'Missing required fields: movie_id={movie_id}, rating={rating}'
         }), 400
     
+    log_interaction('add_rating', user_id, movie_id, rating)
+    
     if config.RECOMBEE_DATABASE_ID == 'your-database-id':
         # Mod demo - doar salvăm în sesiune
         if 'ratings' not in session:
@@ -229,13 +300,22 @@ def rate_movie():
         return jsonify({'success': True, 'demo_mode': True})
     
     try:
-        rec = get_recommender()
-        rec.add_rating(user_id, movie_id, rating)
+        if config.RATING_BUFFER_ENABLED:
+            # Write-behind: confirmăm după scrierea în jurnalul local,
+            # Recombee primește rating-ul în următorul Batch
+            rating_buffer.get().add(user_id, movie_id, rating)
+        else:
+            get_recommender().add_rating(user_id, movie_id, rating, deadline=g.deadline)
         
         return jsonify({
             'success': True,
             'message': f'Rating {rating} înregistrat pentru filmul {movie_id}'
         })
+    except RatingBufferFull as e:
+        return jsonify({
+            'success': False,
+            'error': f'Rating buffer full, retry later ({e})'
+        }), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({
             'success': False,
@@ -267,13 +347,15 @@ def register_user():
     # Salvăm în sesiune
     session['user_id'] = user_id
     session['preferred_genres'] = preferred_genres
+    log_interaction('add_user', user_id, preferred_genres, preferred_directors)
     
     # Încearcă să creeze utilizatorul în Recombee (nu e fatal dacă eșuează)
     recombee_success = False
     if config.RECOMBEE_DATABASE_ID != 'your-database-id':
         try:
             rec = get_recommender()
-            recombee_success = rec.create_user(user_id, preferred_genres, preferred_directors)
+            recombee_success = rec.create_user(user_id, preferred_genres, preferred_directors,
+                                               deadline=g.deadline)
         except Exception as e:
             print(f"⚠️  Warning: Nu s-a putut crea utilizatorul în Recombee: {e}")
             print(f"    Nu e problemă - utilizatorul va fi creat automat la prima interacțiune")
@@ -304,13 +386,56 @@ def get_genres():
     })
 
 
+@app.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """API: Statisticile cache-urilor locale (hit ratio etc.), pentru monitorizare."""
+    if config.RECOMBEE_DATABASE_ID == 'your-database-id':
+        return jsonify({'success': True, 'caches': [], 'demo_mode': True})
+
+    rec = get_recommender()
+    caches = rec.cache_stats()
+    if rating_buffer.ready:
+        caches.append(rating_buffer.get().stats())
+    if interaction_log.ready:
+        caches.append(interaction_log.get().stats())
+    
+    return jsonify({
+        'success': True,
+        'caches': caches,
+        'circuits': rec.circuit_stats(),
+        'hedging': rec.hedge_stats()
+    })
+
+
+@app.route('/api/ready', methods=['GET'])
+def get_readiness():
+    """
+    API: Readiness pentru load balancer - 200 după ce cache-ul de filme e
+    încărcat, 503 cât timp se încarcă (o verificare pornește încălzirea).
+    """
+    ready = movies_cache_ready()
+    if not ready and movies_cache.state != 'loading':
+        start_warmup()
+
+    return jsonify({
+        'ready': ready,
+        'demo_mode': config.RECOMBEE_DATABASE_ID == 'your-database-id',
+        'resources': [movies_cache.status(), recommender.status()]
+    }), 200 if ready else 503
+
+
 @app.route('/api/popular', methods=['GET'])
 def get_popular():
     """
     API: Returnează filme populare.
     Util pentru Cold Start și pagina principală.
+    
+    Query params:
+        - count: Numărul de filme (default: config.POPULAR_MOVIES_COUNT)
+        - genre: Doar cele mai populare filme din genul dat (opțional)
     """
     count = int(request.args.get('count', config.POPULAR_MOVIES_COUNT))
+    genre = request.args.get('genre')
     
     movies = get_movies_cache()
     if movies is None:
@@ -320,7 +445,8 @@ def get_popular():
             'movies': get_demo_popular_movies(count)
         })
     
-    popular = get_popular_movies(movies, n=count)
+    # Clasamentele sunt precalculate în MovieStore: aici e doar o felie
+    popular = movies.movies_by_genre(genre, n=count) if genre else movies.popular(n=count)
     
     result = []
     for _, row in popular.iterrows():
@@ -342,62 +468,42 @@ def get_popular():
 
 @app.route('/api/movie/<movie_id>', methods=['GET'])
 def get_movie_details(movie_id):
-    """API: Obține detaliile unui film DIRECT din Recombee."""
-    try:
-        # Ia datele DIRECT din Recombee (nu din cache local)
-        from recombee_api_client.api_requests import GetItemValues
-        rec = get_recommender()
-        item_data = rec.client.send(GetItemValues(str(movie_id)))
-        
-        return jsonify({
-            'success': True,
-            'movie': {
-                'id': str(movie_id),
-                'title': item_data.get('title', 'Unknown'),
-                'overview': item_data.get('overview', ''),
-                'genres': item_data.get('genres', []),
-                'director': item_data.get('director', ''),  # DIRECT din Recombee!
-                'vote_average': item_data.get('vote_average', 0),
-                'vote_count': int(item_data.get('vote_count', 0)),
-                'runtime': int(item_data.get('runtime', 0)),
-                'release_date': item_data.get('release_date', ''),
-                'poster_path': item_data.get('poster_path', '')
-            }
-        })
-    except Exception as e:
-        # Fallback la cache local dacă Recombee nu răspunde
-        movies = get_movies_cache()
-        
-        if movies is None:
-            return jsonify({
-                'success': False,
-                'error': 'Dataset not loaded'
-            }), 404
-        
-        movie = movies[movies['id'] == int(movie_id)]
-        
-        if movie.empty:
-            return jsonify({
-                'success': False,
-                'error': 'Movie not found'
-            }), 404
-        
-        row = movie.iloc[0]
+    """
+    API: Obține detaliile unui film.
+    
+    Citește întâi catalogul local (completat și din recomandări), apoi
+    dataset-ul local și abia la urmă Recombee (GetItemValues).
+    """
+    rec = get_recommender()
+    sources = [get_dataset_item_values]
+    if config.RECOMBEE_DATABASE_ID != 'your-database-id':
+        sources.append(lambda item_id: rec.fetch_item_values(item_id, deadline=g.deadline))
+    
+    movie = rec.item_catalog.get(movie_id, sources)
+    
+    if movie is None:
         return jsonify({
-            'success': True,
-            'movie': {
-                'id': str(row['id']),
-                'title': row['title'],
-                'overview': row.get('overview', ''),
-                'genres': row.get('genre_names', []),
-                'director': row.get('director', ''),
-                'vote_average': row.get('vote_average', 0),
-                'vote_count': int(row.get('vote_count', 0)),
-                'runtime': int(row.get('runtime', 0)),
-                'release_date': row.get('release_date', ''),
-                'poster_path': row.get('poster_path', '')
-            }
-        })
+            'success': False,
+            'error': 'Movie not found' if get_movies_cache() is not None else 'Dataset not loaded'
+        }), 404
+    
+    user_id = request.args.get('user_id') or session.get('user_id')
+    if user_id:
+        log_interaction('add_view', user_id, movie['id'])
+    
+    return jsonify({
+        'success': True,
+        'movie': movie
+    })
+
+
+def get_dataset_item_values(movie_id):
+    """Proprietățile unui film din dataset-ul local (None dacă nu există)."""
+    movies = get_movies_cache()
+    if movies is None:
+        raise FileNotFoundError('Dataset not loaded')
+    
+    return movies.item_values(movie_id)
 
 
 # ==================== DEMO DATA ====================
@@ -470,6 +576,11 @@ if __name__ == '__main__':
         print("   Configure Recombee credentials in .env for full functionality")
         print("   Visit https://www.recombee.com/ to create a free account\n")
     
+    # Cache-urile se încălzesc în fundal, fără să întârzie pornirea
+    # (cu reloader-ul din debug, doar în procesul care servește cererile)
+    if not config.DEBUG or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_warmup()
+    
     print(f"🌐 Starting server at http://{config.HOST}:{config.PORT}")
     app.run(
         host=config.HOST, 
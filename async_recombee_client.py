@@ -0,0 +1,274 @@
+"""
+Async Recombee Client Module - Varianta asyncio a MovieRecommender pentru request path
+
+Clientul sincron blochează un thread pe fiecare client.send(). Aici aceleași
+cereri (construite de MovieRecommender) sunt semnate HMAC și trimise prin
+aiohttp, astfel încât un singur proces poate avea mii de recomandări în zbor.
+
+Utilizare (într-un event loop, de ex. un server ASGI):
+    async with AsyncMovieRecommender() as recommender:
+        results = await asyncio.gather(
+            recommender.get_recommendations_for_user('1', count=10),
+            recommender.get_similar_movies('862', count=5),
+        )
+"""
+import asyncio
+import hmac
+import json
+import time
+from hashlib import sha1
+from urllib.parse import quote
+
+import aiohttp
+from recombee_api_client.api_requests import Batch
+from recombee_api_client.exceptions import APIException, ApiTimeoutException, ResponseException
+from recombee_api_client.utils.serialize_to_json import serialize_to_json
+
+from recombee_client import MovieRecommender
+import config
+
+
+class ApiConnectionError(APIException):
+    """Eroare de conexiune aiohttp (refuzată, DNS, deconectare), ca APIException."""
+
+    def __init__(self, request, error):
+        super().__init__(f"Conexiune eșuată la Recombee: {type(error).__name__}: {error}")
+        self.request = request
+        self.error = error
+
+
+class AsyncRecombeeClient:
+    """
+    Echivalentul async al RecombeeClient: aceleași obiecte Request, aceeași
+    semnătură HMAC (hmac_timestamp + hmac_sign în URL), trimise cu aiohttp.
+
+    Sesiunea HTTP (cu pool-ul de conexiuni) se creează la primul send(),
+    în event loop-ul curent.
+    """
+
+    BATCH_MAX_SIZE = 10000
+
+    def __init__(self, database_id, token, base_uri, protocol='https', max_connections=None):
+        """
+        Args:
+            database_id: ID-ul bazei de date Recombee
+            token: Token-ul privat pentru semnarea cererilor
+            base_uri: Host-ul API (de ex. rapi-eu-west.recombee.com)
+            protocol: 'https' sau 'http' (cererile cu ensure_https folosesc mereu https)
+            max_connections: Numărul maxim de conexiuni HTTP deschise simultan
+        """
+        self.database_id = database_id
+        self.token = token
+        self.base_uri = base_uri
+        self.protocol = protocol
+        self.max_connections = max_connections or config.RECOMBEE_ASYNC_MAX_CONNECTIONS
+        self.session = None
+
+    async def _get_session(self):
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                headers={'User-Agent': 'sr-proiect-async-client'}
+            )
+        return self.session
+
+    async def send(self, request):
+        """
+        Trimite o cerere Recombee și returnează răspunsul JSON.
+
+        Raises:
+            ApiTimeoutException: Dacă răspunsul nu vine în request.timeout ms
+            ResponseException: Pentru orice status diferit de 200/201
+            ApiConnectionError: Pentru erorile de rețea (aiohttp.ClientError)
+        """
+        if isinstance(request, Batch) and len(request.requests) > self.BATCH_MAX_SIZE:
+            return await self._send_multipart_batch(request)
+
+        uri = self._sign_url(request.path + self._query_string(request))
+        protocol = 'https' if request.ensure_https else self.protocol
+        url = f"{protocol}://{self.base_uri}{uri}"
+
+        data = None
+        headers = None
+        if request.method != 'get':
+            data = json.dumps(self._body_parameters(request))
+            headers = {'Content-Type': 'application/json'}
+
+        session = await self._get_session()
+        try:
+            async with session.request(
+                request.method.upper(), url, data=data, headers=headers,
+                timeout=aiohttp.ClientTimeout(total=request.timeout / 1000)
+            ) as response:
+                text = await response.text()
+                if response.status not in (200, 201):
+                    raise ResponseException(request, response.status, text)
+                return json.loads(text)
+        except asyncio.TimeoutError:
+            raise ApiTimeoutException(request)
+        except aiohttp.ClientError as e:
+            raise ApiConnectionError(request, e) from e
+
+    async def _send_multipart_batch(self, batch):
+        parts = [batch.requests[i:i + self.BATCH_MAX_SIZE]
+                 for i in range(0, len(batch.requests), self.BATCH_MAX_SIZE)]
+        responses = await asyncio.gather(*(self.send(Batch(part)) for part in parts))
+        return sum(responses, [])
+
+    @staticmethod
+    def _body_parameters(request):
+        params = request.get_body_parameters()
+        for name, value in request.additional_body_parameters.items():
+            params[name] = serialize_to_json(value)
+        return params
+
+    @staticmethod
+    def _query_string(request):
+        query_params = request.get_query_parameters()
+        for name, value in request.additional_query_parameters.items():
+            query_params[name] = serialize_to_json(value)
+
+        parts = []
+        for name, value in query_params.items():
+            if isinstance(value, list):
+                value = ','.join(quote(str(v)) for v in value)
+            else:
+                value = quote(str(value))
+            parts.append(f"{name}={value}")
+        return '?' + '&'.join(parts) if parts else ''
+
+    def _sign_url(self, req_part):
+        """Semnătura HMAC-SHA1 cerută de Recombee (URI-ul trebuie să fie identic)."""
+        uri = '/' + self.database_id + req_part
+        uri += ('&' if '?' in uri else '?') + f"hmac_timestamp={int(time.time())}"
+        sign = hmac.new(self.token.encode(), uri.encode(), sha1).hexdigest()
+        return uri + '&hmac_sign=' + sign
+
+    async def close(self):
+        """Închide sesiunea HTTP (și conexiunile din pool)."""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+
+class AsyncMovieRecommender:
+    """
+    Varianta asyncio a MovieRecommender pentru cererile aplicației.
+
+    Expune aceleași metode publice pentru recomandări și rating-uri, ca
+    corutine. Cererile și formatarea răspunsurilor sunt cele din
+    MovieRecommender, deci rezultatele sunt identice cu clientul sincron.
+    """
+
+    def __init__(self, recommender=None, max_connections=None):
+        """
+        Args:
+            recommender: MovieRecommender de la care se preiau credențialele
+                         și regiunea (implicit unul nou, din config)
+            max_connections: Numărul maxim de conexiuni HTTP simultane
+        """
+        self.recommender = recommender or MovieRecommender()
+        self.client = AsyncRecombeeClient(
+            self.recommender.database_id,
+            self.recommender.private_token,
+            self.recommender.client.base_uri,
+            max_connections=max_connections
+        )
+        self.cold_start_inflight = {}  # key -> asyncio.Future (vezi get_recommendations_for_new_user)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        await self.client.close()
+
+    async def get_recommendations_for_user(self, user_id, count=10, filter_genres=None,
+                                           exclude_watched=True, diversity=0.3):
+        """Vezi MovieRecommender.get_recommendations_for_user."""
+        rec = self.recommender
+        key = rec._recommendation_cache_key(user_id, count, filter_genres, diversity)
+        cached = rec.recommendation_cache.get(key)
+        if cached is not None:
+            return cached
+
+        # Un singur round trip (vezi MovieRecommender._user_recommendation_plan)
+        plan, requests = rec._user_recommendation_plan(user_id, count, filter_genres, diversity)
+
+        try:
+            result = rec._user_recommendation_results(plan, await self._send_together(requests))
+
+            if result is None:
+                # Fallback neanticipat: al doilea round trip, fără filtru
+                response = await self.client.send(rec._user_recommendation_request(
+                    user_id, count, None, plan['booster'], diversity))
+                result = rec._format_recommendations(response['recomms'])
+
+            rec.recommendation_cache.set(key, result, tag=str(user_id))
+            return result
+
+        except APIException as e:
+            print(f"⚠️ Eroare la obținerea recomandărilor: {e}")
+            return []
+
+    async def _send_together(self, requests):
+        """Vezi MovieRecommender._send_together."""
+        if len(requests) == 1:
+            return [await self.client.send(requests[0])]
+        return self.recommender._batch_responses(requests, await self.client.send(Batch(requests)))
+
+    async def get_recommendations_for_new_user(self, preferred_genres, count=10):
+        """Vezi MovieRecommender.get_recommendations_for_new_user (același cache cold start)."""
+        rec = self.recommender
+        key = rec._cold_start_cache_key(preferred_genres, count)
+        cached = rec.cold_start_cache.get(key)
+        if cached is not None:
+            return cached
+
+        # Single-flight: corutinele care cer același set de genuri așteaptă prima cerere
+        future = self.cold_start_inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch_cold_start(list(key[0]), count))
+            self.cold_start_inflight[key] = future
+            future.add_done_callback(lambda _: self.cold_start_inflight.pop(key, None))
+
+        try:
+            result = await asyncio.shield(future)
+        except APIException as e:
+            print(f"⚠️ Eroare la recomandări cold start: {e}")
+            return []
+        rec.cold_start_cache.set(key, result)
+        return result
+
+    async def _fetch_cold_start(self, preferred_genres, count):
+        """Vezi MovieRecommender._fetch_cold_start."""
+        rec = self.recommender
+        filter_expression = rec._genre_filter(preferred_genres)
+
+        response = await self.client.send(rec._cold_start_request(count, filter_expression))
+        result = rec._format_recommendations(response['recomms'])
+
+        # Dacă nu am găsit destule filme cu filtrarea, încearcă fără filtru
+        if len(result) < count // 2 and filter_expression:
+            print(f"⚠️  Doar {len(result)} filme găsite cu genurile {preferred_genres}, încercăm fără filtru...")
+            response = await self.client.send(rec._cold_start_request(count, None))
+            result = rec._format_recommendations(response['recomms'])
+
+        return result
+
+    async def get_similar_movies(self, movie_id, count=10):
+        """Vezi MovieRecommender.get_similar_movies."""
+        rec = self.recommender
+        try:
+            response = await self.client.send(rec._similar_movies_request(movie_id, count))
+            return rec._format_recommendations(response['recomms'])
+        except APIException as e:
+            print(f"⚠️ Eroare la găsirea filmelor similare: {e}")
+            return []
+
+    async def add_rating(self, user_id, movie_id, rating, timestamp=None):
+        """Vezi MovieRecommender.add_rating."""
+        await self.client.send(self.recommender._rating_request(user_id, movie_id, rating, timestamp))
+        self.recommender.recommendation_cache.invalidate_tag(str(user_id))
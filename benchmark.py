@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Script pentru măsurarea performanței pipeline-ului de date
+
+Compară implementările optimizate din data_loader cu variantele
+originale, pe fișierele din config.DATA_DIR (ideal dataset-ul Kaggle complet),
+și verifică faptul că rezultatele sunt identice.
+
+Utilizare:
+    python benchmark.py parsers            # load_keywords / load_credits
+    python benchmark.py parsers --repeat 3
+    python benchmark.py prepare            # prepare_movies_for_recombee
+    python benchmark.py memory             # DataFrame-ul combinat vs MovieStore
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+from data_loader import (
+    load_movies_metadata, load_keywords, load_credits,
+    load_merged_movies, prepare_movies_for_recombee
+)
+from movie_store import LIST_COLUMNS, STR_COLUMNS, MovieStore
+import config
+
+
+def time_call(func, repeat=1):
+    """Rulează func de `repeat` ori și returnează (cel mai bun timp, rezultat)."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def report(name, baseline_time, optimized_time):
+    """Afișează o linie de rezultat pentru o comparație."""
+    speedup = baseline_time / optimized_time if optimized_time > 0 else float('inf')
+    print(f"   {name:<24} original: {baseline_time:8.2f}s   "
+          f"optimizat: {optimized_time:8.2f}s   speedup: {speedup:6.1f}x")
+
+
+def benchmark_parsers(args):
+    """Parsarea coloanelor serializate: ast.literal_eval vs extragere directă."""
+    cases = [
+        ('load_movies_metadata', config.MOVIES_METADATA_PATH, load_movies_metadata),
+        ('load_keywords', config.KEYWORDS_PATH, load_keywords),
+        ('load_credits', config.CREDITS_PATH, load_credits),
+    ]
+
+    results = []
+    for name, filepath, loader in cases:
+        if not os.path.exists(filepath):
+            print(f"⚠️  {filepath} lipsește - sar peste {name}")
+            continue
+
+        baseline_time, baseline = time_call(lambda: loader(fast=False), args.repeat)
+        optimized_time, optimized = time_call(lambda: loader(fast=True), args.repeat)
+
+        pd.testing.assert_frame_equal(baseline, optimized)
+        results.append((name, baseline_time, optimized_time))
+
+    print("\n" + "=" * 60)
+    print("📊 PARSARE COLOANE (rezultate identice ✅)")
+    print("=" * 60)
+    for name, baseline_time, optimized_time in results:
+        report(name, baseline_time, optimized_time)
+
+
+def prepare_movies_rowwise(movies_df):
+    """Implementarea originală cu iterrows(), păstrată ca referință."""
+    movies_df = movies_df[
+        movies_df['title'].notna() & 
+        (movies_df['title'] != '') & 
+        (movies_df['title'].str.strip() != '')
+    ].copy()
+    
+    movies = []
+    for _, row in movies_df.iterrows():
+        genres = row.get('genre_names', [])
+        if not isinstance(genres, list):
+            genres = []
+        
+        keywords = []
+        if 'keyword_names' in row and isinstance(row['keyword_names'], list):
+            keywords = row['keyword_names'][:10]
+        
+        director = ''
+        if 'director' in row and pd.notna(row.get('director')):
+            director = str(row['director'])
+        
+        actors = []
+        if 'actors' in row and isinstance(row['actors'], list):
+            actors = row['actors'][:5]
+        
+        release_date = str(row.get('release_date', '')) if pd.notna(row.get('release_date')) else ''
+        poster_path = str(row.get('poster_path', '')) if pd.notna(row.get('poster_path')) else ''
+        
+        title = str(row.get('title', '')).strip()
+        if not title or title == '' or title == 'nan':
+            continue
+        
+        movies.append({
+            'item_id': str(row['id']),
+            'title': title,
+            'overview': str(row.get('overview', ''))[:1000] if pd.notna(row.get('overview')) else '',
+            'genres': genres,
+            'keywords': keywords,
+            'director': director,
+            'actors': actors,
+            'release_date': release_date,
+            'vote_average': float(row.get('vote_average', 0)) if pd.notna(row.get('vote_average')) else 0.0,
+            'vote_count': int(row.get('vote_count', 0)) if pd.notna(row.get('vote_count')) else 0,
+            'runtime': int(row.get('runtime', 0)) if pd.notna(row.get('runtime')) else 0,
+            'poster_path': poster_path,
+        })
+    
+    return movies
+
+
+def benchmark_prepare(args):
+    """prepare_movies_for_recombee: iterrows() vs conversie pe coloane."""
+    movies = load_merged_movies()
+
+    baseline_time, baseline = time_call(lambda: prepare_movies_rowwise(movies), args.repeat)
+    optimized_time, optimized = time_call(lambda: prepare_movies_for_recombee(movies), args.repeat)
+
+    assert baseline == optimized, "Rezultatele diferă!"
+
+    print("\n" + "=" * 60)
+    print(f"📊 PREGĂTIRE FILME PENTRU RECOMBEE ({len(optimized):,} filme, rezultate identice ✅)")
+    print("=" * 60)
+    report('prepare_movies', baseline_time, optimized_time)
+
+
+def frame_memory(df):
+    """
+    Memoria pe coloane a unui DataFrame, în bytes. Pentru coloanele cu liste
+    se adaugă și string-urile din liste (memory_usage(deep=True) numără doar
+    obiectele list).
+    """
+    usage = df.memory_usage(deep=True, index=False)
+    for col in LIST_COLUMNS:
+        if col in df:
+            usage[col] += sum(sys.getsizeof(value) for values in df[col] for value in values)
+    return usage
+
+
+def benchmark_memory(args):
+    """Memoria corpusului: DataFrame-ul combinat vs MovieStore (reprezentarea compactă)."""
+    movies = load_merged_movies()
+    elapsed, store = time_call(lambda: MovieStore(movies), args.repeat)
+
+    # MovieStore trebuie să reconstruiască exact aceleași rânduri (fără *_str)
+    expected = movies.drop(columns=[c for c in STR_COLUMNS if c in movies]).reset_index(drop=True)
+    restored = store.to_frame()
+    for col in expected.columns:
+        assert expected[col].tolist() == restored[col].tolist(), f"Coloana {col} diferă!"
+
+    baseline = frame_memory(movies)
+    compact = store.memory_usage()
+
+    print("\n" + "=" * 60)
+    print(f"📊 MEMORIE CORPUS ({len(movies):,} filme, rânduri identice ✅)")
+    print("=" * 60)
+    print("   DataFrame combinat:")
+    for col, size in baseline.items():
+        print(f"      {col:<20} {size / 2**20:10.2f} MB")
+    print("   MovieStore:")
+    for name, size in compact.items():
+        print(f"      {name:<20} {size / 2**20:10.2f} MB")
+
+    baseline_total = baseline.sum()
+    compact_total = sum(compact.values())
+    print(f"\n   {'total':<24} original: {baseline_total / 2**20:8.2f}MB   "
+          f"compact: {compact_total / 2**20:8.2f}MB   reducere: {baseline_total / compact_total:6.1f}x")
+    print(f"   {'construcție MovieStore':<24} {elapsed:8.2f}s")
+
+
+def main():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        '--repeat',
+        type=int,
+        default=1,
+        help='De câte ori se repetă fiecare măsurătoare (se raportează cel mai bun timp)'
+    )
+
+    parser = argparse.ArgumentParser(
+        description='Benchmark pentru pipeline-ul de date al sistemului de recomandare'
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser(
+        'parsers',
+        parents=[common],
+        help='Compară ast.literal_eval cu extragerea directă a câmpurilor'
+    ).set_defaults(func=benchmark_parsers)
+
+    subparsers.add_parser(
+        'prepare',
+        parents=[common],
+        help='Compară prepare_movies_for_recombee cu varianta originală (iterrows)'
+    ).set_defaults(func=benchmark_prepare)
+
+    subparsers.add_parser(
+        'memory',
+        parents=[common],
+        help='Compară memoria DataFrame-ului combinat cu MovieStore'
+    ).set_defaults(func=benchmark_memory)
+
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"⏱️  BENCHMARK: {args.command} (DATA_DIR={config.DATA_DIR})")
+    print("=" * 60)
+
+    try:
+        args.func(args)
+    except FileNotFoundError as e:
+        print(f"❌ Fișierele de date nu au fost găsite: {e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+"""
+Cache Module - Cache-uri în memorie (TTL + LRU) și încărcare lazy single-flight
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+_MISSING = object()
+
+
+class _Flight:
+    """O încărcare în curs pentru o cheie (rezultatul e împărțit între thread-uri)."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """
+    Cache thread-safe cu expirare (TTL) și evacuare LRU.
+
+    Fiecare intrare poate avea un tag (de ex. user_id), astfel încât toate
+    intrările unui utilizator să poată fi invalidate deodată. Hit-urile și
+    miss-urile sunt numărate pentru monitorizare (stats()).
+    """
+
+    def __init__(self, maxsize, ttl, name='cache'):
+        """
+        Args:
+            maxsize: Numărul maxim de intrări (cele mai vechi folosite sunt evacuate)
+            ttl: Durata de viață a unei intrări, în secunde
+            name: Numele cache-ului în statistici
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> (expires_at, value, tag)
+        self.tags = {}  # tag -> set de chei
+        self.inflight = {}  # key -> _Flight (încărcări în curs, vezi get_or_load)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """Valoarea pentru cheie, sau default dacă lipsește / a expirat."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return default
+
+    def get_or_load(self, key, loader, tag=None):
+        """
+        Valoarea pentru cheie; la miss o calculează cu loader() și o salvează.
+
+        Single-flight: dacă mai multe thread-uri cer aceeași cheie lipsă în
+        același timp, doar primul apelează loader(), iar celelalte așteaptă
+        rezultatul lui (sau primesc aceeași excepție).
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        with self.lock:
+            # Între timp un alt thread poate să fi terminat încărcarea
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+            flight = self.inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.inflight[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+            self.set(key, flight.value, tag=tag)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.inflight[key]
+            flight.done.set()
+
+    def set(self, key, value, tag=None):
+        """Adaugă / înlocuiește o intrare, evacuând cea mai veche dacă e nevoie."""
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (time.monotonic() + self.ttl, value, tag)
+            if tag is not None:
+                self.tags.setdefault(tag, set()).add(key)
+            while len(self.entries) > self.maxsize:
+                self._remove(next(iter(self.entries)))
+
+    def invalidate(self, key):
+        """Șterge o intrare (dacă există)."""
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+
+    def invalidate_tag(self, tag):
+        """Șterge toate intrările cu tag-ul dat."""
+        with self.lock:
+            for key in list(self.tags.get(tag, ())):
+                self._remove(key)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.tags.clear()
+
+    def _remove(self, key):
+        _, _, tag = self.entries.pop(key)
+        if tag is not None:
+            keys = self.tags.get(tag)
+            keys.discard(key)
+            if not keys:
+                del self.tags[tag]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self):
+        """Statistici pentru monitorizare: mărime, hit-uri, miss-uri, hit ratio."""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'name': self.name,
+                'size': len(self.entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class LazyLoader:
+    """
+    O resursă încărcată la prima folosire, o singură dată per proces.
+
+    Single-flight: thread-urile care o cer în timpul încărcării așteaptă
+    același rezultat în loc să o încarce fiecare. Dacă încărcarea eșuează,
+    excepția ajunge la toți cei care așteptau, iar următorul get() reîncearcă.
+    Starea (idle / loading / ready / failed) e expusă pentru readiness.
+    """
+
+    def __init__(self, loader, name='resource'):
+        """
+        Args:
+            loader: Funcția fără argumente care construiește resursa
+            name: Numele resursei în status()
+        """
+        self.loader = loader
+        self.name = name
+        self.lock = threading.Lock()
+        self.value = None
+        self.state = 'idle'
+        self.exception = None
+        self.load_seconds = None
+        self.flight = None  # încărcarea în curs (_Flight), dacă există
+
+    def get(self):
+        """Resursa (încărcată acum dacă e nevoie)."""
+        if self.state == 'ready':
+            return self.value
+
+        with self.lock:
+            # Un alt thread poate să fi terminat încărcarea cât am așteptat
+            if self.state == 'ready':
+                return self.value
+            flight = self.flight
+            leader = flight is None
+            if leader:
+                flight = self.flight = _Flight()
+                self.state = 'loading'
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        start = time.monotonic()
+        try:
+            flight.value = self.loader()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self.lock:
+                self.load_seconds = round(time.monotonic() - start, 3)
+                if flight.error is None:
+                    self.value = flight.value
+                    self.exception = None
+                    self.state = 'ready'
+                else:
+                    self.exception = flight.error
+                    self.state = 'failed'
+                self.flight = None
+            flight.done.set()
+        return flight.value
+
+    @property
+    def ready(self):
+        return self.state == 'ready'
+
+    def status(self):
+        """Starea încărcării, pentru monitorizare / readiness."""
+        return {
+            'name': self.name,
+            'state': self.state,
+            'error': f"{type(self.exception).__name__}: {self.exception}" if self.exception else None,
+            'load_seconds': self.load_seconds,
+        }
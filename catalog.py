@@ -0,0 +1,102 @@
+"""
+Catalog Module - Catalog local read-through pentru detaliile filmelor
+"""
+from cache import TTLCache
+import config
+
+
+def movie_details(item_id, values):
+    """
+    Detaliile unui film (formatul din /api/movie) din proprietățile lui
+    Recombee (GetItemValues sau return_properties).
+    """
+    def text(name, default=''):
+        value = values.get(name)
+        return value if isinstance(value, str) and value else default
+
+    def number(name, cast):
+        try:
+            value = cast(values.get(name) or 0)
+        except (TypeError, ValueError):
+            return cast(0)
+        return value if value == value else cast(0)  # NaN -> 0
+
+    genres = values.get('genres')
+    return {
+        'id': str(item_id),
+        'title': text('title', 'Unknown'),
+        'overview': text('overview'),
+        'genres': list(genres) if isinstance(genres, (list, tuple)) else [],
+        'director': text('director'),
+        'vote_average': number('vote_average', float),
+        'vote_count': number('vote_count', int),
+        'runtime': number('runtime', int),
+        'release_date': text('release_date'),
+        'poster_path': text('poster_path'),
+    }
+
+
+class ItemCatalog:
+    """
+    Catalog local cu detaliile filmelor, consultat înaintea Recombee.
+
+    Intrările expiră după un TTL și sunt evacuate LRU. Catalogul se umple din
+    payload-urile return_properties ale recomandărilor (add) și, la un miss,
+    din sursele date lui get(), în ordine (de ex. dataset-ul local, apoi
+    GetItemValues). Id-urile negăsite în nicio sursă intră într-un cache
+    negativ, ca să nu fie căutate din nou la fiecare cerere.
+    """
+
+    def __init__(self, maxsize=None, ttl=None, negative_ttl=None):
+        self.items = TTLCache(
+            maxsize or config.ITEM_CATALOG_SIZE,
+            ttl or config.ITEM_CATALOG_TTL,
+            name='item_catalog'
+        )
+        self.missing = TTLCache(
+            maxsize or config.ITEM_CATALOG_SIZE,
+            negative_ttl or config.ITEM_CATALOG_NEGATIVE_TTL,
+            name='item_catalog_missing'
+        )
+
+    def add(self, item_id, values):
+        """Adaugă / actualizează un film din proprietățile lui Recombee."""
+        movie = movie_details(item_id, values)
+        self.items.set(movie['id'], movie)
+        self.missing.invalidate(movie['id'])
+        return movie
+
+    def get(self, item_id, sources=()):
+        """
+        Detaliile unui film, sau None dacă nu există.
+
+        Args:
+            item_id: ID-ul filmului
+            sources: Funcții item_id -> proprietăți (dict) sau None dacă filmul
+                     nu e găsit acolo; o excepție înseamnă sursă indisponibilă
+                     (atunci rezultatul negativ nu este memorat)
+        """
+        item_id = str(item_id)
+        movie = self.items.get(item_id)
+        if movie is not None:
+            return movie
+        if self.missing.get(item_id) is not None:
+            return None
+
+        unavailable = False
+        for source in sources:
+            try:
+                values = source(item_id)
+            except Exception as e:
+                print(f"⚠️  Catalog: sursă indisponibilă pentru filmul {item_id}: {e}")
+                unavailable = True
+                continue
+            if values is not None:
+                return self.add(item_id, values)
+
+        if not unavailable:
+            self.missing.set(item_id, True)
+        return None
+
+    def stats(self):
+        return [self.items.stats(), self.missing.stats()]
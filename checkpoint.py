@@ -0,0 +1,103 @@
+"""
+Checkpoint Module - Reluarea încărcării în masă în Recombee după o întrerupere
+"""
+import json
+import os
+import threading
+
+
+class LoadCheckpoint:
+    """
+    Fișier de checkpoint pentru load_data.py.
+
+    Pentru fiecare fază ('movies', 'ratings') reține câte elemente (filme /
+    rating-uri, în ordinea din sursă) au fost confirmate de Recombee, plus
+    amprenta fișierelor sursă. Batch-urile se termină în orice ordine (sunt
+    trimise în paralel), așa că offset-ul salvat avansează doar peste prefixul
+    continuu de batch-uri confirmate.
+    """
+
+    def __init__(self, path, sources, resume=False):
+        """
+        Args:
+            path: Calea fișierului de checkpoint (JSON)
+            sources: Dict serializabil care identifică datele de intrare
+                     (amprentele fișierelor, limitele); un checkpoint salvat
+                     pentru alte surse este ignorat
+            resume: Dacă False, pornește de la zero (ignoră checkpoint-ul existent)
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        self.state = {'sources': sources, 'phases': {}}
+
+        if resume and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    saved = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Checkpoint-ul {path} nu poate fi citit: {e}")
+                saved = None
+
+            if saved and saved.get('sources') == sources:
+                self.state = saved
+                print(f"♻️  Reluare din checkpoint: {self.describe()}")
+            elif saved:
+                print("⚠️  Fișierele sursă s-au schimbat de la ultimul checkpoint - pornim de la zero")
+
+        self.save()
+
+    def describe(self):
+        """Rezumat scurt al progresului pe faze."""
+        parts = []
+        for phase, info in self.state['phases'].items():
+            status = 'complet' if info.get('done') else f"{info.get('offset', 0):,} confirmate"
+            parts.append(f"{phase}: {status}")
+        return ', '.join(parts) or 'nimic încărcat'
+
+    def _phase(self, phase):
+        return self.state['phases'].setdefault(phase, {'offset': 0, 'done': False})
+
+    def offset(self, phase):
+        """Numărul de elemente deja confirmate pentru o fază."""
+        return self._phase(phase)['offset']
+
+    def is_done(self, phase):
+        """True dacă faza a fost încărcată complet."""
+        return self._phase(phase)['done']
+
+    def mark_done(self, phase):
+        """Marchează faza ca fiind încărcată complet."""
+        with self.lock:
+            self._phase(phase)['done'] = True
+            self.save()
+
+    def tracker(self, phase):
+        """
+        Callback on_batch_done(index, size) pentru uploader-ele din
+        MovieRecommender. Indexul batch-urilor pornește de la 0 pentru
+        elementele de după offset-ul curent.
+        """
+        completed = {}
+        state = {'next_index': 0}
+
+        def on_batch_done(index, size):
+            with self.lock:
+                completed[index] = size
+                advanced = False
+                while state['next_index'] in completed:
+                    self._phase(phase)['offset'] += completed.pop(state['next_index'])
+                    state['next_index'] += 1
+                    advanced = True
+                if advanced:
+                    self.save()
+
+        return on_batch_done
+
+    def save(self):
+        """Scrie atomic checkpoint-ul pe disc."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path + '.tmp', 'w') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(self.path + '.tmp', self.path)
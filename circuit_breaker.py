@@ -0,0 +1,170 @@
+"""
+Circuit Breaker Module - Protecție pentru cererile Recombee din request path
+
+Când Recombee răspunde greu sau cu erori, fiecare cerere ar aștepta tot
+timeout-ul. Circuit breaker-ul urmărește ultimele cereri (per tip de cerere):
+peste un prag de erori sau de cereri lente se deschide, iar cererile eșuează
+imediat cu CircuitOpenError, ca apelantul să servească un rezultat local.
+"""
+import threading
+import time
+from collections import deque
+
+import requests as requests_lib
+from recombee_api_client.api_requests import Batch
+from recombee_api_client.exceptions import APIException, ApiTimeoutException, ResponseException
+
+import config
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(APIException):
+    """Circuitul e deschis: cererea nu a fost trimisă la Recombee."""
+
+    def __init__(self, name, retry_in):
+        super().__init__(f"Circuit deschis pentru {name} (reîncercare în {retry_in:.0f}s)")
+        self.name = name
+        self.retry_in = retry_in
+
+
+def is_upstream_failure(error):
+    """Erorile care arată un Recombee degradat: timeout, rețea, 429, 5xx (nu și 404 / 400)."""
+    if isinstance(error, (ApiTimeoutException, requests_lib.exceptions.RequestException)):
+        return True
+    if isinstance(error, ResponseException):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker cu fereastră glisantă pe ultimele `window` cereri.
+
+    closed -> open: în fereastră sunt cel puțin min_calls cereri, iar rata
+    erorilor sau a cererilor mai lente de slow_call secunde atinge
+    failure_rate. open -> half_open după open_seconds: o singură cerere de
+    probă trece, celelalte eșuează imediat. Proba reușită închide circuitul,
+    cea eșuată îl redeschide.
+    """
+
+    def __init__(self, name, window=None, min_calls=None, failure_rate=None,
+                 slow_call=None, open_seconds=None):
+        self.name = name
+        self.window = window or config.CIRCUIT_BREAKER_WINDOW
+        self.min_calls = min_calls or config.CIRCUIT_BREAKER_MIN_CALLS
+        self.failure_rate = failure_rate or config.CIRCUIT_BREAKER_FAILURE_RATE
+        self.slow_call = slow_call or config.CIRCUIT_BREAKER_SLOW_CALL
+        self.open_seconds = open_seconds or config.CIRCUIT_BREAKER_OPEN_SECONDS
+
+        self.lock = threading.Lock()
+        self.state = CLOSED
+        self.calls = deque(maxlen=self.window)  # (eșuată, lentă)
+        self.opened_at = None
+        self.probing = False
+        self.counters = {'calls': 0, 'failures': 0, 'slow': 0, 'rejected': 0, 'opened': 0}
+
+    def before_call(self):
+        """
+        Verifică dacă o cerere poate pleca.
+
+        Raises:
+            CircuitOpenError: Dacă circuitul e deschis (sau proba e deja în zbor)
+        """
+        with self.lock:
+            if self.state == OPEN:
+                elapsed = time.monotonic() - self.opened_at
+                if elapsed < self.open_seconds:
+                    self.counters['rejected'] += 1
+                    raise CircuitOpenError(self.name, self.open_seconds - elapsed)
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN:
+                if self.probing:
+                    self.counters['rejected'] += 1
+                    raise CircuitOpenError(self.name, 0)
+                self.probing = True
+
+    def after_call(self, latency, error=None):
+        """Înregistrează rezultatul unei cereri trimise după before_call()."""
+        failed = error is not None and is_upstream_failure(error)
+        slow = latency >= self.slow_call
+        with self.lock:
+            self.counters['calls'] += 1
+            self.counters['failures'] += failed
+            self.counters['slow'] += slow
+
+            if self.state == HALF_OPEN:
+                self.probing = False
+                if failed or slow:
+                    self._open()
+                else:
+                    print(f"✅ Circuit {self.name}: închis (Recombee răspunde din nou)")
+                    self.state = CLOSED
+                    self.calls.clear()
+                return
+
+            self.calls.append((failed, slow))
+            if self.state == CLOSED and len(self.calls) >= self.min_calls:
+                failures = sum(f for f, _ in self.calls) / len(self.calls)
+                slow_calls = sum(s for _, s in self.calls) / len(self.calls)
+                if max(failures, slow_calls) >= self.failure_rate:
+                    self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.calls.clear()
+        self.counters['opened'] += 1
+        print(f"🔌 Circuit {self.name}: deschis pentru {self.open_seconds:g}s "
+              f"(erori / latență mare la Recombee)")
+
+    def stats(self):
+        with self.lock:
+            return {'name': self.name, 'state': self.state, **self.counters}
+
+
+class BreakerClient:
+    """
+    Învelește RecombeeClient: fiecare send() trece prin circuit breaker-ul
+    tipului de cerere (un Batch folosește tipul ultimei sub-cereri, de
+    exemplu RecommendItemsToUser). Restul atributelor vin din clientul original.
+    """
+
+    def __init__(self, client, **options):
+        self.client = client
+        self.options = options
+        self.breakers = {}
+        self.lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    @staticmethod
+    def request_type(request):
+        if isinstance(request, Batch) and request.requests:
+            request = request.requests[-1]
+        return type(request).__name__
+
+    def breaker(self, name):
+        breaker = self.breakers.get(name)
+        if breaker is None:
+            with self.lock:
+                breaker = self.breakers.setdefault(name, CircuitBreaker(name, **self.options))
+        return breaker
+
+    def send(self, request):
+        breaker = self.breaker(self.request_type(request))
+        breaker.before_call()
+        start = time.monotonic()
+        try:
+            response = self.client.send(request)
+        except BaseException as e:
+            breaker.after_call(time.monotonic() - start, e)
+            raise
+        breaker.after_call(time.monotonic() - start)
+        return response
+
+    def stats(self):
+        return [breaker.stats() for _, breaker in sorted(self.breakers.items())]
@@ -11,6 +11,23 @@ RECOMBEE_DATABASE_ID = os.getenv('RECOMBEE_DATABASE_ID', 'your-database-id')
 RECOMBEE_PRIVATE_TOKEN = os.getenv('RECOMBEE_PRIVATE_TOKEN', 'your-private-token')
 RECOMBEE_REGION = os.getenv('RECOMBEE_REGION', 'eu-west')  # or 'us-west', 'ap-se'
 
+# Bugetul de timp al unui apel din request path (ms), împărțit între cererile la Recombee
+RECOMBEE_REQUEST_TIMEOUT = int(os.getenv('RECOMBEE_REQUEST_TIMEOUT', 5000))
+# Sub acest buget rămas (ms) nu mai trimitem nicio cerere
+RECOMBEE_MIN_REQUEST_TIMEOUT = int(os.getenv('RECOMBEE_MIN_REQUEST_TIMEOUT', 100))
+# Munca opțională (GetUserValues, fallback-ul fără filtru) doar cu cel puțin atât buget (ms)
+RECOMBEE_OPTIONAL_MIN_BUDGET = int(os.getenv('RECOMBEE_OPTIONAL_MIN_BUDGET', 1000))
+
+# Încărcare în masă (load_data.py): Batch-uri în paralel, limitate ca rată
+RECOMBEE_UPLOAD_CONCURRENCY = int(os.getenv('RECOMBEE_UPLOAD_CONCURRENCY', 4))
+RECOMBEE_BATCH_RATE_LIMIT = float(os.getenv('RECOMBEE_BATCH_RATE_LIMIT', 10))  # Batch-uri / secundă
+RECOMBEE_BATCH_RETRIES = int(os.getenv('RECOMBEE_BATCH_RETRIES', 3))
+RECOMBEE_BATCH_TIMEOUT = int(os.getenv('RECOMBEE_BATCH_TIMEOUT', 30000))  # ms per Batch
+RECOMBEE_BATCH_MAX_BYTES = int(os.getenv('RECOMBEE_BATCH_MAX_BYTES', 5 * 1024 * 1024))
+
+# Clientul asyncio (async_recombee_client.py): conexiuni HTTP simultane
+RECOMBEE_ASYNC_MAX_CONNECTIONS = int(os.getenv('RECOMBEE_ASYNC_MAX_CONNECTIONS', 1000))
+
 # Data Paths (relative to project root)
 DATA_DIR = os.getenv('DATA_DIR', 'dataset')
 
@@ -30,16 +47,77 @@ MOVIES_METADATA_PATH = os.path.join(DATA_DIR, 'movies_metadata.csv')
 KEYWORDS_PATH = os.path.join(DATA_DIR, 'keywords.csv')
 CREDITS_PATH = os.path.join(DATA_DIR, 'credits.csv')
 RATINGS_PATH = os.path.join(DATA_DIR, 'ratings_small.csv')  # Folosim versiunea mică pentru demo
+RATINGS_FULL_PATH = os.path.join(DATA_DIR, 'ratings.csv')  # 26M rating-uri, se încarcă în streaming
+RATINGS_CHUNK_SIZE = int(os.getenv('RATINGS_CHUNK_SIZE', 100000))
+
+# Cache local (Parquet) pentru corpusul de filme deja parsat și combinat
+CACHE_DIR = os.getenv('CACHE_DIR', os.path.join(DATA_DIR, '.cache'))
+
+# MovieStore partajat între procesele worker: snapshot mapat read-only (vezi movie_store.py)
+MOVIE_STORE_SHARED = os.getenv('MOVIE_STORE_SHARED', 'False').lower() == 'true'
+MOVIE_STORE_DIR = os.getenv('MOVIE_STORE_DIR', os.path.join(CACHE_DIR, 'movie_store'))
+
+# Write-behind pentru /api/rate: rating-urile sunt jurnalizate local și trimise în Batch-uri
+RATING_BUFFER_ENABLED = os.getenv('RATING_BUFFER_ENABLED', 'True').lower() == 'true'
+RATING_BUFFER_DIR = os.getenv('RATING_BUFFER_DIR', os.path.join(CACHE_DIR, 'pending_ratings'))
+RATING_BUFFER_BATCH_SIZE = int(os.getenv('RATING_BUFFER_BATCH_SIZE', 100))
+RATING_BUFFER_MAX_DELAY = float(os.getenv('RATING_BUFFER_MAX_DELAY', 2.0))  # secunde
+RATING_BUFFER_MAX_PENDING = int(os.getenv('RATING_BUFFER_MAX_PENDING', 10000))
+RATING_BUFFER_PUT_TIMEOUT = float(os.getenv('RATING_BUFFER_PUT_TIMEOUT', 0.5))  # secunde
+RATING_BUFFER_FSYNC = os.getenv('RATING_BUFFER_FSYNC', 'False').lower() == 'true'
+
+# Jurnal local append-only al interacțiunilor (rating-uri, vizualizări, utilizatori noi)
+INTERACTION_LOG_ENABLED = os.getenv('INTERACTION_LOG_ENABLED', 'True').lower() == 'true'
+INTERACTION_LOG_DIR = os.getenv('INTERACTION_LOG_DIR', os.path.join(CACHE_DIR, 'interactions'))
+INTERACTION_LOG_SEGMENT_BYTES = int(os.getenv('INTERACTION_LOG_SEGMENT_BYTES', 64 * 1024 * 1024))
+INTERACTION_LOG_FSYNC = os.getenv('INTERACTION_LOG_FSYNC', 'False').lower() == 'true'
+
+# Checkpoint pentru reluarea load_data.py după o întrerupere (--resume)
+LOAD_CHECKPOINT_PATH = os.getenv('LOAD_CHECKPOINT_PATH', os.path.join(CACHE_DIR, 'load_checkpoint.json'))
 
 # Application Settings
 DEBUG = os.getenv('DEBUG', 'True').lower() == 'true'
 PORT = int(os.getenv('PORT', 5001))  # 5001 pentru că 5000 e ocupat de AirPlay pe Mac
 HOST = os.getenv('HOST', '0.0.0.0')
+# Încălzire eager (cache de filme + cold start) la importul app.py, de ex. sub gunicorn
+APP_WARMUP = os.getenv('APP_WARMUP', 'False').lower() == 'true'
 
 # Recommendation Settings
 DEFAULT_NUM_RECOMMENDATIONS = 10
 MIN_RATING_FOR_LIKE = 3.5  # Rating >= this is considered a "like"
 
+# Cache local pentru recomandările per utilizator (invalidat la rating / view)
+RECOMMENDATION_CACHE_TTL = int(os.getenv('RECOMMENDATION_CACHE_TTL', 300))  # secunde
+RECOMMENDATION_CACHE_SIZE = int(os.getenv('RECOMMENDATION_CACHE_SIZE', 10000))
+# Ultimele recomandări servite, păstrate mai mult - fallback când Recombee e indisponibil
+RECOMMENDATION_STALE_TTL = int(os.getenv('RECOMMENDATION_STALE_TTL', 86400))  # secunde
+
+# Circuit breaker pe cererile Recombee din request path (câte unul per tip de cerere)
+CIRCUIT_BREAKER_ENABLED = os.getenv('CIRCUIT_BREAKER_ENABLED', 'True').lower() == 'true'
+CIRCUIT_BREAKER_WINDOW = int(os.getenv('CIRCUIT_BREAKER_WINDOW', 20))  # ultimele N cereri
+CIRCUIT_BREAKER_MIN_CALLS = int(os.getenv('CIRCUIT_BREAKER_MIN_CALLS', 10))
+CIRCUIT_BREAKER_FAILURE_RATE = float(os.getenv('CIRCUIT_BREAKER_FAILURE_RATE', 0.5))
+CIRCUIT_BREAKER_SLOW_CALL = float(os.getenv('CIRCUIT_BREAKER_SLOW_CALL', 2.0))  # secunde
+CIRCUIT_BREAKER_OPEN_SECONDS = float(os.getenv('CIRCUIT_BREAKER_OPEN_SECONDS', 30))
+
+# Hedging pentru citirile Recombee: după percentila latenței pleacă o cerere duplicată
+RECOMBEE_HEDGING_ENABLED = os.getenv('RECOMBEE_HEDGING_ENABLED', 'False').lower() == 'true'
+RECOMBEE_HEDGE_PERCENTILE = float(os.getenv('RECOMBEE_HEDGE_PERCENTILE', 95))
+RECOMBEE_HEDGE_BUDGET = float(os.getenv('RECOMBEE_HEDGE_BUDGET', 0.05))  # fracțiune din cereri
+RECOMBEE_HEDGE_MIN_DELAY = int(os.getenv('RECOMBEE_HEDGE_MIN_DELAY', 20))  # ms
+RECOMBEE_HEDGE_MAX_INFLIGHT = int(os.getenv('RECOMBEE_HEDGE_MAX_INFLIGHT', 64))
+
+# Preferințele utilizatorilor ținute local (evită GetUserValues la fiecare recomandare)
+USER_PREFERENCES_CACHE_TTL = int(os.getenv('USER_PREFERENCES_CACHE_TTL', 3600))  # secunde
+USER_PREFERENCES_CACHE_SIZE = int(os.getenv('USER_PREFERENCES_CACHE_SIZE', 100000))
+# Peste această rată de fallback, cererea fără filtru pleacă în același Batch
+FALLBACK_PREFETCH_THRESHOLD = float(os.getenv('FALLBACK_PREFETCH_THRESHOLD', 0.1))
+
+# Catalog local cu detaliile filmelor (/api/movie), înaintea GetItemValues
+ITEM_CATALOG_TTL = int(os.getenv('ITEM_CATALOG_TTL', 3600))  # secunde
+ITEM_CATALOG_SIZE = int(os.getenv('ITEM_CATALOG_SIZE', 50000))
+ITEM_CATALOG_NEGATIVE_TTL = int(os.getenv('ITEM_CATALOG_NEGATIVE_TTL', 300))  # id-uri necunoscute
+
 # Cold Start Settings
 POPULAR_MOVIES_COUNT = 20  # Number of popular movies to show new users
 GENRES_FOR_COLD_START = [
@@ -49,3 +127,7 @@ GENRES_FOR_COLD_START = [
     'Thriller', 'War', 'Western'
 ]
 
+# Recomandările cold start (per set de genuri), comune tuturor vizitatorilor noi
+COLD_START_CACHE_TTL = int(os.getenv('COLD_START_CACHE_TTL', 600))  # secunde
+COLD_START_CACHE_SIZE = int(os.getenv('COLD_START_CACHE_SIZE', 5000))
+
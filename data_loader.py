@@ -2,9 +2,15 @@
 Data Loader Module - Încărcarea și procesarea datelor din Kaggle Movies Dataset
 """
 import ast
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import partial
 import pandas as pd
 import numpy as np
-from tqdm import tqdm
 import config
 
 
@@ -25,10 +31,72 @@ def extract_names(obj_list, key='name', max_items=5):
     return [item.get(key, '') for item in obj_list[:max_items] if isinstance(item, dict)]
 
 
-def load_movies_metadata(filepath=None):
+# Literal Python de tip string, cu ghilimele simple sau duble (ca în repr())
+_STR_LITERAL = r"""('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")"""
+_NAME_RE = re.compile(r"'name': " + _STR_LITERAL)
+_DIRECTOR_RE = re.compile(r"'job': 'Director', 'name': " + _STR_LITERAL)
+
+
+def _decode_str_literal(literal):
+    """Decodează un literal string extras din repr(); escape-urile trec prin ast."""
+    if '\\' not in literal:
+        return literal[1:-1]
+    return ast.literal_eval(literal)
+
+
+def _is_list_literal(val):
+    """Verifică dacă celula arată ca o listă serializată (altfel folosim ast)."""
+    return isinstance(val, str) and val.startswith('[') and val.endswith(']')
+
+
+def fast_extract_names(val, max_items=5):
+    """
+    Echivalent cu extract_names(safe_literal_eval(val), max_items=max_items),
+    dar extrage doar valorile 'name' direct din string, fără a construi
+    lista completă de dicționare. Se oprește după primele max_items nume.
+    """
+    if not _is_list_literal(val):
+        return literal_extract_names(val, max_items=max_items)
+
+    names = []
+    for match in _NAME_RE.finditer(val):
+        if len(names) >= max_items:
+            break
+        names.append(_decode_str_literal(match.group(1)))
+    return names
+
+
+def fast_extract_director(val):
+    """
+    Returnează numele primului membru din crew cu job == 'Director',
+    căutând direct în string-ul brut (fără ast.literal_eval pe tot crew-ul).
+    """
+    if not _is_list_literal(val):
+        return literal_extract_director(val)
+
+    match = _DIRECTOR_RE.search(val)
+    if match:
+        return _decode_str_literal(match.group(1))
+    if "'Director'" in val:
+        # Ordine neobișnuită a cheilor - folosim parsarea completă
+        return literal_extract_director(val)
+    return ''
+
+
+def _first_director(crew):
+    """Primul regizor dintr-o listă de dicționare crew."""
+    return next((member['name'] for member in crew
+                 if isinstance(member, dict) and member.get('job') == 'Director'), '')
+
+
+def load_movies_metadata(filepath=None, fast=True):
     """
     Încarcă și procesează movies_metadata.csv
     
+    Args:
+        filepath: Calea către fișier
+        fast: Extrage numele genurilor direct din string (fără ast.literal_eval)
+        
     Returns:
         DataFrame cu coloanele: id, title, overview, genres, release_date, 
                                vote_average, vote_count, runtime, poster_path
@@ -70,8 +138,11 @@ def load_movies_metadata(filepath=None):
     
     # Procesăm genurile
     print("🎭 Procesare genuri...")
-    df['genres'] = df['genres'].apply(safe_literal_eval)
-    df['genre_names'] = df['genres'].apply(lambda x: extract_names(x))
+    if fast:
+        df['genre_names'] = df['genres'].apply(fast_extract_names)
+    else:
+        df['genres'] = df['genres'].apply(safe_literal_eval)
+        df['genre_names'] = df['genres'].apply(lambda x: extract_names(x))
     df['genres_str'] = df['genre_names'].apply(lambda x: ', '.join(x) if x else '')
     
     # Convertim valorile numerice
@@ -91,10 +162,59 @@ def load_movies_metadata(filepath=None):
     return result
 
 
-def load_keywords(filepath=None):
+def literal_extract_names(val, max_items=5):
+    """Varianta originală: ast.literal_eval pe toată celula, apoi extract_names."""
+    return extract_names(safe_literal_eval(val), max_items=max_items)
+
+
+def literal_extract_director(val):
+    """Varianta originală: ast.literal_eval pe tot crew-ul, apoi primul regizor."""
+    return _first_director(safe_literal_eval(val))
+
+
+def _map_chunk(func, values):
+    """Aplică func pe un chunk de valori (rulează în procesul worker)."""
+    return [func(val) for val in values]
+
+
+def _map_column(series, func, pool=None, workers=1):
+    """
+    Aplică func pe fiecare valoare din series.
+
+    Fără pool, rulează serial cu Series.apply. Cu pool, împarte rândurile în
+    chunk-uri, le procesează în paralel și le concatenează în ordinea inițială,
+    deci rezultatul este identic cu varianta serială.
+    """
+    if pool is None:
+        return series.apply(func)
+
+    values = series.tolist()
+    # Mai multe chunk-uri decât procese, pentru o încărcare echilibrată
+    chunk_size = max(1, -(-len(values) // (workers * 4)))
+    chunks = [values[i:i + chunk_size] for i in range(0, len(values), chunk_size)]
+
+    result = []
+    for chunk_result in pool.map(partial(_map_chunk, func), chunks):
+        result.extend(chunk_result)
+    return pd.Series(result, index=series.index, name=series.name)
+
+
+def _worker_pool(workers):
+    """Process pool pentru parsarea paralelă, sau un context gol dacă workers <= 1."""
+    if workers and workers > 1:
+        return ProcessPoolExecutor(max_workers=workers)
+    return nullcontext()
+
+
+def load_keywords(filepath=None, fast=True, workers=None):
     """
     Încarcă și procesează keywords.csv
     
+    Args:
+        filepath: Calea către fișier
+        fast: Extrage numele keywords direct din string (fără ast.literal_eval)
+        workers: Numărul de procese pentru parsare paralelă (None/1 = serial)
+        
     Returns:
         DataFrame cu coloanele: id, keywords
     """
@@ -104,8 +224,9 @@ def load_keywords(filepath=None):
     df = pd.read_csv(filepath)
     
     # Procesăm keywords
-    df['keywords'] = df['keywords'].apply(safe_literal_eval)
-    df['keyword_names'] = df['keywords'].apply(lambda x: extract_names(x))
+    names_parser = fast_extract_names if fast else literal_extract_names
+    with _worker_pool(workers) as pool:
+        df['keyword_names'] = _map_column(df['keywords'], names_parser, pool, workers)
     df['keywords_str'] = df['keyword_names'].apply(lambda x: ', '.join(x) if x else '')
     
     result = df[['id', 'keyword_names', 'keywords_str']].copy()
@@ -113,10 +234,16 @@ def load_keywords(filepath=None):
     return result
 
 
-def load_credits(filepath=None):
+def load_credits(filepath=None, fast=True, workers=None):
     """
     Încarcă și procesează credits.csv pentru a extrage regizori și actori.
     
+    Args:
+        filepath: Calea către fișier
+        fast: Extrage actorii și regizorul direct din string-urile brute,
+              fără a construi listele complete cast/crew cu ast.literal_eval
+        workers: Numărul de procese pentru parsare paralelă (None/1 = serial)
+        
     Returns:
         DataFrame cu coloanele: id, director, actors
     """
@@ -125,16 +252,19 @@ def load_credits(filepath=None):
     
     df = pd.read_csv(filepath)
     
-    # Procesăm cast (actori)
-    df['cast'] = df['cast'].apply(safe_literal_eval)
-    df['actors'] = df['cast'].apply(lambda x: extract_names(x, max_items=5))
-    df['actors_str'] = df['actors'].apply(lambda x: ', '.join(x) if x else '')
+    if fast:
+        actors_parser = partial(fast_extract_names, max_items=5)
+        director_parser = fast_extract_director
+    else:
+        actors_parser = partial(literal_extract_names, max_items=5)
+        director_parser = literal_extract_director
+    
+    with _worker_pool(workers) as pool:
+        # Procesăm cast (actori) și crew pentru a găsi regizorul
+        df['actors'] = _map_column(df['cast'], actors_parser, pool, workers)
+        df['director'] = _map_column(df['crew'], director_parser, pool, workers)
     
-    # Procesăm crew pentru a găsi regizorul
-    df['crew'] = df['crew'].apply(safe_literal_eval)
-    df['director'] = df['crew'].apply(lambda x: 
-        next((member['name'] for member in x 
-              if isinstance(member, dict) and member.get('job') == 'Director'), ''))
+    df['actors_str'] = df['actors'].apply(lambda x: ', '.join(x) if x else '')
     
     result = df[['id', 'director', 'actors', 'actors_str']].copy()
     print(f"✅ Încărcate credits pentru {len(result)} filme")
@@ -179,6 +309,58 @@ def load_ratings(filepath=None, sample_size=None):
     return df
 
 
+RATINGS_DTYPES = {
+    'userId': 'int32',
+    'movieId': 'int32',
+    'rating': 'float32',
+    'timestamp': 'UInt32',  # uint32 nullable - timestamp-ul lipsă rămâne <NA>
+}
+
+
+def iter_ratings(filepath=None, chunk_size=None, sample_size=None):
+    """
+    Citește ratings.csv în streaming, pe chunk-uri de dimensiune fixă.
+
+    Fiecare chunk are tipuri reduse (int32 pentru id-uri, float32 pentru
+    rating, uint32 pentru timestamp) și aceeași filtrare a rândurilor
+    invalide ca load_ratings, deci memoria rămâne limitată la un chunk
+    chiar și pentru ratings.csv complet (26M rânduri).
+
+    Args:
+        filepath: Calea către fișier
+        chunk_size: Numărul de rânduri per chunk (default: config.RATINGS_CHUNK_SIZE)
+        sample_size: Dacă e specificat, citește doar primele sample_size rânduri
+
+    Yields:
+        DataFrame cu coloanele: userId, movieId, rating, timestamp
+    """
+    filepath = filepath or config.RATINGS_PATH
+    chunk_size = chunk_size or config.RATINGS_CHUNK_SIZE
+    print(f"⭐ Streaming ratings din {filepath} (chunk-uri de {chunk_size:,} rânduri)...")
+
+    total = 0
+    filtered = 0
+    reader = pd.read_csv(filepath, chunksize=chunk_size, nrows=sample_size)
+    for chunk in reader:
+        initial_count = len(chunk)
+        chunk['userId'] = pd.to_numeric(chunk['userId'], errors='coerce')
+        chunk['movieId'] = pd.to_numeric(chunk['movieId'], errors='coerce')
+        # assign() întoarce un DataFrame nou: fără atribuire pe rezultatul lui dropna
+        chunk = chunk.dropna(subset=['userId', 'movieId']).assign(
+            rating=lambda df: pd.to_numeric(df['rating'], errors='coerce'),
+            timestamp=lambda df: pd.to_numeric(df['timestamp'], errors='coerce'),
+        )
+        chunk = chunk.astype(RATINGS_DTYPES)
+
+        filtered += initial_count - len(chunk)
+        total += len(chunk)
+        yield chunk
+
+    if filtered > 0:
+        print(f"⚠️  Filtrate {filtered} rating-uri invalide (userId sau movieId lipsă)")
+    print(f"✅ Citite {total:,} ratings în streaming")
+
+
 def merge_movie_data(movies_df, keywords_df=None, credits_df=None):
     """
     Combină toate datele despre filme într-un singur DataFrame.
@@ -207,10 +389,252 @@ def merge_movie_data(movies_df, keywords_df=None, credits_df=None):
     return result
 
 
-def prepare_movies_for_recombee(movies_df):
+# ==================== CACHE PARQUET ====================
+
+MOVIES_CACHE_VERSION = 1
+MOVIES_CACHE_FILE = 'movies_merged.parquet'
+MOVIES_CACHE_MANIFEST = 'movies_merged.json'
+
+# Coloanele care conțin liste Python (se reconstruiesc ca list, nu np.ndarray)
+LIST_COLUMNS = ('genre_names', 'keyword_names', 'actors')
+
+
+def _file_hash(filepath, chunk_size=1 << 20):
+    """Calculează hash-ul (blake2b) al conținutului unui fișier."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_fingerprint(filepath, previous=None):
+    """
+    Amprenta unui fișier sursă: dimensiune, mtime și hash.
+
+    Hash-ul (costisitor pentru credits.csv) se recalculează doar dacă
+    dimensiunea sau mtime-ul diferă de amprenta anterioară.
+    """
+    if not os.path.exists(filepath):
+        return None
+
+    stat = os.stat(filepath)
+    fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    if (previous and previous.get('size') == fingerprint['size']
+            and previous.get('mtime_ns') == fingerprint['mtime_ns']):
+        fingerprint['hash'] = previous.get('hash')
+    else:
+        fingerprint['hash'] = _file_hash(filepath)
+    return fingerprint
+
+
+def _movies_sources():
+    """Fișierele din care se construiește corpusul combinat."""
+    return {
+        'movies_metadata': config.MOVIES_METADATA_PATH,
+        'keywords': config.KEYWORDS_PATH,
+        'credits': config.CREDITS_PATH,
+    }
+
+
+def movies_sources_fingerprint():
+    """Amprentele curente ale fișierelor sursă ale corpusului."""
+    return {name: source_fingerprint(path) for name, path in _movies_sources().items()}
+
+
+def check_movies_sources(cached_sources):
+    """
+    Compară amprentele salvate cu fișierele sursă curente.
+
+    Returns:
+        Amprentele curente, sau None dacă vreun fișier s-a schimbat
+    """
+    current_sources = {}
+    for name, filepath in _movies_sources().items():
+        previous = cached_sources.get(name)
+        current = source_fingerprint(filepath, previous)
+        if current is None or previous is None:
+            if current != previous:
+                return None
+        elif current['hash'] != previous.get('hash'):
+            return None
+        current_sources[name] = current
+    return current_sources
+
+
+def _read_movies_cache(cache_dir):
+    """
+    Încarcă corpusul din cache dacă este valid pentru fișierele sursă curente.
+
+    Returns:
+        DataFrame sau None dacă cache-ul lipsește / este invalid
+    """
+    cache_path = os.path.join(cache_dir, MOVIES_CACHE_FILE)
+    manifest_path = os.path.join(cache_dir, MOVIES_CACHE_MANIFEST)
+    if not (os.path.exists(cache_path) and os.path.exists(manifest_path)):
+        return None
+
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if manifest.get('version') != MOVIES_CACHE_VERSION:
+        return None
+
+    cached_sources = manifest.get('sources', {})
+    current_sources = check_movies_sources(cached_sources)
+    if current_sources is None:
+        return None
+
+    try:
+        import pyarrow.parquet as pq
+        table = pq.read_table(cache_path)
+    except Exception as e:
+        print(f"⚠️  Cache-ul de filme nu poate fi citit: {e}")
+        return None
+
+    list_columns = [c for c in LIST_COLUMNS if c in table.column_names]
+    df = table.drop(list_columns).to_pandas()
+    for col in list_columns:
+        df[col] = table.column(col).to_pylist()
+
+    # Parquet returnează None pentru string-urile lipsă; păstrăm NaN ca la CSV
+    for col in df.columns:
+        if col not in LIST_COLUMNS and df[col].dtype == object:
+            df[col] = df[col].where(df[col].notna(), np.nan)
+
+    # Fișierele au fost atinse (mtime nou) dar conținutul e identic:
+    # actualizăm manifestul ca să nu recalculăm hash-ul la fiecare pornire
+    if current_sources != cached_sources:
+        manifest['sources'] = current_sources
+        _write_manifest(manifest, cache_dir)
+
+    return df[manifest['columns']]
+
+
+def _write_manifest(manifest, cache_dir):
+    """Scrie atomic manifestul cache-ului."""
+    manifest_path = os.path.join(cache_dir, MOVIES_CACHE_MANIFEST)
+    with open(manifest_path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_path + '.tmp', manifest_path)
+
+
+def _write_movies_cache(df, cache_dir, sources):
+    """Scrie atomic corpusul combinat și manifestul în cache_dir."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("ℹ️  pyarrow nu este instalat - cache-ul de filme este dezactivat")
+        return False
+
+    os.makedirs(cache_dir, exist_ok=True)
+    cache_path = os.path.join(cache_dir, MOVIES_CACHE_FILE)
+
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        pq.write_table(table, cache_path + '.tmp')
+        os.replace(cache_path + '.tmp', cache_path)
+
+        _write_manifest({
+            'version': MOVIES_CACHE_VERSION,
+            'columns': list(df.columns),
+            'sources': sources,
+        }, cache_dir)
+    except Exception as e:
+        print(f"⚠️  Nu s-a putut scrie cache-ul de filme: {e}")
+        return False
+
+    print(f"💾 Cache filme salvat în {cache_path}")
+    return True
+
+
+def load_merged_movies(use_cache=True, cache_dir=None, workers=None):
+    """
+    Încarcă corpusul complet de filme (metadata + keywords + credits).
+
+    Rezultatul deja parsat și combinat este salvat într-un cache Parquet,
+    validat după dimensiunea, mtime-ul și hash-ul fișierelor sursă. Dacă
+    cache-ul este valid, încărcarea durează sub o secundă în loc de
+    parsarea completă a CSV-urilor.
+
+    Args:
+        use_cache: Dacă False, parsează mereu CSV-urile și nu scrie cache
+        cache_dir: Directorul cache-ului (default: config.CACHE_DIR)
+        workers: Procese pentru parsarea keywords/credits (None/1 = serial)
+
+    Returns:
+        DataFrame combinat, ca merge_movie_data
+    """
+    cache_dir = cache_dir or config.CACHE_DIR
+
+    if use_cache:
+        cached = _read_movies_cache(cache_dir)
+        if cached is not None:
+            print(f"⚡ Încărcate {len(cached)} filme din cache ({cache_dir})")
+            return cached
+
+    movies = load_movies_metadata()
+
+    keywords = None
+    credits = None
+
+    if os.path.exists(config.KEYWORDS_PATH):
+        keywords = load_keywords(workers=workers)
+
+    if os.path.exists(config.CREDITS_PATH):
+        credits = load_credits(workers=workers)
+
+    result = merge_movie_data(movies, keywords, credits)
+
+    if use_cache:
+        _write_movies_cache(result, cache_dir, movies_sources_fingerprint())
+
+    return result
+
+
+def _column(df, name, default):
+    """Coloana `name` din df sau o coloană constantă cu `default` dacă lipsește."""
+    if name in df.columns:
+        return df[name]
+    return pd.Series([default] * len(df), index=df.index, dtype=object)
+
+
+def _str_column(series, max_length=None):
+    """str(x) pentru valorile prezente, '' pentru NaN; opțional trunchiat."""
+    present = series.notna().tolist()
+    values = series.tolist()
+    if max_length is None:
+        return [str(x) if ok else '' for x, ok in zip(values, present)]
+    return [str(x)[:max_length] if ok else '' for x, ok in zip(values, present)]
+
+
+def _list_column(series, max_items=None):
+    """Valorile de tip list (trunchiate la max_items), [] pentru orice altceva."""
+    return [x[:max_items] if isinstance(x, list) else [] for x in series]
+
+
+def _number_column(series, dtype):
+    """Coloană numerică cu NaN înlocuit cu 0, ca listă de float/int Python."""
+    return series.fillna(0).astype(dtype).tolist()
+
+
+def prepare_movies_for_recombee(movies_df, as_iterator=False):
     """
     Pregătește datele pentru încărcarea în Recombee.
     
+    Conversiile (liste, trunchieri, NaN, tipuri) se fac o singură dată pe
+    fiecare coloană, nu rând cu rând.
+    
+    Args:
+        movies_df: DataFrame combinat (merge_movie_data)
+        as_iterator: Dacă True, returnează un generator care construiește
+                     dicționarele pe rând, fără a ține toată lista în memorie
+    
     Returns:
         List de dicționare, fiecare reprezentând un film cu toate atributele
     """
@@ -222,132 +646,259 @@ def prepare_movies_for_recombee(movies_df):
         movies_df['title'].notna() & 
         (movies_df['title'] != '') & 
         (movies_df['title'].str.strip() != '')
-    ].copy()
+    ]
+    
+    # Sărim și titlurile care devin 'nan' după conversia la string
+    titles = [str(title).strip() for title in movies_df['title'].tolist()]
+    valid = [title != '' and title != 'nan' for title in titles]
+    if not all(valid):
+        movies_df = movies_df[valid]
+        titles = [title for title, ok in zip(titles, valid) if ok]
     
     filtered_count = initial_count - len(movies_df)
     if filtered_count > 0:
         print(f"⚠️  Filtrate {filtered_count} filme fără titlu valid")
     
-    movies = []
-    for _, row in tqdm(movies_df.iterrows(), total=len(movies_df), desc="Procesare filme"):
-        # Procesăm genurile - asigurăm că e listă
-        genres = row.get('genre_names', [])
-        if not isinstance(genres, list):
-            genres = []
-        
-        # Procesăm keywords - asigurăm că e listă
-        keywords = []
-        if 'keyword_names' in row and isinstance(row['keyword_names'], list):
-            keywords = row['keyword_names'][:10]  # Max 10 keywords
-        
-        # Procesăm director
-        director = ''
-        if 'director' in row and pd.notna(row.get('director')):
-            director = str(row['director'])
-        
-        # Procesăm actori - asigurăm că e listă
-        actors = []
-        if 'actors' in row and isinstance(row['actors'], list):
-            actors = row['actors'][:5]  # Max 5 actori
-        
-        # Procesăm release_date - asigurăm că e string valid
-        release_date = str(row.get('release_date', '')) if pd.notna(row.get('release_date')) else ''
-        
-        # Procesăm poster_path
-        poster_path = str(row.get('poster_path', '')) if pd.notna(row.get('poster_path')) else ''
-        
-        # Verificăm dacă filmul are cel puțin date minime valide
-        title = str(row.get('title', '')).strip()
-        if not title or title == '' or title == 'nan':
-            continue  # Sărim filmele fără titlu valid
-        
-        movie = {
-            'item_id': str(row['id']),
-            'title': title,
-            'overview': str(row.get('overview', ''))[:1000] if pd.notna(row.get('overview')) else '',  # Limităm la 1000 caractere
-            'genres': genres,
-            'keywords': keywords,  # Întotdeauna o listă (chiar dacă goală)
-            'director': director,
-            'actors': actors,  # Întotdeauna o listă (chiar dacă goală)
-            'release_date': release_date,
-            'vote_average': float(row.get('vote_average', 0)) if pd.notna(row.get('vote_average')) else 0.0,
-            'vote_count': int(row.get('vote_count', 0)) if pd.notna(row.get('vote_count')) else 0,
-            'runtime': int(row.get('runtime', 0)) if pd.notna(row.get('runtime')) else 0,
-            'poster_path': poster_path,
-        }
-        
-        movies.append(movie)
+    columns = {
+        'item_id': [str(movie_id) for movie_id in movies_df['id'].tolist()],
+        'title': titles,
+        'overview': _str_column(_column(movies_df, 'overview', ''), max_length=1000),  # Limităm la 1000 caractere
+        'genres': _list_column(_column(movies_df, 'genre_names', [])),
+        'keywords': _list_column(_column(movies_df, 'keyword_names', []), max_items=10),  # Max 10 keywords
+        'director': _str_column(_column(movies_df, 'director', '')),
+        'actors': _list_column(_column(movies_df, 'actors', []), max_items=5),  # Max 5 actori
+        'release_date': _str_column(_column(movies_df, 'release_date', '')),
+        'vote_average': _number_column(_column(movies_df, 'vote_average', 0), float),
+        'vote_count': _number_column(_column(movies_df, 'vote_count', 0), 'int64'),
+        'runtime': _number_column(_column(movies_df, 'runtime', 0), 'int64'),
+        'poster_path': _str_column(_column(movies_df, 'poster_path', '')),
+    }
+    keys = list(columns)
+    rows = (dict(zip(keys, values)) for values in zip(*columns.values()))
+    
+    if as_iterator:
+        return rows
     
+    movies = list(rows)
     print(f"✅ Pregătite {len(movies)} filme pentru Recombee")
     return movies
 
 
+def iter_rating_batches(ratings, batch_size=1000):
+    """
+    Transformă rating-urile în batch-uri gata de trimis în Recombee.
+    
+    Filtrarea, conversia id-urilor la string și a timestamp-urilor se fac
+    vectorizat pe fiecare chunk. Funcția este un generator, deci împreună
+    cu iter_ratings memoria rămâne limitată la câteva batch-uri.
+    
+    Args:
+        ratings: DataFrame sau iterabil de DataFrame-uri (ex. iter_ratings())
+        batch_size: Numărul de rating-uri per batch
+        
+    Yields:
+        Dict cu liste paralele: user_id, item_id (str), rating (float, scala 1-5),
+        timestamp (int sau None)
+    """
+    if isinstance(ratings, pd.DataFrame):
+        ratings = [ratings]
+    
+    for chunk in ratings:
+        chunk = chunk[
+            chunk['userId'].notna() & 
+            chunk['movieId'].notna() & 
+            chunk['rating'].notna()
+        ]
+        if chunk.empty:
+            continue
+        
+        # Convertim userId și movieId la int apoi string pentru a evita ".0"
+        user_ids = chunk['userId'].astype('int64').astype(str).tolist()
+        item_ids = chunk['movieId'].astype('int64').astype(str).tolist()
+        ratings_values = chunk['rating'].astype('float64').tolist()
+        timestamps = [int(ts) if present else None
+                      for ts, present in zip(chunk['timestamp'].tolist(),
+                                             chunk['timestamp'].notna().tolist())]
+        
+        for i in range(0, len(user_ids), batch_size):
+            yield {
+                'user_id': user_ids[i:i + batch_size],
+                'item_id': item_ids[i:i + batch_size],
+                'rating': ratings_values[i:i + batch_size],
+                'timestamp': timestamps[i:i + batch_size],
+            }
+
+
+def skip_rating_batches(batches, count):
+    """
+    Sare peste primele `count` rating-uri dintr-un flux de batch-uri
+    (ex. cele deja confirmate la o încărcare anterioară).
+    """
+    for batch in batches:
+        size = len(batch['user_id'])
+        if count >= size:
+            count -= size
+            continue
+        if count > 0:
+            batch = {key: values[count:] for key, values in batch.items()}
+            count = 0
+        yield batch
+
+
 def prepare_ratings_for_recombee(ratings_df):
     """
     Pregătește ratingurile pentru încărcarea în Recombee.
     
+    Pentru volume mari, folosește iter_rating_batches, care nu ține toate
+    interacțiunile în memorie.
+    
     Returns:
         List de dicționare, fiecare reprezentând un rating/interacțiune
     """
     print("📦 Pregătire ratings pentru Recombee...")
     
-    # Filtrează rating-urile invalide
     initial_count = len(ratings_df)
-    ratings_df = ratings_df[
-        ratings_df['userId'].notna() & 
-        ratings_df['movieId'].notna() & 
-        ratings_df['rating'].notna()
-    ].copy()
-    
-    filtered_count = initial_count - len(ratings_df)
+    interactions = []
+    for batch in iter_rating_batches(ratings_df, batch_size=max(initial_count, 1)):
+        interactions.extend(
+            {'user_id': user_id, 'item_id': item_id, 'rating': rating, 'timestamp': timestamp}
+            for user_id, item_id, rating, timestamp in zip(
+                batch['user_id'], batch['item_id'], batch['rating'], batch['timestamp'])
+        )
+    
+    filtered_count = initial_count - len(interactions)
     if filtered_count > 0:
         print(f"⚠️  Filtrate {filtered_count} rating-uri invalide")
     
-    interactions = []
-    for _, row in tqdm(ratings_df.iterrows(), total=len(ratings_df), desc="Procesare ratings"):
-        # Convertim userId și movieId la int apoi string pentru a evita ".0"
-        user_id = str(int(row['userId'])) if pd.notna(row['userId']) else None
-        item_id = str(int(row['movieId'])) if pd.notna(row['movieId']) else None
-        
-        if user_id is None or item_id is None:
-            continue  # Sărim rating-urile invalide
-        
-        interaction = {
-            'user_id': user_id,
-            'item_id': item_id,
-            'rating': float(row['rating']) if pd.notna(row['rating']) else 0.0,
-            'timestamp': int(row['timestamp']) if pd.notna(row['timestamp']) else None
-        }
-        interactions.append(interaction)
-    
     print(f"✅ Pregătite {len(interactions):,} interacțiuni pentru Recombee")
     return interactions
 
 
+def popularity_ranking(movies_df):
+    """
+    Clasamentul de popularitate folosit pentru Cold Start.
+    
+    Populare = vote_count * vote_average (formula ponderată), doar pentru
+    filmele cu vote_count peste quantila de 75%.
+    
+    Returns:
+        (positions, scores) - pozițiile rândurilor eligibile, sortate
+        descrescător după scor, și scorurile lor
+    """
+    # Folosim o medie ponderată: trebuie să aibă și multe voturi și un rating bun
+    min_votes = movies_df['vote_count'].quantile(0.75)  # Cel puțin 75% quantile de voturi
+    eligible = np.flatnonzero((movies_df['vote_count'] >= min_votes).to_numpy())
+    
+    scores = (movies_df['vote_count'] * movies_df['vote_average']).to_numpy()[eligible]
+    order = pd.Series(scores).sort_values(ascending=False).index.to_numpy()
+    
+    return eligible[order], scores[order]
+
+
 def get_popular_movies(movies_df, n=20):
     """
     Returnează cele mai populare filme (pentru Cold Start).
     
     Populare = vote_count * vote_average (formula ponderată)
     """
-    df = movies_df.copy()
-    
-    # Calculăm scorul de popularitate
-    # Folosim o medie ponderată: trebuie să aibă și multe voturi și un rating bun
-    min_votes = df['vote_count'].quantile(0.75)  # Cel puțin 75% quantile de voturi
-    df = df[df['vote_count'] >= min_votes]
-    
-    df['popularity_score'] = df['vote_count'] * df['vote_average']
-    df = df.sort_values('popularity_score', ascending=False)
+    positions, scores = popularity_ranking(movies_df)
     
-    return df.head(n)
+    df = movies_df.iloc[positions[:n]].copy()
+    df['popularity_score'] = scores[:n]
+    return df
+
+
+class GenreIndex:
+    """
+    Genurile filmelor codificate ca măști de biți (uint64), câte un bit per gen.
+
+    Vocabularul începe cu config.GENRES_FOR_COLD_START (aceleași poziții ale
+    biților indiferent de dataset), urmat de celelalte genuri din dataset, în
+    ordinea frecvenței. Interogările OR / AND pe genuri devin astfel o singură
+    operație pe biți peste un array NumPy.
+    """
 
+    MAX_GENRES = 64
 
-def get_movies_by_genre(movies_df, genre):
+    def __init__(self, genre_lists=(), preferred=None):
+        """
+        Args:
+            genre_lists: Listele de genuri ale filmelor (de ex. coloana genre_names)
+            preferred: Genurile cu primii biți (implicit config.GENRES_FOR_COLD_START)
+        """
+        preferred = config.GENRES_FOR_COLD_START if preferred is None else preferred
+
+        counts = self._explode(genre_lists).value_counts()
+        others = [g for g in counts.index if isinstance(g, str) and g not in set(preferred)]
+        vocabulary = list(dict.fromkeys(preferred)) + others
+
+        if len(vocabulary) > self.MAX_GENRES:
+            print(f"⚠️  {len(vocabulary)} genuri, doar primele {self.MAX_GENRES} sunt indexate")
+            vocabulary = vocabulary[:self.MAX_GENRES]
+
+        self.vocabulary = vocabulary
+        self.codes = pd.Index(vocabulary, dtype=object)
+        self.bits = {genre: np.uint64(1) << np.uint64(i) for i, genre in enumerate(vocabulary)}
+
+    @staticmethod
+    def _explode(genre_lists):
+        """Un rând per (film, gen); indexul este poziția filmului."""
+        if isinstance(genre_lists, pd.Series):
+            genre_lists = genre_lists.reset_index(drop=True)
+        else:
+            genre_lists = pd.Series(list(genre_lists), dtype=object)
+        return genre_lists.explode().dropna()
+
+    def encode(self, genre_lists):
+        """Măștile de biți pentru o secvență de liste de genuri (np.uint64)."""
+        masks = np.zeros(len(genre_lists), dtype=np.uint64)
+
+        exploded = self._explode(genre_lists)
+        codes = self.codes.get_indexer(exploded.to_numpy())
+        known = codes >= 0
+        bits = np.left_shift(np.uint64(1), codes[known].astype(np.uint64))
+        np.bitwise_or.at(masks, exploded.index.to_numpy(dtype=np.int64)[known], bits)
+        return masks
+
+    def mask(self, genres):
+        """
+        Masca unui set de genuri, sau None dacă vreun gen nu e în vocabular
+        (niciun film din dataset nu îl are).
+        """
+        mask = np.uint64(0)
+        for genre in genres:
+            bit = self.bits.get(genre)
+            if bit is None:
+                return None
+            mask |= bit
+        return mask
+
+    def any_of(self, masks, genres):
+        """Masca booleană a filmelor care au cel puțin unul dintre genuri (OR)."""
+        mask = self.mask([g for g in genres if g in self.bits])
+        return (masks & mask) != 0
+
+    def all_of(self, masks, genres):
+        """Masca booleană a filmelor care au toate genurile (AND)."""
+        mask = self.mask(genres)
+        if mask is None:
+            return np.zeros(len(masks), dtype=bool)
+        return (masks & mask) == mask
+
+
+def get_movies_by_genre(movies_df, genre, genre_index=None):
     """
     Returnează filme filtrate după gen.
+    
+    Cu genre_index, folosește coloana genre_mask deja calculată (vezi
+    MovieStore); altfel codifică genurile doar pentru genul cerut.
     """
-    return movies_df[movies_df['genre_names'].apply(lambda x: genre in x if isinstance(x, list) else False)]
+    if genre_index is not None and 'genre_mask' in movies_df:
+        masks = movies_df['genre_mask'].to_numpy()
+    else:
+        genre_index = GenreIndex(preferred=[genre])
+        masks = genre_index.encode(movies_df['genre_names'])
+    return movies_df[genre_index.any_of(masks, [genre])]
 
 
 if __name__ == '__main__':
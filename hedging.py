@@ -0,0 +1,190 @@
+"""
+Hedging Module - Cereri duplicate pentru coada de latență a citirilor Recombee
+
+Un răspuns lent ocazional de la Recombee dă p99-ul lui /api/recommendations.
+Pentru citirile idempotente, dacă răspunsul întârzie peste percentila
+configurată a latențelor recente, aceeași cerere mai pleacă o dată și se
+folosește primul răspuns reușit. Un buget limitează cererile suplimentare.
+"""
+import copy
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+from recombee_api_client.api_requests import Batch
+
+from circuit_breaker import BreakerClient
+import config
+
+# Citiri fără efecte (sau cu efecte idempotente): pot fi trimise de două ori
+HEDGEABLE_REQUESTS = ('RecommendItemsToUser', 'RecommendItemsToItem', 'GetItemValues',
+                      'GetUserValues')
+
+
+class _LatencyStats:
+    """Latențele recente ale unui tip de cerere și contoarele de hedging."""
+
+    def __init__(self, window):
+        self.latencies = deque(maxlen=window)  # secunde
+        self.delay = None  # percentila curentă, recalculată periodic
+        self.since_update = 0
+        self.counters = {'requests': 0, 'hedged': 0, 'hedge_wins': 0,
+                         'skipped_budget': 0, 'skipped_busy': 0}
+
+
+class Hedger:
+    """
+    Trimite cererile idempotente cu hedging.
+
+    Cererea pleacă într-un thread din pool; dacă nu a răspuns după percentila
+    `percentile` a latențelor recente (pentru tipul ei), o copie pleacă în
+    paralel și câștigă primul răspuns reușit. Cererea pierzătoare nu poate
+    fi anulată (HTTP blocant) - se termină în fundal, cu rezultatul ignorat.
+
+    Bugetul: fiecare cerere adaugă `budget` jetoane (maxim `burst`), iar o
+    cerere duplicată consumă un jeton, deci încărcarea suplimentară rămâne
+    sub `budget` (de ex. 5%) din numărul de cereri.
+    """
+
+    def __init__(self, send, percentile=None, budget=None, min_delay=None,
+                 max_inflight=None, min_samples=20, window=1000, burst=10):
+        """
+        Args:
+            send: Funcția care trimite o cerere (de ex. BreakerClient.send)
+            percentile: Percentila latenței după care pleacă duplicatul
+            budget: Fracțiunea maximă de cereri duplicate (0.05 = 5%)
+            min_delay: Întârzierea minimă înaintea duplicatului (ms)
+            max_inflight: Cereri în pool, maxim; peste ele se trimite direct
+            min_samples: Latențe măsurate înainte de primul hedging
+            window: Câte latențe recente sunt păstrate per tip de cerere
+            burst: Jetoane acumulate, maxim (rafale de duplicate)
+        """
+        self.send_request = send
+        self.percentile = percentile or config.RECOMBEE_HEDGE_PERCENTILE
+        self.budget = budget if budget is not None else config.RECOMBEE_HEDGE_BUDGET
+        self.min_delay = (min_delay if min_delay is not None else config.RECOMBEE_HEDGE_MIN_DELAY) / 1000
+        self.max_inflight = max_inflight or config.RECOMBEE_HEDGE_MAX_INFLIGHT
+        self.min_samples = min_samples
+        self.window = window
+        self.burst = burst
+
+        self.lock = threading.Lock()
+        self.stats_by_type = {}
+        self.tokens = float(burst)
+        self.inflight = 0
+        self.executor = ThreadPoolExecutor(max_workers=self.max_inflight,
+                                           thread_name_prefix='recombee-hedge')
+
+    @staticmethod
+    def hedgeable(request):
+        """True pentru citirile idempotente (și Batch-urile formate doar din ele)."""
+        if isinstance(request, Batch):
+            return bool(request.requests) and all(
+                type(r).__name__ in HEDGEABLE_REQUESTS for r in request.requests)
+        return type(request).__name__ in HEDGEABLE_REQUESTS
+
+    def _stats(self, name):
+        stats = self.stats_by_type.get(name)
+        if stats is None:
+            stats = self.stats_by_type[name] = _LatencyStats(self.window)
+        return stats
+
+    def _record_latency(self, stats, latency):
+        with self.lock:
+            stats.latencies.append(latency)
+            stats.since_update += 1
+            if len(stats.latencies) >= self.min_samples and (
+                    stats.delay is None or stats.since_update >= 50):
+                stats.delay = max(self.min_delay,
+                                  float(np.percentile(stats.latencies, self.percentile)))
+                stats.since_update = 0
+
+    def _timed(self, stats, request):
+        start = time.monotonic()
+        try:
+            return self.send_request(request)
+        finally:
+            self._record_latency(stats, time.monotonic() - start)
+
+    def _release(self, _future=None):
+        with self.lock:
+            self.inflight -= 1
+
+    def send(self, request):
+        """Trimite cererea (cu hedging dacă e eligibilă) și returnează primul răspuns reușit."""
+        if not self.hedgeable(request):
+            return self.send_request(request)
+
+        name = BreakerClient.request_type(request)
+        with self.lock:
+            stats = self._stats(name)
+            stats.counters['requests'] += 1
+            self.tokens = min(self.burst, self.tokens + self.budget)
+            delay = stats.delay
+            busy = self.inflight + 2 > self.max_inflight
+            if not busy:
+                self.inflight += 1
+        if busy:
+            # Pool-ul e plin: fără hedging, cererea pleacă din thread-ul curent
+            with self.lock:
+                stats.counters['skipped_busy'] += 1
+            return self._timed(stats, request)
+
+        start = time.monotonic()
+        primary = self.executor.submit(self._timed, stats, request)
+        primary.add_done_callback(self._release)
+        if delay is None:
+            return primary.result()  # Încă fără destule latențe măsurate
+
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        # Duplicatul primește doar cât a rămas din timeout-ul cererii inițiale
+        remaining = request.timeout - (time.monotonic() - start) * 1000
+        with self.lock:
+            allowed = self.tokens >= 1 and self.inflight < self.max_inflight
+            if allowed and remaining >= config.RECOMBEE_MIN_REQUEST_TIMEOUT:
+                self.tokens -= 1
+                self.inflight += 1
+                stats.counters['hedged'] += 1
+            else:
+                if not allowed:
+                    stats.counters['skipped_budget'] += 1
+                allowed = False
+        if not allowed:
+            return primary.result()
+
+        duplicate = copy.copy(request)
+        duplicate.timeout = int(remaining)
+        hedge = self.executor.submit(self.send_request, duplicate)
+        hedge.add_done_callback(self._release)
+
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        with self.lock:
+                            stats.counters['hedge_wins'] += 1
+                    return future.result()
+                error = error or future.exception()
+        raise error
+
+    def stats(self):
+        """Per tip de cerere: cereri, duplicate, câștigate de duplicat, întârzierea curentă."""
+        with self.lock:
+            result = []
+            for name, stats in sorted(self.stats_by_type.items()):
+                requests = stats.counters['requests']
+                result.append({
+                    'name': name,
+                    **stats.counters,
+                    'hedge_rate': round(stats.counters['hedged'] / requests, 4) if requests else 0.0,
+                    'hedge_delay_ms': round(stats.delay * 1000, 1) if stats.delay is not None else None,
+                })
+            return result
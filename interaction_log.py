@@ -0,0 +1,241 @@
+"""
+Interaction Log Module - Jurnal local append-only al interacțiunilor
+
+Rating-urile, vizualizările de detalii și înregistrările de utilizatori sunt
+adăugate secvențial într-un jurnal local (JSON lines), împărțit în segmente
+rotite după mărime. Jurnalul poate fi compactat (ultimul rating per pereche
+user/film) și retrimis în Recombee cu `python load_data.py --replay-log`,
+de exemplu pentru reconstruirea bazei de date.
+"""
+import glob
+import json
+import os
+import threading
+import time
+
+import config
+
+RATING = 'rating'
+VIEW = 'view'
+USER = 'user'
+RECORD_TYPES = (RATING, VIEW, USER)
+
+
+def _lock_file(f, shared=False):
+    """Lock non-blocant pe un segment; False dacă e deținut de alt proces."""
+    try:
+        import fcntl
+    except ImportError:
+        return True  # Fără fcntl (Windows) presupunem un singur proces
+    try:
+        fcntl.flock(f, (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+class InteractionLog:
+    """
+    Jurnal append-only, partajat de procesele worker.
+
+    Fiecare proces scrie în cel mai nou segment (O_APPEND, o singură scriere
+    per înregistrare, deci liniile nu se amestecă) și ține un lock partajat pe
+    el cât timp îl folosește. Când segmentul depășește segment_bytes, procesul
+    deschide unul nou. Segmentele se citesc în ordinea numelui (momentul
+    creării), iar fiecare înregistrare are timestamp-ul ei.
+    """
+
+    def __init__(self, directory=None, segment_bytes=None, fsync=None):
+        """
+        Args:
+            directory: Directorul segmentelor (default: config.INTERACTION_LOG_DIR)
+            segment_bytes: Mărimea după care se deschide un segment nou
+            fsync: fsync după fiecare înregistrare (durabil și la căderea sistemului)
+        """
+        self.directory = directory or config.INTERACTION_LOG_DIR
+        self.segment_bytes = segment_bytes or config.INTERACTION_LOG_SEGMENT_BYTES
+        self.fsync = config.INTERACTION_LOG_FSYNC if fsync is None else fsync
+        self.lock = threading.Lock()
+        self.segment = None
+        self.counters = {'appended': 0, 'rotations': 0}
+        os.makedirs(self.directory, exist_ok=True)
+
+    # ==================== SCRIERE ====================
+
+    def segments(self):
+        """Căile segmentelor, în ordinea scrierii."""
+        return sorted(glob.glob(os.path.join(self.directory, 'segment-*.jsonl')))
+
+    def _open_segment(self, path=None):
+        """Deschide (sau creează) segmentul activ și ține un lock partajat pe el."""
+        while True:
+            if path is None:
+                path = os.path.join(self.directory, f"segment-{time.time_ns():020d}.jsonl")
+            segment = open(path, 'ab', buffering=0)
+            if not _lock_file(segment, shared=True):
+                segment.close()  # Segmentul e compactat chiar acum
+                path = None
+                continue
+            if os.fstat(segment.fileno()).st_nlink == 0:
+                segment.close()  # Șters de compactare între open și lock
+                path = None
+                continue
+            return segment
+
+    def _segment(self):
+        if self.segment is None:
+            segments = self.segments()
+            latest = segments[-1] if segments else None
+            if latest and os.path.getsize(latest) < self.segment_bytes:
+                self.segment = self._open_segment(latest)
+            else:
+                self.segment = self._open_segment()
+        elif self.segment.tell() >= self.segment_bytes:
+            self.segment.close()
+            self.segment = self._open_segment()
+            self.counters['rotations'] += 1
+        return self.segment
+
+    def append(self, record_type, user_id, item_id=None, timestamp=None, **fields):
+        """
+        Adaugă o interacțiune în jurnal.
+
+        Args:
+            record_type: RATING, VIEW sau USER
+            user_id: ID-ul utilizatorului
+            item_id: ID-ul filmului (pentru RATING și VIEW)
+            timestamp: Unix timestamp (default: acum)
+            **fields: Date suplimentare (rating, preferred_genres, ...)
+        """
+        if record_type not in RECORD_TYPES:
+            raise ValueError(f"Tip de interacțiune necunoscut: {record_type}")
+        record = {'type': record_type, 'ts': timestamp if timestamp is not None else time.time(),
+                  'user_id': str(user_id)}
+        if item_id is not None:
+            record['item_id'] = str(item_id)
+        record.update(fields)
+        line = (json.dumps(record, separators=(',', ':')) + '\n').encode()
+
+        with self.lock:
+            segment = self._segment()
+            segment.write(line)
+            if self.fsync:
+                os.fsync(segment.fileno())
+            self.counters['appended'] += 1
+
+    def add_rating(self, user_id, movie_id, rating, timestamp=None):
+        self.append(RATING, user_id, movie_id, timestamp, rating=float(rating))
+
+    def add_view(self, user_id, movie_id, timestamp=None):
+        self.append(VIEW, user_id, movie_id, timestamp)
+
+    def add_user(self, user_id, preferred_genres=None, preferred_directors=None, timestamp=None):
+        self.append(USER, user_id, timestamp=timestamp,
+                    preferred_genres=list(preferred_genres or []),
+                    preferred_directors=list(preferred_directors or []))
+
+    def close(self):
+        with self.lock:
+            if self.segment is not None:
+                self.segment.close()
+                self.segment = None
+
+    def stats(self):
+        """Statistici pentru monitorizare (format apropiat de TTLCache.stats)."""
+        segments = self.segments()
+        with self.lock:
+            return {
+                'name': 'interaction_log',
+                'segments': len(segments),
+                'bytes': sum(os.path.getsize(path) for path in segments if os.path.exists(path)),
+                **self.counters,
+            }
+
+    # ==================== CITIRE ====================
+
+    @staticmethod
+    def _read_segment(path):
+        try:
+            with open(path, 'rb') as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue  # Ultima linie poate fi scrisă parțial
+        except FileNotFoundError:
+            return  # Compactat între listare și citire
+
+    def records(self, since=None, until=None, types=None):
+        """
+        Înregistrările din jurnal, segment cu segment (fără a le ține în memorie).
+
+        Args:
+            since: Doar înregistrările cu timestamp >= since
+            until: Doar înregistrările cu timestamp < until
+            types: Tipurile de înregistrări dorite (default: toate)
+        """
+        for path in self.segments():
+            for record in self._read_segment(path):
+                if types is not None and record.get('type') not in types:
+                    continue
+                if since is not None and record['ts'] < since:
+                    continue
+                if until is not None and record['ts'] >= until:
+                    continue
+                yield record
+
+    # ==================== COMPACTARE ====================
+
+    def compact(self):
+        """
+        Comasează segmentele închise într-unul singur: rămâne ultimul rating
+        per pereche (user, film) și ultima înregistrare per utilizator, iar
+        vizualizările duplicate (același user, film și timestamp) dispar.
+
+        Segmentele în care scrie încă un proces (inclusiv cel mai nou) nu sunt
+        atinse. Returnează (înregistrări citite, înregistrări păstrate).
+        """
+        candidates = self.segments()[:-1]
+        locked = []
+        for path in candidates:
+            handle = open(path, 'ab')
+            if not _lock_file(handle):
+                handle.close()
+                break  # Compactăm doar prefixul de segmente libere, ca ordinea să rămână
+            locked.append(handle)
+
+        try:
+            if not locked:
+                return 0, 0
+
+            latest = {}
+            read = 0
+            for handle in locked:
+                for record in self._read_segment(handle.name):
+                    read += 1
+                    if record.get('type') == RATING:
+                        key = (RATING, record['user_id'], record['item_id'])
+                    elif record.get('type') == USER:
+                        key = (USER, record['user_id'])
+                    else:
+                        key = (VIEW, record['user_id'], record.get('item_id'), record['ts'])
+                    previous = latest.get(key)
+                    if previous is None or record['ts'] >= previous['ts']:
+                        latest[key] = record
+
+            kept = sorted(latest.values(), key=lambda record: record['ts'])
+            target = locked[0].name
+            tmp_path = target + '.tmp'
+            with open(tmp_path, 'w') as f:
+                for record in kept:
+                    f.write(json.dumps(record, separators=(',', ':')) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, target)
+            # O cădere aici lasă înregistrări duplicate, eliminate la următoarea compactare
+            for handle in locked[1:]:
+                os.remove(handle.name)
+            return read, len(kept)
+        finally:
+            for handle in locked:
+                handle.close()
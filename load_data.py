@@ -21,24 +21,26 @@ from datetime import datetime
 
 # Import local modules
 from data_loader import (
-    load_movies_metadata, 
-    load_keywords, 
-    load_credits, 
+    load_merged_movies,
     load_ratings,
-    merge_movie_data,
+    iter_ratings,
+    iter_rating_batches,
+    skip_rating_batches,
     prepare_movies_for_recombee,
-    prepare_ratings_for_recombee
+    source_fingerprint
 )
 from recombee_client import MovieRecommender
+from checkpoint import LoadCheckpoint
+from interaction_log import InteractionLog, RATING, VIEW, USER
 import config
 
 
-def check_data_files():
+def check_data_files(ratings_path=None):
     """Verifică dacă fișierele de date există."""
     files = [
         config.MOVIES_METADATA_PATH,
         config.KEYWORDS_PATH,
-        config.RATINGS_PATH
+        ratings_path or config.RATINGS_PATH
     ]
     
     missing = []
@@ -74,27 +76,18 @@ def check_recombee_config():
     return True
 
 
-def load_movies_to_recombee(recommender, limit=None):
+def load_movies_to_recombee(recommender, limit=None, workers=None, checkpoint=None, batch_size=None):
     """Încarcă filmele în Recombee."""
     print("\n" + "=" * 50)
     print("📚 ÎNCĂRCARE FILME ÎN RECOMBEE")
     print("=" * 50)
     
-    # Încarcă datele
-    movies = load_movies_metadata()
+    if checkpoint and checkpoint.is_done('movies'):
+        print("♻️  Filmele au fost deja încărcate complet (checkpoint) - sărim peste")
+        return checkpoint.offset('movies')
     
-    # Opțional: încarcă keywords și credits
-    keywords = None
-    credits = None
-    
-    if os.path.exists(config.KEYWORDS_PATH):
-        keywords = load_keywords()
-    
-    if os.path.exists(config.CREDITS_PATH):
-        credits = load_credits()
-    
-    # Combină datele
-    movies_full = merge_movie_data(movies, keywords, credits)
+    # Încarcă datele (metadata + keywords + credits, din cache dacă e valid)
+    movies_full = load_merged_movies(workers=workers)
     
     # Limitează dacă este specificat
     if limit:
@@ -107,29 +100,78 @@ def load_movies_to_recombee(recommender, limit=None):
     # Configurează proprietățile
     recommender.setup_item_properties()
     
-    # Încarcă filmele
-    recommender.add_movies_batch(movies_data, batch_size=500)
+    # Încarcă filmele (fără cele deja confirmate la o rulare anterioară)
+    on_batch_done = None
+    if checkpoint:
+        offset = checkpoint.offset('movies')
+        if offset:
+            print(f"♻️  Sărim peste {offset:,} filme deja încărcate")
+        on_batch_done = checkpoint.tracker('movies')
+        movies_data_todo = movies_data[offset:]
+    else:
+        movies_data_todo = movies_data
+    
+    recommender.add_movies_batch(movies_data_todo, batch_size=batch_size, on_batch_done=on_batch_done)
+    
+    if checkpoint and checkpoint.offset('movies') >= len(movies_data):
+        checkpoint.mark_done('movies')
     
     return len(movies_data)
 
 
-def load_ratings_to_recombee(recommender, limit=None):
-    """Încarcă rating-urile în Recombee."""
+def load_ratings_to_recombee(recommender, limit=None, filepath=None, stream=False,
+                            chunk_size=None, checkpoint=None, batch_size=None):
+    """
+    Încarcă rating-urile în Recombee.
+    
+    Cu stream=True, fișierul este citit și trimis pe chunk-uri (vezi
+    iter_ratings), deci memoria rămâne limitată indiferent de mărimea lui.
+    Cu un checkpoint, rating-urile deja confirmate sunt sărite.
+    Fără batch_size, dimensiunea Batch-urilor este adaptată din latența
+    observată (vezi AdaptiveBatchSizer).
+    """
     print("\n" + "=" * 50)
     print("⭐ ÎNCĂRCARE RATING-URI ÎN RECOMBEE")
     print("=" * 50)
     
-    # Încarcă rating-urile (cu sample dacă specificat)
-    ratings = load_ratings(sample_size=limit)
-    
-    # Pregătește pentru Recombee
-    ratings_data = prepare_ratings_for_recombee(ratings)
+    if checkpoint and checkpoint.is_done('ratings'):
+        print("♻️  Rating-urile au fost deja încărcate complet (checkpoint) - sărim peste")
+        return checkpoint.offset('ratings')
     
     # Configurează proprietățile utilizatorilor
     recommender.setup_user_properties()
     
-    # Încarcă rating-urile
-    recommender.add_ratings_batch(ratings_data, batch_size=1000)
+    if stream:
+        ratings = iter_ratings(filepath, chunk_size=chunk_size, sample_size=limit)
+    else:
+        # Încarcă rating-urile (cu sample dacă specificat)
+        ratings = load_ratings(filepath, sample_size=limit)
+    
+    # Batch-urile sunt pregătite pe măsură ce se trimit, fără lista completă în memorie
+    batches = iter_rating_batches(ratings, batch_size=batch_size or 1000)
+    
+    on_batch_done = None
+    offset = 0
+    if checkpoint:
+        offset = checkpoint.offset('ratings')
+        if offset:
+            print(f"♻️  Sărim peste {offset:,} rating-uri deja încărcate")
+            batches = skip_rating_batches(batches, offset)
+        on_batch_done = checkpoint.tracker('ratings')
+    
+    produced = {'count': 0}
+    
+    def counted(batches):
+        for batch in batches:
+            produced['count'] += len(batch['user_id'])
+            yield batch
+    
+    sent = recommender.add_rating_batches(counted(batches), on_batch_done=on_batch_done,
+                                          adaptive=batch_size is None)
+    total = offset + sent
+    
+    if checkpoint and sent == produced['count']:
+        checkpoint.mark_done('ratings')
     
     # Calculează preferințele utilizatorilor din rating-uri
     # SKIP: Calcularea preferințelor e prea lentă (multe API calls)
@@ -140,7 +182,94 @@ def load_ratings_to_recombee(recommender, limit=None):
     print("ℹ️  Recombee va folosi automat rating-urile pentru recomandări hibride")
     print("   (Nu e nevoie să calculăm manual preferințele)")
     
-    return len(ratings_data)
+    return total
+
+
+def replay_interaction_log(recommender, log, since=None, until=None, batch_size=None):
+    """
+    Retrimite în Recombee interacțiunile din jurnalul local (intervalul
+    [since, until)), în Batch-uri.
+    
+    Utilizatorii înregistrați în interval sunt trimiși primii; rating-urile
+    nu trimit preferințe default (AddRating creează doar utilizatorii lipsă),
+    deci preferințele existente în Recombee rămân neatinse. Jurnalul este
+    citit în streaming, câte o trecere pentru fiecare tip de interacțiune.
+    
+    Returns:
+        Dict cu numărul de utilizatori, rating-uri și vizualizări trimise
+    """
+    print("\n" + "=" * 50)
+    print("📼 RELUARE JURNAL DE INTERACȚIUNI")
+    print("=" * 50)
+    
+    recommender.setup_user_properties()
+    batch_size = batch_size or 1000
+    
+    users = {}
+    for record in log.records(since, until, types=(USER,)):
+        users[record['user_id']] = {
+            'preferred_genres': record.get('preferred_genres', []),
+            'preferred_directors': record.get('preferred_directors', []),
+        }
+    sent_users = recommender.set_users_batch(users.items(), batch_size=batch_size)
+    
+    def rating_batches():
+        batch = {'user_id': [], 'item_id': [], 'rating': [], 'timestamp': []}
+        for record in log.records(since, until, types=(RATING,)):
+            batch['user_id'].append(record['user_id'])
+            batch['item_id'].append(record['item_id'])
+            batch['rating'].append(record['rating'])
+            batch['timestamp'].append(record['ts'])
+            if len(batch['user_id']) >= batch_size:
+                yield batch
+                batch = {key: [] for key in batch}
+        if batch['user_id']:
+            yield batch
+    
+    # Autorii rating-urilor pot fi utilizatori existenți (înregistrați înaintea
+    # intervalului): fără SetUserValues default, care le-ar șterge preferințele
+    sent_ratings = recommender.add_rating_batches(rating_batches(), adaptive=False,
+                                                  user_defaults=False)
+    
+    views = ((record['user_id'], record['item_id'], record['ts'])
+             for record in log.records(since, until, types=(VIEW,)))
+    sent_views = recommender.add_views_batch(views, batch_size=batch_size)
+    
+    print(f"✅ Reluate: {sent_users:,} utilizatori, {sent_ratings:,} rating-uri, "
+          f"{sent_views:,} vizualizări")
+    return {'users': sent_users, 'ratings': sent_ratings, 'views': sent_views}
+
+
+def parse_log_time(value):
+    """Unix timestamp sau dată ISO (ex. 2024-05-01 sau 2024-05-01T12:00) pentru argparse."""
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Moment invalid: {value} (unix timestamp sau dată ISO)")
+
+
+def checkpoint_sources(ratings_path, movies_limit, ratings_limit):
+    """Identifică datele de intrare ale unei încărcări (pentru validarea checkpoint-ului)."""
+    files = {
+        'movies_metadata': config.MOVIES_METADATA_PATH,
+        'keywords': config.KEYWORDS_PATH,
+        'credits': config.CREDITS_PATH,
+        'ratings': ratings_path,
+    }
+    sources = {}
+    for name, path in files.items():
+        fingerprint = source_fingerprint(path) or {}
+        sources[name] = {
+            'path': os.path.abspath(path),
+            'size': fingerprint.get('size'),
+            'hash': fingerprint.get('hash'),
+        }
+    sources['limits'] = {'movies': movies_limit, 'ratings': ratings_limit}
+    return sources
 
 
 def main():
@@ -174,6 +303,83 @@ def main():
         action='store_true',
         help='Mod test: încarcă doar 100 filme și 1000 rating-uri'
     )
+    parser.add_argument(
+        '--full-ratings',
+        action='store_true',
+        help='Încarcă ratings.csv complet (26M) în streaming, în loc de ratings_small.csv'
+    )
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Citește și trimite rating-urile pe chunk-uri (implicit cu --full-ratings)'
+    )
+    parser.add_argument(
+        '--chunk-size',
+        type=int,
+        default=None,
+        help=f'Rânduri per chunk în modul streaming (default: {config.RATINGS_CHUNK_SIZE:,})'
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=None,
+        help=f'Batch-uri trimise în paralel în Recombee (default: {config.RECOMBEE_UPLOAD_CONCURRENCY})'
+    )
+    parser.add_argument(
+        '--rate-limit',
+        type=float,
+        default=None,
+        help=f'Număr maxim de Batch-uri pe secundă (default: {config.RECOMBEE_BATCH_RATE_LIMIT:g})'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=None,
+        help='Dimensiune fixă pentru Batch-uri (default: adaptivă, după latența și erorile observate)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Numărul de procese pentru parsarea paralelă a keywords/credits (default: serial)'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Reia o încărcare întreruptă din checkpoint, sărind peste batch-urile deja confirmate'
+    )
+    parser.add_argument(
+        '--checkpoint',
+        default=config.LOAD_CHECKPOINT_PATH,
+        help=f'Fișierul de checkpoint (default: {config.LOAD_CHECKPOINT_PATH})'
+    )
+    parser.add_argument(
+        '--replay-log',
+        action='store_true',
+        help='Retrimite în Recombee jurnalul local de interacțiuni, în loc de dataset'
+    )
+    parser.add_argument(
+        '--compact-log',
+        action='store_true',
+        help='Compactează jurnalul de interacțiuni (ultimul rating per user/film)'
+    )
+    parser.add_argument(
+        '--log-dir',
+        default=config.INTERACTION_LOG_DIR,
+        help=f'Directorul jurnalului de interacțiuni (default: {config.INTERACTION_LOG_DIR})'
+    )
+    parser.add_argument(
+        '--log-since',
+        type=parse_log_time,
+        default=None,
+        help='Reia doar interacțiunile de la acest moment (unix timestamp sau dată ISO)'
+    )
+    parser.add_argument(
+        '--log-until',
+        type=parse_log_time,
+        default=None,
+        help='Reia doar interacțiunile dinaintea acestui moment (unix timestamp sau dată ISO)'
+    )
     parser.add_argument(
         '--reset',
         action='store_true',
@@ -182,14 +388,24 @@ def main():
     
     args = parser.parse_args()
     
+    if args.compact_log:
+        log = InteractionLog(args.log_dir)
+        read, kept = log.compact()
+        print(f"🗜️  Jurnal compactat: {read:,} înregistrări citite, {kept:,} păstrate")
+        if not args.replay_log:
+            return
+    
     # Header
     print("\n" + "=" * 60)
     print("🎬 SISTEM DE RECOMANDARE FILME - ÎNCĂRCARE DATE")
     print("=" * 60)
     print(f"⏰ Start: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
+    ratings_path = config.RATINGS_FULL_PATH if args.full_ratings else config.RATINGS_PATH
+    stream_ratings = args.stream or args.full_ratings
+    
     # Verificări
-    if not check_data_files():
+    if not args.replay_log and not check_data_files(ratings_path):
         sys.exit(1)
     
     if not check_recombee_config():
@@ -206,7 +422,10 @@ def main():
     
     # Inițializare client Recombee
     try:
-        recommender = MovieRecommender()
+        recommender = MovieRecommender(
+            upload_concurrency=args.concurrency,
+            batch_rate_limit=args.rate_limit
+        )
     except Exception as e:
         print(f"❌ Eroare la conectarea cu Recombee: {e}")
         sys.exit(1)
@@ -222,25 +441,56 @@ def main():
         else:
             print("❌ Eroare la resetare. Continuăm cu datele existente...")
     
+    # Reluarea jurnalului local înlocuiește încărcarea din dataset
+    if args.replay_log:
+        try:
+            replay_interaction_log(recommender, InteractionLog(args.log_dir),
+                                   since=args.log_since, until=args.log_until,
+                                   batch_size=args.batch_size)
+        except KeyboardInterrupt:
+            print("\n\n⚠️ Reluare întreruptă de utilizator (poate fi repetată, e idempotentă)")
+            sys.exit(0)
+        print(f"⏰ Final: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        return
+    
+    # Checkpoint: după fiecare batch confirmat se salvează progresul
+    resume = args.resume
+    if resume and args.reset:
+        print("⚠️  --resume este ignorat împreună cu --reset (baza de date a fost golită)")
+        resume = False
+    checkpoint = LoadCheckpoint(
+        args.checkpoint,
+        sources=checkpoint_sources(ratings_path, movies_limit, ratings_limit),
+        resume=resume
+    )
+    
     # Încărcare date
     total_movies = 0
     total_ratings = 0
     
     try:
         if not args.ratings_only:
-            total_movies = load_movies_to_recombee(recommender, limit=movies_limit)
+            total_movies = load_movies_to_recombee(
+                recommender, limit=movies_limit, workers=args.workers,
+                checkpoint=checkpoint, batch_size=args.batch_size)
         
         if not args.movies_only:
-            total_ratings = load_ratings_to_recombee(recommender, limit=ratings_limit)
+            total_ratings = load_ratings_to_recombee(
+                recommender, limit=ratings_limit, filepath=ratings_path,
+                stream=stream_ratings, chunk_size=args.chunk_size,
+                checkpoint=checkpoint, batch_size=args.batch_size)
     
     except KeyboardInterrupt:
         print("\n\n⚠️ Încărcare întreruptă de utilizator")
+        print(f"   Progres salvat ({checkpoint.describe()})")
+        print("   Continuă cu: python load_data.py --resume (aceleași opțiuni)")
         sys.exit(0)
     
     except Exception as e:
         print(f"\n❌ Eroare în timpul încărcării: {e}")
         import traceback
         traceback.print_exc()
+        print(f"\n💾 Progres salvat ({checkpoint.describe()}) - reia cu --resume")
         sys.exit(1)
     
     # Rezumat
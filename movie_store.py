@@ -0,0 +1,551 @@
+"""
+Movie Store Module - Corpusul de filme local, indexat pentru cererile aplicației
+"""
+import contextlib
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from data_loader import (
+    MOVIES_CACHE_VERSION, GenreIndex, check_movies_sources, load_merged_movies,
+    movies_sources_fingerprint, popularity_ranking
+)
+import config
+
+
+# Proprietatea din Recombee -> coloana din DataFrame-ul combinat
+ITEM_PROPERTIES = {
+    'title': 'title',
+    'overview': 'overview',
+    'genres': 'genre_names',
+    'director': 'director',
+    'vote_average': 'vote_average',
+    'vote_count': 'vote_count',
+    'runtime': 'runtime',
+    'release_date': 'release_date',
+    'poster_path': 'poster_path',
+}
+
+# Coloanele cu liste de string-uri, păstrate ca InternedLists
+LIST_COLUMNS = ('genre_names', 'keyword_names', 'actors')
+
+# Coloanele *_str sunt doar listele de mai sus unite cu ', ' - nu le păstrăm
+STR_COLUMNS = ('genres_str', 'keywords_str', 'actors_str')
+
+# Coloane cu puține valori distincte, păstrate ca pd.Categorical
+CATEGORICAL_COLUMNS = ('director',)
+
+
+_NO_POSITIONS = np.empty(0, dtype=np.int64)
+
+
+def _strings_size(values):
+    """Memoria ocupată de o secvență de string-uri Python (obiectele în sine)."""
+    return sum(sys.getsizeof(value) for value in values)
+
+
+class InternedLists:
+    """
+    O coloană de liste de string-uri (genuri, actori, keywords) codificată ca
+    dicționar: fiecare valoare distinctă este stocată o singură dată, iar
+    listele devin un array plat de coduri plus offset-urile rândurilor.
+
+    Lista rândului i este vocabulary[codes[offsets[i]:offsets[i + 1]]].
+    """
+
+    def __init__(self, lists):
+        """
+        Args:
+            lists: Listele per rând (valorile care nu sunt liste contează ca liste goale)
+        """
+        lists = pd.Series(list(lists), dtype=object)
+        exploded = lists.explode().dropna()
+
+        codes, uniques = pd.factorize(exploded, sort=False)
+        counts = np.bincount(exploded.index.to_numpy(dtype=np.int64), minlength=len(lists))
+
+        self.vocabulary = np.asarray(uniques, dtype=object)
+        self.codes = codes.astype(np.int32)
+        self.offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.offsets[1:])
+
+    @classmethod
+    def from_arrays(cls, vocabulary, codes, offsets):
+        """InternedLists din array-uri existente (de ex. mapate din snapshot)."""
+        lists = cls.__new__(cls)
+        lists.vocabulary = vocabulary
+        lists.codes = codes
+        lists.offsets = offsets
+        return lists
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def get(self, position):
+        """Lista rândului de pe poziția dată."""
+        start, end = self.offsets[position], self.offsets[position + 1]
+        return self.vocabulary[self.codes[start:end]].tolist()
+
+    def take(self, positions):
+        """Listele mai multor rânduri, în ordinea pozițiilor (o singură indexare)."""
+        positions = np.asarray(positions, dtype=np.int64)
+        starts = self.offsets[positions]
+        lengths = self.offsets[positions + 1] - starts
+
+        # Indicii tuturor elementelor, rând după rând, într-un singur array
+        row_starts = np.cumsum(lengths) - lengths
+        flat = np.repeat(starts - row_starts, lengths) + np.arange(lengths.sum())
+        values = self.vocabulary[self.codes[flat]].tolist()
+
+        result = []
+        for start, length in zip(row_starts.tolist(), lengths.tolist()):
+            result.append(values[start:start + length])
+        return result
+
+    def memory_usage(self):
+        """Memoria ocupată, în bytes (array-uri + string-urile din vocabular)."""
+        size = self.codes.nbytes + self.offsets.nbytes + self.vocabulary.nbytes
+        if self.vocabulary.dtype == object:
+            size += _strings_size(self.vocabulary)
+        return size
+
+
+class MovieStore:
+    """
+    Filmele combinate (load_merged_movies) plus indexurile folosite de app.py.
+
+    Căutarea după id folosește un index hash (id -> poziția rândului), deci
+    costă O(1) în loc de o mască booleană peste tot DataFrame-ul; listele de
+    id-uri se rezolvă printr-o singură operație vectorizată. Genurile sunt
+    codificate în coloana genre_mask (vezi GenreIndex).
+
+    Reprezentarea e compactă: listele (genuri, keywords, actori) sunt
+    InternedLists, regizorii sunt categoriali, iar coloanele *_str nu sunt
+    păstrate. Rândurile returnate (get, get_many, popular, ...) au listele
+    reconstruite, ca în DataFrame-ul original.
+    """
+
+    def __init__(self, movies_df):
+        movies_df = movies_df.reset_index(drop=True)
+        self.genre_index = GenreIndex(movies_df['genre_names'])
+
+        self.lists = {col: InternedLists(movies_df[col]) for col in LIST_COLUMNS if col in movies_df}
+        self.movies = movies_df.drop(columns=[c for c in LIST_COLUMNS + STR_COLUMNS if c in movies_df])
+        for col in self.movies.columns:
+            if col in CATEGORICAL_COLUMNS:
+                self.movies[col] = self.movies[col].astype('category')
+            elif isinstance(self.movies[col].dtype, pd.StringDtype):
+                # Un singur chunk Arrow: iloc pe o coloană cu multe chunk-uri e mult mai lent
+                self.movies[col] = pd.Series(self.movies[col].to_numpy(), dtype=self.movies[col].dtype)
+        self.movies['genre_mask'] = self.genre_index.encode(movies_df['genre_names'])
+
+        self._build_indexes()
+
+    @classmethod
+    def from_parts(cls, movies, lists, genre_index):
+        """
+        MovieStore din componentele deja compacte (de ex. mapate dintr-un
+        snapshot, vezi open_snapshot); doar indexurile se recalculează.
+        """
+        store = cls.__new__(cls)
+        store.movies = movies
+        store.lists = lists
+        store.genre_index = genre_index
+        store._build_indexes()
+        return store
+
+    def _build_indexes(self):
+        # La id-uri duplicate păstrăm primul rând (ca filtrarea originală + iloc[0])
+        ids = self.movies['id'].to_numpy()
+        first = ~self.movies['id'].duplicated().to_numpy()
+        self.id_index = pd.Index(ids[first])
+        self.id_positions = np.flatnonzero(first)
+
+        # Clasamentele se calculează o singură dată, la încărcarea corpusului
+        self._build_rankings()
+
+    def _build_rankings(self):
+        """
+        Clasamentul de popularitate (pozițiile rândurilor și popularity_score)
+        și listele per gen: toate filmele genului și cele mai populare.
+        """
+        self.popular_positions, self.popular_scores = popularity_ranking(self.movies)
+
+        masks = self.movies['genre_mask'].to_numpy()
+        self.popular_masks = masks[self.popular_positions]
+
+        # Pozițiile per gen, în dataset și în clasament (ordinea de popularitate se păstrează)
+        self.genre_positions = {}
+        self.popular_genre_ranks = {}
+        for genre, bit in self.genre_index.bits.items():
+            self.genre_positions[genre] = np.flatnonzero(masks & bit)
+            self.popular_genre_ranks[genre] = np.flatnonzero(self.popular_masks & bit)
+
+    def __len__(self):
+        return len(self.movies)
+
+    def _rows(self, positions, extra=None):
+        """Rândurile de pe pozițiile date, cu listele reconstruite (plus coloanele extra)."""
+        rows = self.movies.iloc[positions]
+        columns = dict(extra or {})
+        columns.update((col, lists.take(positions)) for col, lists in self.lists.items())
+        return pd.concat([rows, pd.DataFrame(columns, index=rows.index)], axis=1)
+
+    def _popular_rows(self, ranks):
+        """Rândurile din clasamentul de popularitate, cu popularity_score."""
+        return self._rows(self.popular_positions[ranks], {'popularity_score': self.popular_scores[ranks]})
+
+    def to_frame(self):
+        """Tot corpusul ca DataFrame cu liste (fără coloanele *_str)."""
+        return self._rows(np.arange(len(self.movies)))
+
+    def positions(self, movie_ids):
+        """
+        Pozițiile rândurilor pentru o listă de id-uri (-1 pentru cele lipsă
+        sau invalide), într-o singură căutare vectorizată.
+        """
+        keys = pd.to_numeric(pd.Series(list(movie_ids), dtype=object), errors='coerce')
+        found = self.id_index.get_indexer(keys)
+        return np.where(found >= 0, self.id_positions[found], -1)
+
+    def position(self, movie_id):
+        """Poziția rândului pentru un id (-1 dacă lipsește sau e invalid)."""
+        try:
+            return int(self.id_positions[self.id_index.get_loc(int(movie_id))])
+        except (KeyError, TypeError, ValueError):
+            return -1
+
+    def get(self, movie_id):
+        """Rândul unui film (pd.Series), sau None dacă id-ul nu există."""
+        position = self.position(movie_id)
+        if position < 0:
+            return None
+        return pd.concat([self.movies.iloc[position], self._lists_at(position)])
+
+    def _lists_at(self, position):
+        """Listele unui rând, ca pd.Series (coloană -> listă)."""
+        return pd.Series({col: lists.get(position) for col, lists in self.lists.items()}, dtype=object)
+
+    def get_many(self, movie_ids):
+        """Rândurile filmelor găsite, în ordinea id-urilor cerute (cele lipsă sunt omise)."""
+        positions = self.positions(movie_ids)
+        return self._rows(positions[positions >= 0])
+
+    def popular(self, n=20):
+        """Cele mai populare n filme (ca get_popular_movies, dar doar o felie)."""
+        return self._popular_rows(slice(0, n))
+
+    def movies_by_genre(self, genre, n=None):
+        """
+        Filmele unui gen: toate, în ordinea din dataset (ca get_movies_by_genre),
+        sau cele mai populare n dacă n este dat.
+        """
+        if n is None:
+            return self._rows(self.genre_positions.get(genre, _NO_POSITIONS))
+        return self._popular_rows(self.popular_genre_ranks.get(genre, _NO_POSITIONS)[:n])
+
+    def movies_with_genres(self, genres, match='any', n=None):
+        """
+        Filmele care au cel puțin unul dintre genuri (match='any') sau toate
+        (match='all'); toate în ordinea din dataset, sau cele mai populare n.
+        """
+        select = self.genre_index.all_of if match == 'all' else self.genre_index.any_of
+        if n is None:
+            return self._rows(np.flatnonzero(select(self.movies['genre_mask'].to_numpy(), genres)))
+        ranks = np.flatnonzero(select(self.popular_masks, genres))
+        return self._popular_rows(ranks[:n])
+
+    def similar(self, movie_id, n=10):
+        """
+        Filme asemănătoare calculate local: cele cu cele mai multe genuri
+        comune, la egalitate cele mai populare (fără filmul însuși).
+        """
+        position = self.position(movie_id)
+        if position < 0:
+            return self._popular_rows(_NO_POSITIONS)
+        mask = self.movies['genre_mask'].iat[position]
+        shared = np.zeros(len(self.popular_masks), dtype=np.int8)
+        for bit in self.genre_index.bits.values():
+            if mask & bit:
+                shared += (self.popular_masks & bit) != 0
+        shared[self.popular_positions == position] = 0
+        ranks = np.flatnonzero(shared)
+        ranks = ranks[np.argsort(-shared[ranks], kind='stable')[:n]]
+        return self._popular_rows(ranks)
+
+    def item_values(self, movie_id):
+        """
+        Proprietățile unui film, cu numele din Recombee (sursă pentru
+        ItemCatalog), sau None dacă filmul nu există în dataset.
+        """
+        position = self.position(movie_id)
+        if position < 0:
+            return None
+        row = self.movies.iloc[position]
+        return {
+            name: self.lists[column].get(position) if column in self.lists else row[column]
+            for name, column in ITEM_PROPERTIES.items()
+        }
+
+    def item_values_many(self, movie_ids):
+        """Proprietățile mai multor filme: dict id -> proprietăți (doar cele găsite)."""
+        rows = self.get_many(movie_ids)
+        columns = {name: rows[column].tolist() for name, column in ITEM_PROPERTIES.items()}
+        return {
+            str(movie_id): {name: values[i] for name, values in columns.items()}
+            for i, movie_id in enumerate(rows['id'].tolist())
+        }
+
+    def memory_usage(self):
+        """
+        Memoria ocupată pe componente, în bytes: coloanele scalare (deep),
+        listele interned și indexurile (id, clasamente, genuri).
+        """
+        usage = {'movies': int(self.movies.memory_usage(deep=True).sum())}
+        for col, lists in self.lists.items():
+            usage[col] = lists.memory_usage()
+        usage['indexes'] = int(
+            self.id_index.memory_usage(deep=True) + self.id_positions.nbytes
+            + self.popular_positions.nbytes + self.popular_scores.nbytes + self.popular_masks.nbytes
+            + sum(p.nbytes for p in self.genre_positions.values())
+            + sum(p.nbytes for p in self.popular_genre_ranks.values())
+        )
+        return usage
+
+
+class LocalRecommender:
+    """
+    Recomandări din corpusul local, folosite de MovieRecommender când
+    Recombee e indisponibil (circuit deschis, timeout). Rezultatele au
+    formatul recomandărilor Recombee cu return_properties: {'id', 'values'}.
+    """
+
+    def __init__(self, store):
+        """
+        Args:
+            store: Funcție care returnează MovieStore-ul (sau None dacă
+                   dataset-ul lipsește), apelată la fiecare cerere
+        """
+        self.store = store
+
+    def _recomms(self, store, rows):
+        values = store.item_values_many(rows['id'].tolist())
+        return [{'id': movie_id, 'values': values[movie_id]}
+                for movie_id in map(str, rows['id'].tolist()) if movie_id in values]
+
+    def popular(self, count, genres=None):
+        """Cele mai populare filme, din genurile date dacă există destule."""
+        store = self.store()
+        if store is None:
+            return []
+        rows = store.movies_with_genres(genres, n=count) if genres else store.popular(n=count)
+        if len(rows) < count // 2:
+            rows = store.popular(n=count)
+        return self._recomms(store, rows)
+
+    def similar(self, movie_id, count):
+        """Filmele cu cele mai multe genuri comune (vezi MovieStore.similar)."""
+        store = self.store()
+        if store is None:
+            return []
+        return self._recomms(store, store.similar(movie_id, n=count))
+
+
+# ==================== SNAPSHOT PARTAJAT ====================
+
+# Se incrementează la orice schimbare a formatului snapshot-ului; împreună cu
+# MOVIES_CACHE_VERSION (corpusul din care e construit) invalidează snapshot-ul
+MOVIE_STORE_VERSION = 1
+SNAPSHOT_MANIFEST = 'manifest.json'
+SNAPSHOT_MOVIES = 'movies.arrow'
+
+
+def _string_types(pa):
+    """String-urile Arrow rămân în buffer-ele mapate (StringDtype pyarrow, fără copiere)."""
+    dtype = pd.StringDtype('pyarrow', na_value=np.nan)
+    return {pa.string(): dtype, pa.large_string(): dtype}.get
+
+
+def _write_arrow(table, path, pa):
+    """Scrie atomic un tabel Arrow IPC necomprimat (poate fi mapat direct)."""
+    with pa.OSFile(path + '.tmp', 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(path + '.tmp', path)
+
+
+def _read_arrow(path, pa):
+    """DataFrame peste un fișier Arrow IPC mapat read-only (partajat prin page cache)."""
+    table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    return table.to_pandas(types_mapper=_string_types(pa), split_blocks=True)
+
+
+def _write_array(array, path):
+    """Scrie atomic un array NumPy (.npy, poate fi încărcat cu mmap_mode='r')."""
+    with open(path + '.tmp', 'wb') as f:
+        np.save(f, np.asarray(array))
+    os.replace(path + '.tmp', path)
+
+
+def _write_snapshot_manifest(manifest, directory):
+    manifest_path = os.path.join(directory, SNAPSHOT_MANIFEST)
+    with open(manifest_path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_path + '.tmp', manifest_path)
+
+
+def save_snapshot(store, directory=None, sources=None):
+    """
+    Scrie MovieStore ca snapshot mapabil: coloanele scalare și vocabularele
+    în Arrow IPC, codurile și offset-urile listelor în .npy.
+
+    Manifestul se scrie ultimul, deci un snapshot scris parțial nu este
+    niciodată considerat valid.
+
+    Args:
+        store: MovieStore-ul de salvat
+        directory: Directorul snapshot-ului (default: config.MOVIE_STORE_DIR)
+        sources: Amprentele fișierelor sursă din care a fost construit store-ul
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        print("ℹ️  pyarrow nu este instalat - snapshot-ul MovieStore este dezactivat")
+        return False
+
+    directory = directory or config.MOVIE_STORE_DIR
+    os.makedirs(directory, exist_ok=True)
+
+    manifest_path = os.path.join(directory, SNAPSHOT_MANIFEST)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    try:
+        _write_arrow(pa.Table.from_pandas(store.movies, preserve_index=False),
+                     os.path.join(directory, SNAPSHOT_MOVIES), pa)
+        for col, lists in store.lists.items():
+            vocabulary = pa.table({'value': pa.array(lists.vocabulary, pa.large_string())})
+            _write_arrow(vocabulary, os.path.join(directory, f'{col}.vocabulary.arrow'), pa)
+            _write_array(lists.codes, os.path.join(directory, f'{col}.codes.npy'))
+            _write_array(lists.offsets, os.path.join(directory, f'{col}.offsets.npy'))
+
+        _write_snapshot_manifest({
+            'version': MOVIE_STORE_VERSION,
+            'corpus_version': MOVIES_CACHE_VERSION,
+            'rows': len(store),
+            'lists': list(store.lists),
+            'genres': store.genre_index.vocabulary,
+            'sources': sources if sources is not None else movies_sources_fingerprint(),
+        }, directory)
+    except Exception as e:
+        print(f"⚠️  Nu s-a putut scrie snapshot-ul MovieStore: {e}")
+        return False
+
+    print(f"💾 Snapshot MovieStore salvat în {directory}")
+    return True
+
+
+def open_snapshot(directory=None):
+    """
+    Mapează read-only snapshot-ul din directory, dacă este valid pentru
+    versiunea codului și fișierele sursă curente. Paginile mapate sunt partajate de toate
+    procesele care deschid același snapshot.
+
+    Returns:
+        MovieStore sau None dacă snapshot-ul lipsește / este invalid
+    """
+    directory = directory or config.MOVIE_STORE_DIR
+    try:
+        with open(os.path.join(directory, SNAPSHOT_MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    versions = (manifest.get('version'), manifest.get('corpus_version'))
+    if versions != (MOVIE_STORE_VERSION, MOVIES_CACHE_VERSION):
+        print(f"ℹ️  Snapshot-ul MovieStore are versiunea {versions}, se reconstruiește "
+              f"(versiunea curentă {(MOVIE_STORE_VERSION, MOVIES_CACHE_VERSION)})")
+        return None
+
+    cached_sources = manifest.get('sources', {})
+    current_sources = check_movies_sources(cached_sources)
+    if current_sources is None:
+        return None
+
+    try:
+        import pyarrow as pa
+
+        movies = _read_arrow(os.path.join(directory, SNAPSHOT_MOVIES), pa)
+        lists = {
+            col: InternedLists.from_arrays(
+                _read_arrow(os.path.join(directory, f'{col}.vocabulary.arrow'), pa)['value'].array,
+                np.load(os.path.join(directory, f'{col}.codes.npy'), mmap_mode='r'),
+                np.load(os.path.join(directory, f'{col}.offsets.npy'), mmap_mode='r'),
+            )
+            for col in manifest['lists']
+        }
+    except Exception as e:
+        print(f"⚠️  Snapshot-ul MovieStore nu poate fi mapat: {e}")
+        return None
+
+    # Fișierele sursă au fost atinse (mtime nou) dar conținutul e identic
+    if current_sources != cached_sources:
+        manifest['sources'] = current_sources
+        _write_snapshot_manifest(manifest, directory)
+
+    return MovieStore.from_parts(movies, lists, GenreIndex(preferred=manifest['genres']))
+
+
+@contextlib.contextmanager
+def _build_lock(directory):
+    """Lock exclusiv pe directorul snapshot-ului (doar un proces îl construiește)."""
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+
+    with open(os.path.join(directory, '.lock'), 'w') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def load_shared_movie_store(directory=None):
+    """
+    MovieStore mapat din snapshot-ul partajat (config.MOVIE_STORE_DIR).
+
+    Dacă snapshot-ul lipsește sau e invalid, primul proces îl construiește
+    (din load_merged_movies), sub un lock, iar celelalte așteaptă și îl
+    mapează după aceea. Worker-ii în plus pornesc astfel fără parsare și
+    împart aceleași pagini de memorie.
+    """
+    directory = directory or config.MOVIE_STORE_DIR
+    store = open_snapshot(directory)
+    if store is not None:
+        print(f"⚡ MovieStore mapat din snapshot ({len(store)} filme, {directory})")
+        return store
+
+    os.makedirs(directory, exist_ok=True)
+    with _build_lock(directory):
+        # Între timp un alt proces poate să fi construit snapshot-ul
+        store = open_snapshot(directory)
+        if store is not None:
+            return store
+
+        sources = movies_sources_fingerprint()
+        built = MovieStore(load_merged_movies())
+        if not save_snapshot(built, directory, sources):
+            return built
+        return open_snapshot(directory) or built
+
+
+if __name__ == '__main__':
+    # Construiește (sau validează) snapshot-ul înainte de pornirea worker-ilor
+    store = load_shared_movie_store()
+    print(f"✅ {len(store)} filme în snapshot-ul {config.MOVIE_STORE_DIR}")
@@ -0,0 +1,370 @@
+"""
+Rating Buffer Module - Write-behind pentru rating-urile din /api/rate
+
+/api/rate confirmă rating-ul după ce l-a scris în jurnalul local; un thread
+de fundal le trimite la Recombee în Batch-uri, la un prag de mărime sau de
+timp. Rating-urile repetate pentru aceeași pereche (user, film) dinaintea unui
+flush se comasează (ultimul câștigă).
+"""
+import glob
+import json
+import os
+import threading
+import time
+
+import requests as requests_lib
+from recombee_api_client.exceptions import APIException
+
+from recombee_client import is_retryable_error
+import config
+
+
+class RatingBufferFull(Exception):
+    """Buffer-ul e plin (Recombee nu ține pasul) - clientul trebuie să reîncerce."""
+
+
+def _lock_file(f):
+    """Lock exclusiv non-blocant; False dacă e deținut de alt proces."""
+    try:
+        import fcntl
+    except ImportError:
+        return True  # Fără fcntl (Windows) presupunem un singur proces
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+class RatingBuffer:
+    """
+    Coadă write-behind pentru rating-uri, cu memorie limitată.
+
+    Fiecare rating acceptat este adăugat în jurnalul procesului (JSON lines)
+    înainte de confirmare. Jurnalul este compactat după fiecare flush reușit
+    și, la repornire, jurnalele proceselor oprite (lock-ul lor nu mai e
+    deținut) sunt preluate și retrimise. Retrimiterea e sigură: un rating deja
+    existent (același user, film și timestamp) primește 409, tratat ca succes.
+    """
+
+    def __init__(self, recommender, directory=None, batch_size=None, max_delay=None,
+                 max_pending=None, put_timeout=None, fsync=None):
+        """
+        Args:
+            recommender: MovieRecommender prin care se trimit Batch-urile
+            directory: Directorul jurnalelor (default: config.RATING_BUFFER_DIR)
+            batch_size: Rating-uri per Batch (flush imediat când sunt atâtea)
+            max_delay: Secunde maxime cât un rating așteaptă în buffer
+            max_pending: Perechi (user, film) distincte în așteptare, maxim
+            put_timeout: Secunde de așteptare în add() când buffer-ul e plin
+            fsync: fsync după fiecare rating (durabil și la căderea sistemului)
+        """
+        self.recommender = recommender
+        self.directory = directory or config.RATING_BUFFER_DIR
+        self.batch_size = batch_size or config.RATING_BUFFER_BATCH_SIZE
+        self.max_delay = max_delay if max_delay is not None else config.RATING_BUFFER_MAX_DELAY
+        self.max_pending = max_pending or config.RATING_BUFFER_MAX_PENDING
+        self.put_timeout = put_timeout if put_timeout is not None else config.RATING_BUFFER_PUT_TIMEOUT
+        self.fsync = config.RATING_BUFFER_FSYNC if fsync is None else fsync
+
+        self.lock = threading.Lock()
+        self.not_empty = threading.Condition(self.lock)
+        self.not_full = threading.Condition(self.lock)
+        self.pending = {}  # (user_id, movie_id) -> (rating, timestamp), în ordinea sosirii
+        self.oldest = None  # momentul (monotonic) primului rating din buffer
+        self.flush_requested = False
+        self.stopping = False
+        self.dirty = None  # chei adăugate în timpul unei compactări (vezi _compact)
+        self.orphans = []  # (jurnal, fișier lock deschis) preluate de la procese oprite
+        self.retry_delay = recommender.batch_retry_delay
+        self.counters = {'accepted': 0, 'coalesced': 0, 'rejected': 0,
+                         'sent': 0, 'batches': 0, 'failed': 0, 'dropped': 0}
+
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"ratings-{os.getpid()}-{time.time_ns()}"
+        self.journal_path = os.path.join(self.directory, name + '.jsonl')
+        # Lock-ul apare sub numele final deja deținut: un alt proces care caută
+        # jurnale orfane nu îl poate prinde între creare și flock
+        self.lock_path = os.path.join(self.directory, name + '.lock')
+        self.lock_handle = open(self.lock_path + '.tmp', 'w')
+        _lock_file(self.lock_handle)
+        os.rename(self.lock_path + '.tmp', self.lock_path)
+
+        recovered = self._recover_orphans()
+        self.journal = None
+        self._compact()
+        if recovered:
+            print(f"♻️  Rating-uri nesincronizate preluate din jurnal: {recovered}")
+
+        self.flusher = threading.Thread(target=self._run, name='rating-flusher', daemon=True)
+        self.flusher.start()
+
+    # ==================== JURNAL ====================
+
+    def _recover_orphans(self):
+        """Preia jurnalele proceselor oprite; returnează numărul de rating-uri."""
+        recovered = 0
+        for lock_path in sorted(glob.glob(os.path.join(self.directory, 'ratings-*.lock'))):
+            journal_path = lock_path[:-len('.lock')] + '.jsonl'
+            if journal_path == self.journal_path:
+                continue
+            handle = open(lock_path, 'a')
+            if not _lock_file(handle):
+                handle.close()
+                continue  # Procesul încă rulează
+            recovered += self._replay(journal_path)
+            self.orphans.append((journal_path, handle))
+        return recovered
+
+    def _replay(self, journal_path):
+        """Încarcă un jurnal în buffer (ultimul rating per pereche câștigă)."""
+        count = 0
+        try:
+            with open(journal_path) as f:
+                for line in f:
+                    try:
+                        user_id, movie_id, rating, timestamp = json.loads(line)
+                    except ValueError:
+                        continue  # Ultima linie poate fi scrisă parțial
+                    self.pending.pop((user_id, movie_id), None)
+                    self.pending[(user_id, movie_id)] = (rating, timestamp)
+                    count += 1
+        except FileNotFoundError:
+            pass
+        return count
+
+    def _compact(self):
+        """
+        Rescrie atomic jurnalul cu rating-urile încă netrimise (apelat fără
+        lock, doar din __init__ și din flusher); jurnalele preluate la
+        pornire sunt șterse după.
+
+        Copia rating-urilor se scrie și se sincronizează fără lock, deci add()
+        nu așteaptă după fsync. Rating-urile sosite între timp sunt adăugate
+        în fișierul nou sub lock, chiar înainte de înlocuirea jurnalului.
+        """
+        with self.lock:
+            snapshot = list(self.pending.items())
+            self.dirty = []
+
+        tmp_path = self.journal_path + '.tmp'
+        journal = open(tmp_path, 'w')
+        for (user_id, movie_id), (rating, timestamp) in snapshot:
+            journal.write(json.dumps([user_id, movie_id, rating, timestamp]) + '\n')
+        journal.flush()
+        os.fsync(journal.fileno())
+
+        with self.lock:
+            for key in self.dirty:
+                entry = self.pending.get(key)
+                if entry is not None:
+                    journal.write(json.dumps([key[0], key[1], entry[0], entry[1]]) + '\n')
+            journal.flush()
+            if self.dirty and self.fsync:
+                os.fsync(journal.fileno())
+            self.dirty = None
+            os.replace(tmp_path, self.journal_path)
+            if self.journal is not None:
+                self.journal.close()
+            self.journal = journal
+            if self.pending and self.oldest is None:
+                self.oldest = time.monotonic()
+
+        # Lock-urile preluate se eliberează abia după ștergerea jurnalelor
+        for journal_path, handle in self.orphans:
+            for path in (journal_path, journal_path + '.tmp', handle.name):
+                if os.path.exists(path):
+                    os.remove(path)
+            handle.close()
+        self.orphans.clear()
+
+    # ==================== API ====================
+
+    def add(self, user_id, movie_id, rating, timestamp=None):
+        """
+        Acceptă un rating: îl scrie în jurnal și îl pune în coada de trimitere.
+
+        Raises:
+            RatingBufferFull: Dacă buffer-ul rămâne plin put_timeout secunde
+        """
+        key = (str(user_id), str(movie_id))
+        entry = (float(rating), timestamp if timestamp is not None else time.time())
+
+        with self.lock:
+            if self.stopping:
+                raise RatingBufferFull("Buffer-ul de rating-uri se închide")
+
+            # Backpressure: o pereche nouă intră doar dacă mai e loc
+            deadline = time.monotonic() + self.put_timeout
+            while key not in self.pending and len(self.pending) >= self.max_pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self.stopping:
+                    self.counters['rejected'] += 1
+                    raise RatingBufferFull(f"{len(self.pending)} rating-uri în așteptare")
+                self.not_full.wait(remaining)
+
+            self.journal.write(json.dumps([key[0], key[1], entry[0], entry[1]]) + '\n')
+            self.journal.flush()
+            if self.fsync:
+                os.fsync(self.journal.fileno())
+
+            if self.dirty is not None:
+                self.dirty.append(key)
+            if key in self.pending:
+                self.counters['coalesced'] += 1
+                del self.pending[key]
+            self.pending[key] = entry
+            self.counters['accepted'] += 1
+
+            if self.oldest is None:
+                # Flusher-ul poate aștepta fără timeout (buffer gol): își recalculează termenul
+                self.oldest = time.monotonic()
+                self.not_empty.notify()
+            elif len(self.pending) >= self.batch_size:
+                self.not_empty.notify()
+
+    def flush(self, timeout=None):
+        """Cere un flush imediat și așteaptă golirea buffer-ului (sau timeout-ul)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.lock:
+            self.flush_requested = True
+            self.not_empty.notify()
+            while self.pending and self.flusher.is_alive():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.not_full.wait(remaining)
+        return not self.pending
+
+    def close(self, timeout=30):
+        """Oprește flusher-ul după trimiterea rating-urilor rămase (la shutdown)."""
+        with self.lock:
+            if self.stopping:
+                return
+            self.stopping = True
+            self.not_empty.notify()
+            self.not_full.notify_all()
+        self.flusher.join(timeout)
+
+        if self.flusher.is_alive():
+            # Un Batch e încă în zbor: jurnalul și lock-ul rămân (preluate la repornire)
+            print(f"⚠️  Flusher-ul nu s-a oprit în {timeout}s; jurnalul rămâne pentru următoarea pornire")
+            return
+
+        with self.lock:
+            if self.pending:
+                print(f"⚠️  {len(self.pending)} rating-uri rămân în jurnal pentru următoarea pornire")
+            self.journal.close()
+            if not self.pending:
+                os.remove(self.journal_path)
+                os.remove(self.lock_path)
+            self.lock_handle.close()
+
+    def __len__(self):
+        return len(self.pending)
+
+    def stats(self):
+        """Statistici pentru monitorizare (format apropiat de TTLCache.stats)."""
+        with self.lock:
+            return {
+                'name': 'rating_buffer',
+                'size': len(self.pending),
+                'maxsize': self.max_pending,
+                'batch_size': self.batch_size,
+                **self.counters,
+            }
+
+    # ==================== FLUSHER ====================
+
+    def _due(self):
+        if not self.pending:
+            self.flush_requested = False
+            return False
+        if self.stopping or self.flush_requested or len(self.pending) >= self.batch_size:
+            return True
+        return time.monotonic() - self.oldest >= self.max_delay
+
+    def _run(self):
+        while True:
+            with self.lock:
+                while not self._due():
+                    if self.stopping:
+                        return
+                    timeout = None
+                    if self.pending:
+                        timeout = max(0.0, self.oldest + self.max_delay - time.monotonic())
+                    self.not_empty.wait(timeout)
+
+                # Cele mai vechi batch_size rating-uri (dict-ul păstrează ordinea sosirii)
+                keys = list(self.pending)[:self.batch_size]
+                batch = [(key, self.pending[key]) for key in keys]
+
+            failed = self._send(batch)
+
+            with self.lock:
+                for key, entry in batch:
+                    # Un rating mai nou pentru aceeași pereche rămâne în buffer
+                    if self.pending.get(key) == entry and key not in failed:
+                        del self.pending[key]
+                self.oldest = time.monotonic() if self.pending else None
+                self.not_full.notify_all()
+
+            self._compact()
+
+            if failed and not self.stopping:
+                time.sleep(self.retry_delay)
+                self.retry_delay = min(self.retry_delay * 2, 60)
+            elif failed:
+                return  # La shutdown nu mai insistăm - rating-urile rămân în jurnal
+            else:
+                self.retry_delay = self.recommender.batch_retry_delay
+
+    def _send(self, batch):
+        """
+        Trimite un Batch de AddRating; returnează perechile care trebuie
+        reîncercate (eroare temporară). Cele respinse definitiv sunt omise.
+
+        Un Batch respins în întregime (eroare definitivă, de ex. 400) este
+        împărțit în două până la rating-ul care îl invalidează, ca restul să
+        nu rămână blocat în buffer.
+        """
+        rec = self.recommender
+        requests = [rec._rating_request(user_id, movie_id, rating, timestamp)
+                    for (user_id, movie_id), (rating, timestamp) in batch]
+
+        try:
+            response = rec._send_batch(requests, f"Rating-uri ({len(requests)})")
+        except (APIException, requests_lib.exceptions.RequestException) as e:
+            if is_retryable_error(e):
+                print(f"⚠️  Rating-urile nu au putut fi trimise, se reîncearcă: {e}")
+                with self.lock:
+                    self.counters['failed'] += len(batch)
+                return {key for key, _ in batch}
+            if len(batch) > 1:
+                half = len(batch) // 2
+                return self._send(batch[:half]) | self._send(batch[half:])
+            (user_id, movie_id), _ = batch[0]
+            print(f"⚠️  Rating respins de Recombee ({user_id}, {movie_id}): {e}")
+            with self.lock:
+                self.counters['dropped'] += 1
+            return set()
+
+        failed = set()
+        users = set()
+        with self.lock:
+            for (key, _), result in zip(batch, rec._batch_responses(requests, response)):
+                if not isinstance(result, Exception) or result.status_code == 409:
+                    self.counters['sent'] += 1
+                    users.add(key[0])
+                elif is_retryable_error(result):
+                    self.counters['failed'] += 1
+                    failed.add(key)
+                else:
+                    print(f"⚠️  Rating respins de Recombee ({key[0]}, {key[1]}): {result}")
+                    self.counters['dropped'] += 1
+            self.counters['batches'] += 1
+
+        # Recomandările utilizatorilor se recalculează cu noile rating-uri
+        for user_id in users:
+            rec.recommendation_cache.invalidate_tag(user_id)
+        return failed
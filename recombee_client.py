@@ -9,8 +9,20 @@ from recombee_api_client.api_requests import (
     Batch, ResetDatabase, ListItems, ListUsers, GetItemValues, GetUserValues,
     ListUserRatings
 )
-from recombee_api_client.exceptions import APIException
+from recombee_api_client.exceptions import APIException, ApiTimeoutException, ResponseException
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from tqdm import tqdm
+from queue import Queue
+import numpy as np
+import itertools
+import json
+import random
+import requests as requests_lib
+import threading
+from cache import TTLCache
+from catalog import ItemCatalog
+from circuit_breaker import BreakerClient, CircuitOpenError
+from hedging import Hedger
 import config
 import time
 
@@ -66,6 +78,293 @@ def retry_on_timeout(max_retries=2, initial_delay=0.5):
     return decorator
 
 
+class TokenBucket:
+    """
+    Rate limiter de tip token bucket, thread-safe.
+    
+    Permite în medie `rate` operații pe secundă, cu rafale de până la
+    `capacity` operații. Cu rate None sau 0 nu limitează nimic.
+    """
+    
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate or 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self, tokens=1):
+        """Blochează până când sunt disponibile `tokens` jetoane."""
+        if not self.rate:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait_time = (tokens - self.tokens) / self.rate
+            time.sleep(wait_time)
+
+
+class DeadlineExceeded(APIException):
+    """Bugetul de timp al cererii s-a terminat înainte de trimiterea la Recombee."""
+
+
+class PartialResult(Exception):
+    """
+    Rezultat incomplet (bugetul de timp nu a permis și fallback-ul): ridicat
+    din loader-ul unui cache ca să nu fie memorat, dar servit apelantului.
+    """
+    
+    def __init__(self, result):
+        super().__init__(f"Rezultat incomplet ({len(result)} elemente)")
+        self.result = result
+
+
+class Deadline:
+    """
+    Bugetul total de timp al unei cereri (de ex. o cerere HTTP a aplicației).
+    
+    Fiecare send() către Recombee primește ca timeout doar cât a rămas din
+    buget, deci apelurile succesive (Batch, apoi fallback) nu pot depăși
+    împreună bugetul inițial.
+    """
+    
+    def __init__(self, budget_ms=None):
+        """
+        Args:
+            budget_ms: Bugetul în milisecunde (default: config.RECOMBEE_REQUEST_TIMEOUT)
+        """
+        self.budget_ms = budget_ms if budget_ms is not None else config.RECOMBEE_REQUEST_TIMEOUT
+        self.expires_at = time.monotonic() + self.budget_ms / 1000
+    
+    def remaining(self):
+        """Milisecundele rămase (0 dacă bugetul s-a terminat)."""
+        return max(0, int((self.expires_at - time.monotonic()) * 1000))
+    
+    def allows(self, min_ms):
+        """True dacă au rămas cel puțin min_ms (pentru munca opțională)."""
+        return self.remaining() >= min_ms
+    
+    def apply(self, request):
+        """
+        Setează timeout-ul cererii la bugetul rămas.
+        
+        Raises:
+            DeadlineExceeded: Dacă rămân mai puțin de RECOMBEE_MIN_REQUEST_TIMEOUT ms
+        """
+        remaining = self.remaining()
+        if remaining < config.RECOMBEE_MIN_REQUEST_TIMEOUT:
+            raise DeadlineExceeded(f"Buget de timp epuizat ({self.budget_ms} ms)")
+        request.timeout = remaining
+        return request
+
+
+def is_retryable_error(error):
+    """Timeout-uri, erori de rețea, 429 și 5xx merită reîncercate; restul nu."""
+    if isinstance(error, (ApiTimeoutException, requests_lib.exceptions.ConnectionError)):
+        return True
+    if isinstance(error, ResponseException):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+class AdaptiveBatchSizer:
+    """
+    Alege dimensiunea Batch-urilor din latența, mărimea payload-ului și
+    erorile observate.
+    
+    Dimensiunea crește (x1.5) cât timp throughput-ul (elemente / secundă per
+    batch) se îmbunătățește, revine la cea mai bună dimensiune când nu mai
+    crește și se înjumătățește la timeout-uri sau erori temporare. Nu depășește
+    max_size, max_bytes și nici o latență de peste target_latency.
+    """
+    
+    SAMPLES_PER_STEP = 3  # batch-uri măsurate înainte de a decide
+    PROBE_EVERY = 10      # pași stabili după care încercăm din nou să creștem
+    
+    def __init__(self, initial=1000, min_size=50, max_size=RecombeeClient.BATCH_MAX_SIZE,
+                 max_bytes=None, target_latency=None):
+        self.size = initial
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_bytes = max_bytes or config.RECOMBEE_BATCH_MAX_BYTES
+        self.target_latency = target_latency or config.RECOMBEE_BATCH_TIMEOUT / 1000 / 2
+        self.lock = threading.Lock()
+        self.samples = []
+        self.best = None  # (dimensiune, throughput)
+        self.growing = True
+        self.stable_steps = 0
+        self.bytes_per_item = None
+        self.batches = 0
+        self.errors = 0
+    
+    def record(self, size, latency, payload_bytes=None, error=None):
+        """Înregistrează rezultatul unui batch trimis (apelat din thread-urile de upload)."""
+        with self.lock:
+            self.batches += 1
+            if payload_bytes and size:
+                per_item = payload_bytes / size
+                self.bytes_per_item = per_item if self.bytes_per_item is None \
+                    else 0.8 * self.bytes_per_item + 0.2 * per_item
+            
+            if error is not None:
+                self.errors += 1
+                if is_retryable_error(error):
+                    # Timeout / supraîncărcare: micșorăm imediat
+                    self._resize(size * 0.5)
+                    self.best = None
+                    self.growing = False
+                return
+            
+            # Luăm în calcul doar batch-urile trimise cu dimensiunea curentă
+            if size != self.size or latency <= 0:
+                return
+            self.samples.append((size / latency, latency))
+            if len(self.samples) < self.SAMPLES_PER_STEP:
+                return
+            
+            throughput = sum(t for t, _ in self.samples) / len(self.samples)
+            mean_latency = sum(l for _, l in self.samples) / len(self.samples)
+            self.samples = []
+            
+            if mean_latency > self.target_latency:
+                self._resize(self.size * self.target_latency / mean_latency)
+                self.growing = False
+            elif self.best is None or throughput > self.best[1] * 1.05:
+                self.best = (self.size, throughput)
+                self.growing = True
+                self._resize(self.size * 1.5)
+            elif self.growing:
+                # Nu mai câștigăm - revenim la cea mai bună dimensiune
+                self.growing = False
+                self.stable_steps = 0
+                self._resize(self.best[0])
+            else:
+                self.stable_steps += 1
+                if self.stable_steps >= self.PROBE_EVERY:
+                    self.stable_steps = 0
+                    self.best = (self.size, throughput)
+                    self.growing = True
+                    self._resize(self.size * 1.5)
+    
+    def _resize(self, size):
+        limit = self.max_size
+        if self.bytes_per_item:
+            limit = min(limit, int(self.max_bytes / self.bytes_per_item))
+        self.size = int(max(self.min_size, min(limit, size)))
+        self.samples = []
+    
+    def report(self, name):
+        """Afișează dimensiunea la care s-a stabilizat și o returnează."""
+        print(f"📏 Batch-uri {name}: dimensiune finală {self.size:,} "
+              f"({self.batches:,} batch-uri, {self.errors} erori)")
+        return self.size
+
+
+def _rebatch(batches, sizer):
+    """
+    Re-împarte un flux de batch-uri columnare la dimensiunea curentă
+    a sizer-ului (care se poate schimba între batch-uri).
+    """
+    buffer = None
+    for batch in batches:
+        if buffer is None:
+            buffer = {key: list(values) for key, values in batch.items()}
+        else:
+            for key, values in batch.items():
+                buffer[key].extend(values)
+        
+        while len(buffer['user_id']) >= sizer.size:
+            size = sizer.size
+            yield {key: values[:size] for key, values in buffer.items()}
+            buffer = {key: values[size:] for key, values in buffer.items()}
+    
+    if buffer and buffer['user_id']:
+        yield buffer
+
+
+def _batch_len(items):
+    """Numărul de elemente dintr-o listă sau dintr-un batch columnar."""
+    if isinstance(items, dict):
+        return len(items['user_id'])
+    return len(items)
+
+
+def _split_batch(items):
+    """Împarte o listă sau un batch columnar în două jumătăți."""
+    half = _batch_len(items) // 2
+    if isinstance(items, dict):
+        return ({key: values[:half] for key, values in items.items()},
+                {key: values[half:] for key, values in items.items()})
+    return items[:half], items[half:]
+
+
+def _payload_bytes(requests):
+    """Mărimea aproximativă (JSON) a corpului unui Batch."""
+    return sum(len(json.dumps(r.get_body_parameters(), default=str)) for r in requests)
+
+
+class _UploadWindow:
+    """
+    Fereastră de batch-uri trimise în paralel peste un ThreadPoolExecutor.
+    
+    submit() blochează când sunt deja 2 x concurrency batch-uri în zbor,
+    deci generatorul de batch-uri nu avansează mai repede decât upload-ul.
+    """
+    
+    def __init__(self, concurrency):
+        self.pool = ThreadPoolExecutor(max_workers=concurrency)
+        self.limit = concurrency * 2
+        self.inflight = set()
+    
+    def submit(self, fn, *args):
+        while len(self.inflight) >= self.limit:
+            _, self.inflight = wait(self.inflight, return_when=FIRST_COMPLETED)
+        future = self.pool.submit(fn, *args)
+        self.inflight.add(future)
+        return future
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        # La o eroare (ex. Ctrl-C) nu mai pornim batch-urile încă neîncepute
+        self.pool.shutdown(wait=True, cancel_futures=exc_type is not None)
+        return False
+
+
+def _prefetch(iterable, size):
+    """
+    Consumă `iterable` într-un thread separat, ținând cel mult `size`
+    elemente pregătite în avans. Excepțiile din producător sunt re-ridicate.
+    """
+    queue = Queue(maxsize=size)
+    done = object()
+    
+    def produce():
+        try:
+            for item in iterable:
+                queue.put(item)
+        except BaseException as e:
+            queue.put(e)
+        finally:
+            queue.put(done)
+    
+    threading.Thread(target=produce, daemon=True).start()
+    
+    while True:
+        item = queue.get()
+        if item is done:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        yield item
+
+
 class MovieRecommender:
     """
     Client pentru sistemul de recomandare filme folosind Recombee.
@@ -75,7 +374,8 @@ class MovieRecommender:
     - Filtrare Bazată pe Conținut (bazată pe metadate: gen, regizor, actori, keywords)
     """
     
-    def __init__(self, database_id=None, private_token=None, region=None):
+    def __init__(self, database_id=None, private_token=None, region=None,
+                 upload_concurrency=None, batch_rate_limit=None, local=None):
         """
         Inițializează clientul Recombee.
         
@@ -83,6 +383,10 @@ class MovieRecommender:
             database_id: ID-ul bazei de date Recombee
             private_token: Token-ul privat pentru autentificare
             region: Regiunea serverului ('eu-west', 'us-west', 'ap-se')
+            upload_concurrency: Numărul de Batch-uri trimise în paralel la încărcarea în masă
+            batch_rate_limit: Numărul maxim de Batch-uri pe secundă (token bucket)
+            local: Sursă de recomandări locale (vezi movie_store.LocalRecommender),
+                   folosită când Recombee e indisponibil
         """
         self.database_id = database_id or config.RECOMBEE_DATABASE_ID
         self.private_token = private_token or config.RECOMBEE_PRIVATE_TOKEN
@@ -99,15 +403,51 @@ class MovieRecommender:
         self.region = region_map.get(self.region_str.lower(), Region.EU_WEST)
         
         # Inițializăm clientul Recombee cu regiunea corectă
-        self.client = RecombeeClient(
+        self.bulk_client = RecombeeClient(
             self.database_id, 
             self.private_token,
             region=self.region
         )
+        # Cererile din request path trec prin circuit breaker (per tip de cerere);
+        # încărcarea în masă (_send_batch) are propriile retry-uri și rate limit,
+        # iar scripturile de administrare (setup, statistici, reset) nu au fallback
+        # local, deci merg direct la Recombee prin bulk_client
+        self.client = self.bulk_client
+        if config.CIRCUIT_BREAKER_ENABLED:
+            self.client = BreakerClient(self.bulk_client)
+        # Opțional: citirile idempotente lente sunt dublate (vezi hedging.Hedger)
+        self.hedger = Hedger(self.client.send) if config.RECOMBEE_HEDGING_ENABLED else None
+        self.local = local
+        
+        # Bugetul de timp implicit al unui apel public (vezi Deadline); timeout-ul
+        # se setează per request, la cât a rămas din buget
+        self.default_timeout = config.RECOMBEE_REQUEST_TIMEOUT
         
-        # Setează timeout personalizat (default e 1000ms)
-        # Timeout-ul se setează per request, nu per client
-        self.default_timeout = 5000  # 5 secunde
+        # Încărcare în masă: Batch-uri în paralel, limitate ca rată și cu retry
+        self.upload_concurrency = max(1, upload_concurrency or config.RECOMBEE_UPLOAD_CONCURRENCY)
+        self.rate_limiter = TokenBucket(
+            batch_rate_limit if batch_rate_limit is not None else config.RECOMBEE_BATCH_RATE_LIMIT)
+        self.batch_retries = config.RECOMBEE_BATCH_RETRIES
+        self.batch_timeout = config.RECOMBEE_BATCH_TIMEOUT
+        self.batch_retry_delay = 1.0
+        
+        # Cache pentru recomandările per utilizator (invalidat la rating / view)
+        self.recommendation_cache = TTLCache(
+            config.RECOMMENDATION_CACHE_SIZE, config.RECOMMENDATION_CACHE_TTL, name='recommendations')
+        # Ultimele recomandări servite (neinvalidate), pentru când Recombee e indisponibil
+        self.last_recommendations = TTLCache(
+            config.RECOMMENDATION_CACHE_SIZE, config.RECOMMENDATION_STALE_TTL, name='last_recommendations')
+        
+        # Preferințele utilizatorilor (GetUserValues), ținute local pentru booster
+        self.user_preferences = TTLCache(
+            config.USER_PREFERENCES_CACHE_SIZE, config.USER_PREFERENCES_CACHE_TTL, name='user_preferences')
+        # Recomandările cold start, comune tuturor utilizatorilor noi (per set de genuri)
+        self.cold_start_cache = TTLCache(
+            config.COLD_START_CACHE_SIZE, config.COLD_START_CACHE_TTL, name='cold_start')
+        # Detaliile filmelor (/api/movie), completate din return_properties
+        self.item_catalog = ItemCatalog()
+        # Rata cu care genurile cerute au avut nevoie de fallback-ul fără filtru
+        self.fallback_rates = {}
         
         print(f"✅ Client Recombee inițializat pentru database: {self.database_id}")
     
@@ -138,7 +478,7 @@ class MovieRecommender:
         
         try:
             # Trimitem toate request-urile în batch
-            self.client.send(Batch(requests))
+            self.bulk_client.send(Batch(requests))
             print(f"✅ Configurate {len(properties)} proprietăți pentru filme")
         except APIException as e:
             if 'already exists' in str(e).lower():
@@ -164,7 +504,7 @@ class MovieRecommender:
             requests.append(AddUserProperty(prop_name, prop_type))
         
         try:
-            self.client.send(Batch(requests))
+            self.bulk_client.send(Batch(requests))
             print(f"✅ Configurate {len(properties)} proprietăți pentru utilizatori")
         except APIException as e:
             if 'already exists' in str(e).lower():
@@ -172,17 +512,10 @@ class MovieRecommender:
             else:
                 raise
     
-    def add_movie(self, movie_data):
-        """
-        Adaugă un film în catalogul Recombee.
-        
-        Args:
-            movie_data: Dict cu datele filmului
-        """
-        item_id = movie_data['item_id']
-        
-        # Pregătim valorile pentru Recombee - asigurăm tipurile corecte
-        values = {
+    @staticmethod
+    def _movie_values(movie_data):
+        """Valorile unui film pentru Recombee, cu tipurile corecte."""
+        return {
             'title': str(movie_data.get('title', '')),
             'overview': str(movie_data.get('overview', '')),
             'genres': movie_data.get('genres', []) if isinstance(movie_data.get('genres'), list) else [],
@@ -195,49 +528,132 @@ class MovieRecommender:
             'runtime': int(movie_data.get('runtime', 0)),
             'poster_path': str(movie_data.get('poster_path', '')),
         }
+    
+    def add_movie(self, movie_data):
+        """
+        Adaugă un film în catalogul Recombee.
+        
+        Args:
+            movie_data: Dict cu datele filmului
+        """
+        item_id = movie_data['item_id']
         
         # Setăm valorile (creează item-ul dacă nu există)
-        self.client.send(SetItemValues(item_id, values, cascade_create=True))
+        self.bulk_client.send(SetItemValues(item_id, self._movie_values(movie_data), cascade_create=True))
     
-    def add_movies_batch(self, movies_list, batch_size=1000):
+    def _send_batch(self, requests, description, size=None, sizer=None):
+        """
+        Trimite un Batch respectând rate limit-ul, cu retry și backoff
+        exponențial (cu jitter) pentru erorile temporare.
+        
+        Args:
+            requests: Cererile din Batch
+            description: Text pentru mesajele de eroare
+            size: Numărul de elemente (filme / rating-uri) din batch
+            sizer: AdaptiveBatchSizer care primește latența și erorile observate
+        
+        Raises:
+            Ultima excepție, dacă batch-ul eșuează după toate încercările
+        """
+        payload_bytes = _payload_bytes(requests) if sizer else None
+        delay = self.batch_retry_delay
+        for attempt in range(self.batch_retries + 1):
+            self.rate_limiter.acquire()
+            batch = Batch(requests)
+            batch.timeout = self.batch_timeout
+            start = time.monotonic()
+            try:
+                response = self.bulk_client.send(batch)
+                if sizer:
+                    sizer.record(size, time.monotonic() - start, payload_bytes)
+                return response
+            except (APIException, requests_lib.exceptions.RequestException) as e:
+                if sizer:
+                    sizer.record(size, time.monotonic() - start, payload_bytes, error=e)
+                if attempt >= self.batch_retries or not is_retryable_error(e):
+                    raise
+                if sizer and size > sizer.size:
+                    raise  # Batch-ul a devenit prea mare - îl împarte _send_sized
+                print(f"⏳ {description}: {e} - retry {attempt + 1}/{self.batch_retries} după {delay:.1f}s...")
+                time.sleep(delay + random.uniform(0, delay / 2))
+                delay *= 2
+    
+    def _send_sized(self, items, build, description, sizer=None):
+        """
+        Trimite elementele (listă sau batch columnar) într-un singur Batch.
+        
+        Dacă Batch-ul eșuează temporar după ce sizer-ul a coborât sub
+        dimensiunea lui, este împărțit în două și fiecare jumătate se trimite
+        separat, în ordine.
+        
+        Args:
+            items: Elementele de trimis
+            build: Funcție items -> lista de cereri Recombee
+            description: Text pentru mesajele de eroare
+            sizer: AdaptiveBatchSizer (opțional)
+        """
+        size = _batch_len(items)
+        try:
+            self._send_batch(build(items), description, size, sizer)
+        except (APIException, requests_lib.exceptions.RequestException) as e:
+            if not (sizer and 1 < size and sizer.size < size and is_retryable_error(e)):
+                raise
+            print(f"✂️  {description}: {size:,} elemente sunt prea multe - împărțim în două")
+            for part in _split_batch(items):
+                self._send_sized(part, build, description, sizer)
+    
+    def add_movies_batch(self, movies_list, batch_size=None, on_batch_done=None):
         """
         Adaugă mai multe filme în batch pentru eficiență.
         
+        Batch-urile sunt trimise în paralel (upload_concurrency), respectând
+        rate limit-ul, iar cele eșuate din motive temporare sunt reîncercate.
+        
         Args:
             movies_list: Lista de dicționare cu datele filmelor
-            batch_size: Dimensiunea batch-ului
+            batch_size: Dimensiunea fixă a batch-ului; None = adaptivă
+                        (vezi AdaptiveBatchSizer)
+            on_batch_done: Callback (index, size) apelat după confirmarea fiecărui batch
         """
         print(f"📤 Încărcare {len(movies_list)} filme în Recombee...")
         
-        for i in tqdm(range(0, len(movies_list), batch_size), desc="Încărcare filme"):
-            batch_movies = movies_list[i:i+batch_size]
-            requests = []
-            
-            for movie in batch_movies:
-                # Asigurăm că toate valorile sunt în formatul corect
-                values = {
-                    'title': str(movie.get('title', '')),
-                    'overview': str(movie.get('overview', '')),
-                    'genres': movie.get('genres', []) if isinstance(movie.get('genres'), list) else [],
-                    'keywords': movie.get('keywords', []) if isinstance(movie.get('keywords'), list) else [],
-                    'director': str(movie.get('director', '')),
-                    'actors': movie.get('actors', []) if isinstance(movie.get('actors'), list) else [],
-                    'release_date': str(movie.get('release_date', '')),
-                    'vote_average': float(movie.get('vote_average', 0.0)),
-                    'vote_count': int(movie.get('vote_count', 0)),
-                    'runtime': int(movie.get('runtime', 0)),
-                    'poster_path': str(movie.get('poster_path', '')),
-                }
-                requests.append(SetItemValues(movie['item_id'], values, cascade_create=True))
-            
+        failed = []
+        progress = tqdm(total=len(movies_list), desc="Încărcare filme", unit="filme")
+        
+        sizer = None if batch_size else AdaptiveBatchSizer(initial=500)
+        
+        def build(batch_movies):
+            return [SetItemValues(movie['item_id'], self._movie_values(movie), cascade_create=True)
+                    for movie in batch_movies]
+        
+        def upload(index, batch_movies):
             try:
-                self.client.send(Batch(requests))
-            except APIException as e:
-                print(f"⚠️ Eroare la batch {i//batch_size}: {e}")
+                self._send_sized(batch_movies, build, f"Batch filme {index}", sizer)
+            except Exception as e:
+                print(f"⚠️ Eroare la batch {index}: {e}")
+                failed.append(index)
+                return
+            if on_batch_done:
+                on_batch_done(index, len(batch_movies))
+            progress.update(len(batch_movies))
+        
+        with _UploadWindow(self.upload_concurrency) as window:
+            i = 0
+            index = 0
+            while i < len(movies_list):
+                size = batch_size or sizer.size
+                window.submit(upload, index, movies_list[i:i+size])
+                i += size
+                index += 1
+        progress.close()
         
+        if sizer:
+            sizer.report('filme')
+        if failed:
+            print(f"❌ {len(failed)} batch-uri de filme au eșuat definitiv: {sorted(failed)}")
         print(f"✅ Încărcate {len(movies_list)} filme în Recombee")
     
-    def add_rating(self, user_id, movie_id, rating, timestamp=None):
+    def add_rating(self, user_id, movie_id, rating, timestamp=None, deadline=None):
         """
         Adaugă un rating de la un utilizator pentru un film.
         
@@ -248,19 +664,12 @@ class MovieRecommender:
             movie_id: ID-ul filmului
             rating: Rating-ul (1-5)
             timestamp: Unix timestamp (opțional)
+            deadline: Bugetul de timp al cererii (default: default_timeout de acum)
         """
-        # Normalizăm rating-ul la scala Recombee (-1 la 1)
-        normalized_rating = (float(rating) - 3) / 2  # Convertim din 1-5 la -1 la 1
-        
-        self.client.send(AddRating(
-            str(user_id), 
-            str(movie_id), 
-            normalized_rating,
-            timestamp=timestamp,
-            cascade_create=True
-        ))
+        self._send(self._rating_request(user_id, movie_id, rating, timestamp), deadline)
+        self.recommendation_cache.invalidate_tag(str(user_id))
     
-    def add_ratings_batch(self, ratings_list, batch_size=1000):
+    def add_ratings_batch(self, ratings_list, batch_size=1000, created_users=None):
         """
         Adaugă mai multe rating-uri în batch.
         Creează automat utilizatorii cu proprietăți default dacă nu există.
@@ -268,60 +677,200 @@ class MovieRecommender:
         Args:
             ratings_list: Lista de dicționare cu rating-urile
             batch_size: Dimensiunea batch-ului
+            created_users: Set cu utilizatorii deja creați (ex. din chunk-urile
+                           anterioare la încărcarea în streaming); este actualizat
+                           cu utilizatorii noi
         """
         print(f"📤 Încărcare {len(ratings_list):,} rating-uri în Recombee...")
         
-        # Colectăm toți utilizatorii unici pentru a le seta proprietăți default
-        unique_users = set()
-        for interaction in ratings_list:
-            unique_users.add(str(interaction['user_id']))
+        def batches():
+            for i in range(0, len(ratings_list), batch_size):
+                batch_ratings = ratings_list[i:i+batch_size]
+                yield {
+                    'user_id': [str(r['user_id']) for r in batch_ratings],
+                    'item_id': [str(r['item_id']) for r in batch_ratings],
+                    'rating': [r['rating'] for r in batch_ratings],
+                    'timestamp': [r.get('timestamp') for r in batch_ratings],
+                }
         
-        print(f"👥 Creare {len(unique_users):,} utilizatori cu proprietăți default...")
+        self.add_rating_batches(batches(), created_users=created_users, adaptive=False)
         
-        # Creăm utilizatorii cu proprietăți default în batch-uri
-        user_batch_size = 1000
-        for i in tqdm(range(0, len(unique_users), user_batch_size), desc="Creare utilizatori"):
-            user_batch = list(unique_users)[i:i+user_batch_size]
-            user_requests = []
-            
-            for user_id in user_batch:
-                # Setăm proprietăți default pentru fiecare utilizator
-                user_requests.append(SetUserValues(
-                    user_id,
-                    {
-                        'preferred_genres': [],  # Listă goală (nu null)
-                        'preferred_directors': [],  # Listă goală (nu null)
-                    },
-                    cascade_create=True
-                ))
-            
-            try:
-                self.client.send(Batch(user_requests))
-            except APIException as e:
-                print(f"⚠️ Eroare la crearea utilizatorilor batch {i//user_batch_size}: {e}")
-        
-        # Acum încărcăm rating-urile
-        for i in tqdm(range(0, len(ratings_list), batch_size), desc="Încărcare ratings"):
-            batch_ratings = ratings_list[i:i+batch_size]
-            requests = []
+        print(f"✅ Încărcate {len(ratings_list):,} rating-uri în Recombee")
+    
+    def add_rating_batches(self, batches, created_users=None, prefetch=4, on_batch_done=None,
+                           adaptive=True, user_defaults=True):
+        """
+        Trimite în Recombee batch-uri de rating-uri produse în streaming
+        (vezi data_loader.iter_rating_batches).
+        
+        Batch-urile următoare sunt pregătite într-un thread separat, iar până
+        la upload_concurrency Batch-uri sunt în zbor simultan (limitate de
+        rate limiter). Coada e mărginită, deci memoria nu depinde de mărimea
+        dataset-ului. Utilizatorii care nu sunt încă confirmați ca creați
+        primesc proprietățile default în același Batch, înaintea rating-urilor
+        (SetUserValues e idempotent, deci batch-urile în paralel care împart
+        un utilizator nu trebuie să se aștepte unele pe altele).
+        
+        Args:
+            batches: Iterabil de dict-uri cu listele user_id, item_id, rating, timestamp
+            created_users: Set cu utilizatorii deja creați; este actualizat
+            prefetch: Numărul maxim de batch-uri pregătite în avans
+            on_batch_done: Callback (index, size) apelat după confirmarea fiecărui batch
+            adaptive: Re-împarte fluxul în batch-uri de dimensiune adaptivă
+                      (AdaptiveBatchSizer); False păstrează batch-urile primite
+            user_defaults: False nu trimite SetUserValues default (utilizatorii
+                           pot exista deja cu preferințe); AddRating îi creează
+                           la nevoie (cascade_create=True)
             
-            for interaction in batch_ratings:
-                normalized_rating = (float(interaction['rating']) - 3) / 2
-                requests.append(AddRating(
-                    str(interaction['user_id']),
-                    str(interaction['item_id']),
-                    normalized_rating,
-                    timestamp=interaction.get('timestamp'),
-                    cascade_create=False  # Utilizatorii sunt deja creați
-                ))
+        Returns:
+            Numărul de rating-uri trimise cu succes
+        """
+        if created_users is None:
+            created_users = set()
+        
+        lock = threading.Lock()
+        stats = {'sent': 0, 'failed': []}
+        progress = tqdm(desc="Încărcare ratings", unit="ratings")
+        sizer = AdaptiveBatchSizer(initial=1000) if adaptive else None
+        
+        def upload(index, batch, new_users):
+            def build(part):
+                if not user_defaults:
+                    return self._rating_requests(part, cascade_create=True)
+                requests = self._user_default_requests(new_users.intersection(part['user_id']))
+                requests.extend(self._rating_requests(part))
+                return requests
             
             try:
-                self.client.send(Batch(requests))
-            except APIException as e:
-                print(f"⚠️ Eroare la batch {i//batch_size}: {e}")
+                self._send_sized(batch, build, f"Batch ratings {index}", sizer)
+            except Exception as e:
+                print(f"⚠️ Eroare la batch {index}: {e}")
+                with lock:
+                    stats['failed'].append(index)
+                return
+            with lock:
+                created_users.update(new_users)
+                stats['sent'] += len(batch['user_id'])
+            if on_batch_done:
+                on_batch_done(index, len(batch['user_id']))
+            progress.update(len(batch['user_id']))
         
-        print(f"✅ Încărcate {len(ratings_list):,} rating-uri în Recombee")
+        batches = _prefetch(batches, prefetch)
+        if sizer:
+            batches = _rebatch(batches, sizer)
+        
+        with _UploadWindow(self.upload_concurrency) as window:
+            for index, batch in enumerate(batches):
+                with lock:
+                    new_users = set(batch['user_id']) - created_users
+                window.submit(upload, index, batch, new_users)
+        progress.close()
+        
+        if sizer:
+            sizer.report('rating-uri')
+        if stats['failed']:
+            print(f"❌ {len(stats['failed'])} batch-uri de rating-uri au eșuat definitiv: "
+                  f"{sorted(stats['failed'])[:20]}")
+        return stats['sent']
     
+    def _user_default_requests(self, user_ids):
+        """SetUserValues cu proprietăți default pentru utilizatorii noi."""
+        return [
+            SetUserValues(
+                user_id,
+                {
+                    'preferred_genres': [],  # Listă goală (nu null)
+                    'preferred_directors': [],  # Listă goală (nu null)
+                },
+                cascade_create=True
+            )
+            for user_id in sorted(user_ids)
+        ]
+    
+    def _rating_requests(self, batch, cascade_create=False):
+        """
+        Cereri AddRating pentru un batch columnar, cu rating-ul normalizat vectorizat.
+        Implicit utilizatorii sunt creați în același Batch (_user_default_requests).
+        """
+        # Normalizăm rating-ul la scala Recombee (-1 la 1)
+        normalized = ((np.asarray(batch['rating'], dtype=np.float64) - 3) / 2).tolist()
+        return [
+            AddRating(
+                user_id,
+                item_id,
+                rating,
+                timestamp=timestamp,
+                cascade_create=cascade_create
+            )
+            for user_id, item_id, rating, timestamp in zip(
+                batch['user_id'], batch['item_id'], normalized, batch['timestamp'])
+        ]
+
+    def _send_request_stream(self, requests, description, batch_size=1000):
+        """
+        Trimite un flux de cereri în Batch-uri de batch_size, în paralel
+        (upload_concurrency). Returnează numărul de cereri din Batch-urile
+        confirmate; Batch-urile eșuate definitiv sunt raportate la final.
+        """
+        lock = threading.Lock()
+        stats = {'sent': 0, 'failed': []}
+        progress = tqdm(desc=description, unit="cereri")
+
+        def upload(index, batch):
+            try:
+                self._send_batch(batch, f"{description} {index}")
+            except Exception as e:
+                print(f"⚠️ Eroare la batch {index}: {e}")
+                with lock:
+                    stats['failed'].append(index)
+                return
+            with lock:
+                stats['sent'] += len(batch)
+            progress.update(len(batch))
+
+        requests = iter(requests)
+        with _UploadWindow(self.upload_concurrency) as window:
+            for index in itertools.count():
+                batch = list(itertools.islice(requests, batch_size))
+                if not batch:
+                    break
+                window.submit(upload, index, batch)
+        progress.close()
+
+        if stats['failed']:
+            print(f"❌ {len(stats['failed'])} batch-uri ({description}) au eșuat definitiv: "
+                  f"{sorted(stats['failed'])[:20]}")
+        return stats['sent']
+
+    def set_users_batch(self, users, batch_size=1000):
+        """
+        Creează / actualizează utilizatori în Batch-uri (SetUserValues).
+
+        Args:
+            users: Iterabil de (user_id, values)
+
+        Returns:
+            Numărul de utilizatori trimiși cu succes
+        """
+        requests = (SetUserValues(str(user_id), values, cascade_create=True)
+                    for user_id, values in users)
+        return self._send_request_stream(requests, "Utilizatori", batch_size)
+
+    def add_views_batch(self, views, batch_size=1000):
+        """
+        Adaugă vizualizări de detalii în Batch-uri (AddDetailView).
+
+        Args:
+            views: Iterabil de (user_id, movie_id, timestamp)
+
+        Returns:
+            Numărul de vizualizări trimise cu succes
+        """
+        requests = (AddDetailView(str(user_id), str(movie_id), timestamp=timestamp,
+                                  cascade_create=True)
+                    for user_id, movie_id, timestamp in views)
+        return self._send_request_stream(requests, "Vizualizări", batch_size)
+
     def calculate_user_preferences_from_ratings(self, user_id, min_rating=3.5):
         """
         Calculează preferințele utilizatorului bazate pe rating-urile date.
@@ -333,7 +882,7 @@ class MovieRecommender:
         """
         try:
             # Obținem toate rating-urile utilizatorului
-            ratings = self.client.send(ListUserRatings(str(user_id)))
+            ratings = self.bulk_client.send(ListUserRatings(str(user_id)))
             
             if not ratings:
                 return  # Utilizatorul nu are rating-uri
@@ -353,7 +902,7 @@ class MovieRecommender:
                     if item_id:
                         try:
                             # Obținem datele filmului
-                            item = self.client.send(GetItemValues(str(item_id)))
+                            item = self.bulk_client.send(GetItemValues(str(item_id)))
                             
                             # Adăugăm genurile
                             genres = item.get('genres', [])
@@ -379,7 +928,8 @@ class MovieRecommender:
                 'preferred_directors': [director for director, _ in top_directors] if top_directors else [],
             }
             
-            self.client.send(SetUserValues(str(user_id), user_values))
+            self.bulk_client.send(SetUserValues(str(user_id), user_values))
+            self._remember_user_values(user_id, user_values)
             
         except APIException as e:
             # Ignorăm erorile pentru utilizatori individuali
@@ -395,7 +945,7 @@ class MovieRecommender:
         
         try:
             # Obținem toți utilizatorii
-            users = self.client.send(ListUsers())
+            users = self.bulk_client.send(ListUsers())
             print(f"👥 Calculare preferințe pentru {len(users)} utilizatori...")
             
             for i in tqdm(range(0, len(users), batch_size), desc="Actualizare preferințe"):
@@ -408,19 +958,20 @@ class MovieRecommender:
         except APIException as e:
             print(f"⚠️ Eroare la actualizarea preferințelor: {e}")
     
-    def add_view(self, user_id, movie_id, timestamp=None):
+    def add_view(self, user_id, movie_id, timestamp=None, deadline=None):
         """
         Înregistrează că un utilizator a vizualizat detaliile unui film.
         """
-        self.client.send(AddDetailView(
+        self._send(AddDetailView(
             str(user_id),
             str(movie_id),
             timestamp=timestamp,
             cascade_create=True
-        ))
+        ), deadline)
+        self.recommendation_cache.invalidate_tag(str(user_id))
     
     @retry_on_timeout(max_retries=2, initial_delay=0.5)
-    def create_user(self, user_id, preferred_genres=None, preferred_directors=None):
+    def create_user(self, user_id, preferred_genres=None, preferred_directors=None, deadline=None):
         """
         Creează un utilizator nou cu preferințele inițiale.
         Util pentru rezolvarea problemei Cold Start.
@@ -429,6 +980,7 @@ class MovieRecommender:
             user_id: ID-ul utilizatorului
             preferred_genres: Lista de genuri preferate
             preferred_directors: Lista de regizori preferați
+            deadline: Bugetul de timp al cererii (default: default_timeout de acum)
         """
         values = {}
         if preferred_genres:
@@ -437,8 +989,8 @@ class MovieRecommender:
             values['preferred_directors'] = preferred_directors
         
         try:
-            # Trimite cererea (timeout-ul nu se poate seta per-request în API-ul Python)
-            self.client.send(SetUserValues(str(user_id), values, cascade_create=True))
+            self._send(SetUserValues(str(user_id), values, cascade_create=True), deadline)
+            self._remember_user_values(user_id, values)
             print(f"✅ Utilizator {user_id} creat cu succes")
             return True
         except Exception as e:
@@ -448,8 +1000,140 @@ class MovieRecommender:
             # la prima interacțiune (rating, view, etc.)
             return False
     
+    # Booster-e ReQL folosite la recomandări
+    DEFAULT_BOOSTER = """
+            if 'vote_count' < 500 AND 'vote_average' > 7 then 1.3 
+            else if 'vote_average' > 7 then 1.5 
+            else 1.0
+            """
+    COLD_START_BOOSTER = "if 'vote_count' > 1000 AND 'vote_average' > 7 then 1.5 else if 'vote_average' > 7 then 1.2 else 1.0"
+    
+    @staticmethod
+    def _recommendation_cache_key(user_id, count, filter_genres, diversity):
+        """Cheia din recommendation_cache (ordinea genurilor nu contează pentru filtru)."""
+        return (str(user_id), count, tuple(sorted(filter_genres or ())), diversity)
+    
+    def cache_stats(self):
+        """Statisticile cache-urilor locale (pentru monitorizare)."""
+        return [self.recommendation_cache.stats(), self.last_recommendations.stats(),
+                self.user_preferences.stats(), self.cold_start_cache.stats(),
+                *self.item_catalog.stats()]
+    
+    def circuit_stats(self):
+        """Starea circuit breaker-elor, per tip de cerere (gol dacă sunt dezactivate)."""
+        return self.client.stats() if isinstance(self.client, BreakerClient) else []
+    
+    def hedge_stats(self):
+        """Rata de hedging și câștigurile duplicatelor, per tip de cerere (gol dacă e dezactivat)."""
+        return self.hedger.stats() if self.hedger is not None else []
+    
+    def fetch_item_values(self, item_id, deadline=None):
+        """
+        Proprietățile unui film direct din Recombee (sursă pentru item_catalog).
+        
+        Returns:
+            Dict cu proprietățile, sau None dacă filmul nu există în Recombee
+        """
+        try:
+            return self._send(GetItemValues(str(item_id)), deadline)
+        except ResponseException as e:
+            if e.status_code == 404:
+                return None
+            raise
+    
+    @staticmethod
+    def _genre_filter(genres):
+        """
+        Filtrul ReQL pentru o listă de genuri (None dacă lista e goală).
+        
+        ATENȚIE: Ghilimele simple (') sunt pentru proprietăți, ghilimele duble (") pentru string-uri constante
+        Format corect: "Animation" in 'genres'
+        """
+        if not genres:
+            return None
+        return ' or '.join(f'"{g}" in \'genres\'' for g in genres)
+    
+    @classmethod
+    def _user_booster(cls, user_data):
+        """
+        Booster-ul pentru recomandările unui utilizator, cu regizorii
+        preferați (din GetUserValues) promovați.
+        """
+        preferred_directors = (user_data or {}).get('preferred_directors', [])
+        if not preferred_directors:
+            return cls.DEFAULT_BOOSTER
+        
+        director_conditions = ' or '.join([f"'director' == \"{d}\"" for d in preferred_directors[:3]])
+        return f"""
+                if ({director_conditions}) then 2.0
+                else if 'vote_count' < 500 AND 'vote_average' > 7 then 1.3 
+                else if 'vote_average' > 7 then 1.5 
+                else 1.0
+                """
+    
+    @staticmethod
+    def _user_recommendation_request(user_id, count, filter_expression, booster, diversity):
+        """RecommendItemsToUser pentru recomandările hibride ale unui utilizator."""
+        return RecommendItemsToUser(
+            str(user_id),
+            count,
+            filter=filter_expression,
+            booster=booster,
+            cascade_create=True,
+            return_properties=True,
+            diversity=diversity,
+            # Acest parametru activează logica hibridă în Recombee
+            scenario='homepage',
+            logic={
+                'name': 'recombee:personal',  # Recomandări personalizate (hibrid implicit)
+            }
+        )
+    
+    @classmethod
+    def _cold_start_request(cls, count, filter_expression):
+        """RecommendItemsToUser pentru un utilizator nou (user temporar, fără istoric)."""
+        return RecommendItemsToUser(
+            'cold_start_temp',
+            count,
+            filter=filter_expression,
+            booster=cls.COLD_START_BOOSTER,
+            cascade_create=True,
+            return_properties=True,
+            scenario='cold_start',
+            logic={
+                'name': 'recombee:personal',  # Recomandări personalizate bazate pe conținut
+            }
+        )
+    
+    @staticmethod
+    def _similar_movies_request(movie_id, count):
+        """RecommendItemsToItem pentru filmele similare cu un film dat."""
+        return RecommendItemsToItem(
+            str(movie_id),
+            'similar_movies',  # Scenario pentru filme similare
+            count,
+            return_properties=True,
+            cascade_create=True,
+            logic={
+                'name': 'recombee:similar',  # Logic valid pentru item-to-item recommendations
+            }
+        )
+    
+    @staticmethod
+    def _rating_request(user_id, movie_id, rating, timestamp=None):
+        """AddRating pentru un rating pe scala 1-5."""
+        # Normalizăm rating-ul la scala Recombee (-1 la 1)
+        normalized_rating = (float(rating) - 3) / 2  # Convertim din 1-5 la -1 la 1
+        return AddRating(
+            str(user_id), 
+            str(movie_id), 
+            normalized_rating,
+            timestamp=timestamp,
+            cascade_create=True
+        )
+    
     def get_recommendations_for_user(self, user_id, count=10, filter_genres=None, 
-                                     exclude_watched=True, diversity=0.3):
+                                     exclude_watched=True, diversity=0.3, deadline=None):
         """
         Obține recomandări personalizate pentru un utilizator.
         
@@ -463,92 +1147,220 @@ class MovieRecommender:
             filter_genres: Filtrează doar anumite genuri (opțional)
             exclude_watched: Exclude filmele deja vizionate/rătate
             diversity: Factor de diversitate (0-1)
+            deadline: Bugetul de timp al cererii (default: default_timeout de acum);
+                      cu bugetul aproape consumat, munca opțională (GetUserValues,
+                      fallback-ul fără filtru) este sărită
             
         Returns:
             Lista de recomandări cu detalii despre filme
         """
-        # Construim filtrul ReQL pentru genuri
-        # ATENȚIE: Ghilimele simple (') sunt pentru proprietăți, ghilimele duble (") pentru string-uri constante
-        filter_expression = None
-        if filter_genres and len(filter_genres) > 0:
-            # Filtrăm după genuri specifice
-            # Format corect: "Animation" in 'genres' (ghilimele duble pentru string, simple pentru proprietate)
-            genre_filters = [f'"{g}" in \'genres\'' for g in filter_genres]
-            filter_expression = ' or '.join(genre_filters)
-        
-        # Booster îmbunătățit pentru a include și regizorii preferați
-        # Obține preferințele utilizatorului
-        try:
-            from recombee_api_client.api_requests import GetUserValues
-            user_data = self.client.send(GetUserValues(str(user_id)))
-            preferred_directors = user_data.get('preferred_directors', [])
-            
-            # Construiește booster dinamic bazat pe regizori
-            if preferred_directors and len(preferred_directors) > 0:
-                director_conditions = ' or '.join([f"'director' == \"{d}\"" for d in preferred_directors[:3]])
-                booster = f"""
-                if ({director_conditions}) then 2.0
-                else if 'vote_count' < 500 AND 'vote_average' > 7 then 1.3 
-                else if 'vote_average' > 7 then 1.5 
-                else 1.0
-                """
-            else:
-                booster = """
-                if 'vote_count' < 500 AND 'vote_average' > 7 then 1.3 
-                else if 'vote_average' > 7 then 1.5 
-                else 1.0
-                """
-        except:
-            # Fallback la booster simplu
-            booster = """
-            if 'vote_count' < 500 AND 'vote_average' > 7 then 1.3 
-            else if 'vote_average' > 7 then 1.5 
-            else 1.0
-            """
+        deadline = self._deadline(deadline)
+        
+        # Rezultatele recente sunt servite din cache, fără apel la Recombee
+        key = self._recommendation_cache_key(user_id, count, filter_genres, diversity)
+        cached = self.recommendation_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        # Preferințele (regizorii pentru booster) vin din store-ul local; cererea
+        # filtrată, fallback-ul fără filtru (dacă e probabil) și, la nevoie,
+        # GetUserValues pleacă împreună într-un singur Batch
+        plan, requests = self._user_recommendation_plan(
+            user_id, count, filter_genres, diversity,
+            optional=deadline.allows(config.RECOMBEE_OPTIONAL_MIN_BUDGET))
         
         try:
-            response = self.client.send(RecommendItemsToUser(
-                str(user_id),
-                count,
-                filter=filter_expression,
-                booster=booster,
-                cascade_create=True,
-                return_properties=True,
-                diversity=diversity,
-                # Acest parametru activează logica hibridă în Recombee
-                scenario='homepage',
-                logic={
-                    'name': 'recombee:personal',  # Recomandări personalizate (hibrid implicit)
-                }
-            ))
+            result = self._user_recommendation_results(plan, self._send_together(requests, deadline))
             
-            result = self._format_recommendations(response['recomms'])
-            
-            # Dacă nu am găsit destule filme cu filtrarea, încearcă fără filtru
-            if len(result) < count // 2 and filter_expression:
-                print(f"⚠️  Doar {len(result)} filme găsite cu genurile {filter_genres}, încercăm fără filtru...")
-                response_fallback = self.client.send(RecommendItemsToUser(
-                    str(user_id),
-                    count,
-                    filter=None,
-                    booster=booster,
-                    cascade_create=True,
-                    return_properties=True,
-                    diversity=diversity,
-                    scenario='homepage',
-                    logic={
-                        'name': 'recombee:personal',
-                    }
-                ))
+            if result is None and deadline.allows(config.RECOMBEE_OPTIONAL_MIN_BUDGET):
+                # Fallback neanticipat: al doilea round trip, fără filtru
+                response_fallback = self._send(self._user_recommendation_request(
+                    user_id, count, None, plan['booster'], diversity), deadline)
                 result = self._format_recommendations(response_fallback['recomms'])
+            elif result is None:
+                # Bugetul e aproape consumat: rămânem la rezultatele filtrate,
+                # fără să le memorăm (următoarea cerere încearcă din nou)
+                return plan['filtered']
             
+            self.recommendation_cache.set(key, result, tag=str(user_id))
+            self.last_recommendations.set(key, result)
             return result
             
-        except APIException as e:
-            print(f"⚠️ Eroare la obținerea recomandărilor: {e}")
+        except (APIException, requests_lib.exceptions.RequestException) as e:
+            if not isinstance(e, CircuitOpenError):
+                print(f"⚠️ Eroare la obținerea recomandărilor: {e}")
+            return self._fallback_recommendations(key, count, filter_genres)
+    
+    def _fallback_recommendations(self, key, count, genres):
+        """
+        Recomandări fără Recombee: ultimele servite pentru aceeași cerere,
+        altfel cele mai populare filme locale (din genurile date).
+        """
+        stale = self.last_recommendations.get(key)
+        if stale is not None:
+            return stale
+        if self.local is None:
             return []
+        try:
+            return self._format_recommendations(self.local.popular(count, genres))
+        except Exception as e:
+            print(f"⚠️ Eroare la recomandările locale: {e}")
+            return []
+    
+    def _user_recommendation_plan(self, user_id, count, filter_genres, diversity, optional=True):
+        """
+        Cererile pentru get_recommendations_for_user, de trimis într-un singur round trip.
+        
+        Cu optional=False (buget de timp mic) nu se adaugă GetUserValues și nici
+        fallback-ul fără filtru; booster-ul simplu e folosit pentru utilizatorii
+        ale căror preferințe nu sunt în store-ul local.
+        
+        Returns:
+            (plan, requests) - plan-ul este folosit de _user_recommendation_results
+        """
+        user_id = str(user_id)
+        
+        # Construim filtrul ReQL pentru genuri
+        filter_expression = self._genre_filter(filter_genres)
+        
+        # Booster îmbunătățit pentru a include și regizorii preferați. Dacă nu
+        # îi avem local, îi citim în același Batch și folosim booster-ul simplu
+        user_data = self.user_preferences.get(user_id)
+        booster = self._user_booster(user_data)
+        
+        requests = []
+        fetch_user = user_data is None and optional
+        if fetch_user:
+            requests.append(GetUserValues(user_id))
+        requests.append(self._user_recommendation_request(
+            user_id, count, filter_expression, booster, diversity))
+        
+        prefetch = optional and filter_expression is not None and self._fallback_likely(filter_genres)
+        if prefetch:
+            requests.append(self._user_recommendation_request(
+                user_id, count, None, booster, diversity))
+        
+        plan = {
+            'user_id': user_id,
+            'count': count,
+            'filter_genres': filter_genres if filter_expression else None,
+            'booster': booster,
+            'fetch_user': fetch_user,
+            'prefetch': prefetch,
+            'filtered': None,
+        }
+        return plan, requests
+    
+    def _user_recommendation_results(self, plan, responses):
+        """
+        Recomandările formatate din răspunsurile cererilor din plan.
+        
+        Returns:
+            Lista de recomandări, sau None dacă e nevoie de fallback-ul fără
+            filtru și acesta nu a fost trimis în același Batch (rezultatele
+            filtrate rămân atunci în plan['filtered'])
+        
+        Raises:
+            APIException: Dacă cererea de recomandări a eșuat
+        """
+        responses = list(responses)
+        if plan['fetch_user']:
+            user_data = responses.pop(0)
+            if not isinstance(user_data, Exception):
+                self.user_preferences.set(plan['user_id'], user_data)
+            elif isinstance(user_data, ResponseException) and user_data.status_code == 404:
+                self.user_preferences.set(plan['user_id'], {})  # Utilizator încă necunoscut
+        
+        filtered = responses[0]
+        if isinstance(filtered, Exception):
+            raise filtered
+        result = self._format_recommendations(filtered['recomms'])
+        
+        if plan['filter_genres'] is None:
+            return result
+        
+        # Dacă nu am găsit destule filme cu filtrarea, folosim rezultatele fără filtru
+        needs_fallback = len(result) < plan['count'] // 2
+        self._record_fallback(plan['filter_genres'], needs_fallback)
+        if not needs_fallback:
+            return result
+        
+        print(f"⚠️  Doar {len(result)} filme găsite cu genurile {plan['filter_genres']}, folosim rezultatele fără filtru...")
+        if not plan['prefetch']:
+            plan['filtered'] = result
+            return None
+        unfiltered = responses[1]
+        if isinstance(unfiltered, Exception):
+            raise unfiltered
+        return self._format_recommendations(unfiltered['recomms'])
+    
+    def _fallback_likely(self, filter_genres):
+        """
+        True dacă pentru aceste genuri fallback-ul fără filtru a fost necesar recent.
+        Un set de genuri nou pornește de la 0: cererea în plus (facturată, cu un
+        recommId niciodată afișat) pleacă doar după fallback-uri observate.
+        """
+        rate = self.fallback_rates.get(tuple(sorted(filter_genres)), 0.0)
+        return rate >= config.FALLBACK_PREFETCH_THRESHOLD
+    
+    def _record_fallback(self, filter_genres, needed):
+        """Actualizează rata (medie exponențială) de fallback pentru un set de genuri."""
+        key = tuple(sorted(filter_genres))
+        if key not in self.fallback_rates and len(self.fallback_rates) >= 10000:
+            self.fallback_rates.clear()
+        rate = self.fallback_rates.get(key, 0.0)
+        self.fallback_rates[key] = 0.8 * rate + 0.2 * (1.0 if needed else 0.0)
+    
+    def _deadline(self, deadline):
+        """Deadline-ul primit sau unul nou, cu bugetul default_timeout."""
+        return deadline if deadline is not None else Deadline(self.default_timeout)
+    
+    def _send(self, request, deadline=None):
+        """
+        Trimite o cerere cu timeout-ul egal cu bugetul rămas din deadline
+        (cu hedging pentru citiri, dacă e activat).
+        """
+        request = self._deadline(deadline).apply(request)
+        if self.hedger is not None:
+            return self.hedger.send(request)
+        return self.client.send(request)
+    
+    def _send_together(self, requests, deadline=None):
+        """
+        Trimite cererile într-un singur round trip (direct sau într-un Batch).
+        
+        Returns:
+            Răspunsurile în ordinea cererilor; o sub-cerere eșuată din Batch
+            apare ca ResponseException în locul răspunsului
+        """
+        if len(requests) == 1:
+            return [self._send(requests[0], deadline)]
+        return self._batch_responses(requests, self._send(Batch(requests), deadline))
+    
+    @staticmethod
+    def _batch_responses(requests, response):
+        """Separă răspunsul unui Batch în răspunsuri / excepții per cerere."""
+        results = []
+        for request, item in zip(requests, response):
+            if item['code'] in (200, 201):
+                results.append(item['json'])
+            else:
+                results.append(ResponseException(request, item['code'], json.dumps(item['json'])))
+        return results
     
-    def get_recommendations_for_new_user(self, preferred_genres, count=10):
+    def _remember_user_values(self, user_id, values):
+        """
+        Actualizează preferințele locale după un SetUserValues. Dacă nu știm
+        regizorii preferați, intrarea este ștearsă (se recitește la nevoie).
+        """
+        user_id = str(user_id)
+        if 'preferred_directors' in values:
+            self.user_preferences.set(user_id, dict(values))
+        else:
+            self.user_preferences.invalidate(user_id)
+        self.recommendation_cache.invalidate_tag(user_id)
+    
+    def get_recommendations_for_new_user(self, preferred_genres, count=10, deadline=None):
         """
         Obține recomandări pentru un utilizator NOU (Cold Start - User).
         
@@ -558,66 +1370,96 @@ class MovieRecommender:
         Args:
             preferred_genres: Lista de genuri preferate (selectate la înregistrare)
             count: Numărul de recomandări
+            deadline: Bugetul de timp al cererii (default: default_timeout de acum)
             
         Returns:
             Lista de recomandări bazate pe conținut
         """
-        # Pentru utilizatori noi, creăm un filtru bazat pe genurile preferate
-        # ATENȚIE: Ghilimele simple (') sunt pentru proprietăți, ghilimele duble (") pentru string-uri constante
-        if preferred_genres and len(preferred_genres) > 0:
-            genre_filters = [f'"{g}" in \'genres\'' for g in preferred_genres]
-            filter_expression = ' or '.join(genre_filters)
-        else:
-            filter_expression = None
+        deadline = self._deadline(deadline)
+        # Rezultatul depinde doar de setul de genuri: îl împărțim între toți
+        # vizitatorii noi, iar cererile identice simultane pleacă o singură dată
+        key = self._cold_start_cache_key(preferred_genres, count)
+        try:
+            return self.cold_start_cache.get_or_load(
+                key, lambda: self._fetch_cold_start(list(key[0]), count, deadline))
+        except PartialResult as partial:
+            # Servim rezultatul filtrat, dar nu îl împărțim cu ceilalți vizitatori
+            return partial.result
+        except (APIException, requests_lib.exceptions.RequestException) as e:
+            if not isinstance(e, CircuitOpenError):
+                print(f"⚠️ Eroare la recomandări cold start: {e}")
+            return self._fallback_recommendations(('cold_start', key), count, list(key[0]))
+    
+    @staticmethod
+    def _cold_start_cache_key(preferred_genres, count):
+        """Cheia din cold_start_cache: setul sortat de genuri și numărul de recomandări."""
+        return (tuple(sorted(set(preferred_genres or ()))), count)
+    
+    def _fetch_cold_start(self, preferred_genres, count, deadline=None):
+        """
+        Recomandările cold start de la Recombee, fără cache.
         
-        # Booster pentru filme populare și bine cotate
-        # Aceasta este strategia pentru Cold Start
-        # Returnează un număr care multiplică scorul
-        booster = "if 'vote_count' > 1000 AND 'vote_average' > 7 then 1.5 else if 'vote_average' > 7 then 1.2 else 1.0"
+        Raises:
+            APIException: Dacă cererea eșuează
+            PartialResult: Dacă rezultatul filtrat e prea scurt și nu a mai rămas
+                           buget pentru cererea fără filtru (nu trebuie memorat)
+        """
+        # Pentru utilizatori noi, creăm un filtru bazat pe genurile preferate.
+        # Booster-ul (COLD_START_BOOSTER) favorizează filmele populare și bine
+        # cotate - aceasta este strategia pentru Cold Start
+        filter_expression = self._genre_filter(preferred_genres)
         
-        try:
-            # Folosim RecommendItemsToUser cu un user temporar
-            temp_user_id = 'cold_start_temp'
-            
-            response = self.client.send(RecommendItemsToUser(
-                temp_user_id,
-                count,
-                filter=filter_expression,
-                booster=booster,
-                cascade_create=True,
-                return_properties=True,
-                scenario='cold_start',
-                logic={
-                    'name': 'recombee:personal',  # Recomandări personalizate bazate pe conținut
-                }
-            ))
-            
-            result = self._format_recommendations(response['recomms'])
-            
-            # Dacă nu am găsit destule filme cu filtrarea, încearcă fără filtru
-            if len(result) < count // 2 and filter_expression:
-                print(f"⚠️  Doar {len(result)} filme găsite cu genurile {preferred_genres}, încercăm fără filtru...")
-                response_fallback = self.client.send(RecommendItemsToUser(
-                    temp_user_id,
-                    count,
-                    filter=None,
-                    booster=booster,
-                    cascade_create=True,
-                    return_properties=True,
-                    scenario='cold_start',
-                    logic={
-                        'name': 'recombee:personal',
-                    }
-                ))
-                result = self._format_recommendations(response_fallback['recomms'])
-            
-            return result
-            
-        except APIException as e:
-            print(f"⚠️ Eroare la recomandări cold start: {e}")
-            return []
+        # Folosim RecommendItemsToUser cu un user temporar
+        deadline = self._deadline(deadline)
+        response = self._send(self._cold_start_request(count, filter_expression), deadline)
+        
+        result = self._format_recommendations(response['recomms'])
+        
+        # Dacă nu am găsit destule filme cu filtrarea, încearcă fără filtru
+        # (doar dacă mai avem buget de timp pentru încă un round trip)
+        if len(result) < count // 2 and filter_expression:
+            if not deadline.allows(config.RECOMBEE_OPTIONAL_MIN_BUDGET):
+                raise PartialResult(result)
+            print(f"⚠️  Doar {len(result)} filme găsite cu genurile {preferred_genres}, încercăm fără filtru...")
+            response_fallback = self._send(self._cold_start_request(count, None), deadline)
+            result = self._format_recommendations(response_fallback['recomms'])
+        
+        self.last_recommendations.set(
+            ('cold_start', self._cold_start_cache_key(preferred_genres, count)), result)
+        return result
+    
+    def warm_cold_start_cache(self, count=None, genres=None):
+        """
+        Pre-încarcă cache-ul cold start pentru combinațiile cele mai frecvente:
+        fără preferințe și fiecare gen din pagina de înregistrare, separat.
+        
+        Args:
+            count: Numărul de recomandări (default: config.DEFAULT_NUM_RECOMMENDATIONS)
+            genres: Genurile de pre-încărcat (default: config.GENRES_FOR_COLD_START)
+        
+        Returns:
+            Numărul de combinații încărcate cu succes
+        """
+        count = count or config.DEFAULT_NUM_RECOMMENDATIONS
+        genres = config.GENRES_FOR_COLD_START if genres is None else genres
+        combinations = [[]] + [[genre] for genre in genres]
+        
+        warmed = 0
+        for combination in combinations:
+            key = self._cold_start_cache_key(combination, count)
+            try:
+                self.cold_start_cache.get_or_load(
+                    key, lambda: self._fetch_cold_start(combination, count))
+                warmed += 1
+            except PartialResult:
+                print(f"⚠️ Cold start {combination or 'fără genuri'}: rezultat incomplet, nememorat")
+            except (APIException, requests_lib.exceptions.RequestException) as e:
+                print(f"⚠️ Cold start {combination or 'fără genuri'}: {e}")
+        
+        print(f"🔥 Cache cold start încălzit: {warmed}/{len(combinations)} combinații de genuri")
+        return warmed
     
-    def get_similar_movies(self, movie_id, count=10):
+    def get_similar_movies(self, movie_id, count=10, deadline=None):
         """
         Găsește filme similare cu un film dat (Item-Based Collaborative Filtering).
         
@@ -627,27 +1469,27 @@ class MovieRecommender:
         Args:
             movie_id: ID-ul filmului
             count: Numărul de filme similare
+            deadline: Bugetul de timp al cererii (default: default_timeout de acum)
             
         Returns:
             Lista de filme similare
         """
         try:
-            response = self.client.send(RecommendItemsToItem(
-                str(movie_id),
-                'similar_movies',  # Scenario pentru filme similare
-                count,
-                return_properties=True,
-                cascade_create=True,
-                logic={
-                    'name': 'recombee:similar',  # Logic valid pentru item-to-item recommendations
-                }
-            ))
+            response = self._send(self._similar_movies_request(movie_id, count), deadline)
             
             return self._format_recommendations(response['recomms'])
             
-        except APIException as e:
-            print(f"⚠️ Eroare la găsirea filmelor similare: {e}")
-            return []
+        except (APIException, requests_lib.exceptions.RequestException) as e:
+            if not isinstance(e, CircuitOpenError):
+                print(f"⚠️ Eroare la găsirea filmelor similare: {e}")
+            if self.local is None:
+                return []
+            # Fallback local: filmele cu cele mai multe genuri comune
+            try:
+                return self._format_recommendations(self.local.similar(movie_id, count))
+            except Exception as e:
+                print(f"⚠️ Eroare la filmele similare locale: {e}")
+                return []
     
     def _format_recommendations(self, recomms):
         """
@@ -655,6 +1497,8 @@ class MovieRecommender:
         """
         formatted = []
         for rec in recomms:
+            # return_properties aduce toate proprietățile: le păstrăm pentru /api/movie
+            self.item_catalog.add(rec['id'], rec['values'])
             movie = {
                 'id': rec['id'],
                 'title': rec['values'].get('title', 'Unknown'),
@@ -687,7 +1531,7 @@ class MovieRecommender:
                 return False
         
         try:
-            self.client.send(ResetDatabase())
+            self.bulk_client.send(ResetDatabase())
             print("🗑️ Baza de date a fost resetată")
             return True
         except APIException as e:
@@ -699,8 +1543,8 @@ class MovieRecommender:
         Obține statistici despre baza de date.
         """
         try:
-            items = self.client.send(ListItems())
-            users = self.client.send(ListUsers())
+            items = self.bulk_client.send(ListItems())
+            users = self.bulk_client.send(ListUsers())
             
             return {
                 'total_items': len(items),
@@ -722,12 +1566,12 @@ class MovieRecommender:
         
         try:
             # Verifică câteva filme (folosim count în loc de limit)
-            items = self.client.send(ListItems(count=sample_size))
+            items = self.bulk_client.send(ListItems(count=sample_size))
             print(f"\n📽️  Verificare {len(items)} filme (sample):")
             
             for item_id in items[:5]:
                 try:
-                    item = self.client.send(GetItemValues(item_id))
+                    item = self.bulk_client.send(GetItemValues(item_id))
                     title = item.get('title', 'N/A')
                     genres = item.get('genres', [])
                     has_data = bool(title and title != '' and title != 'N/A')
@@ -736,12 +1580,12 @@ class MovieRecommender:
                     print(f"   - {item_id}: EROARE - {e}")
             
             # Verifică câțiva utilizatori (folosim count în loc de limit)
-            users = self.client.send(ListUsers(count=sample_size))
+            users = self.bulk_client.send(ListUsers(count=sample_size))
             print(f"\n👥 Verificare {len(users)} utilizatori (sample):")
             
             for user_id in users[:5]:
                 try:
-                    user = self.client.send(GetUserValues(user_id))
+                    user = self.bulk_client.send(GetUserValues(user_id))
                     preferred_genres = user.get('preferred_genres', [])
                     preferred_directors = user.get('preferred_directors', [])
                     registration_date = user.get('registration_date', None)